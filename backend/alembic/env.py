@@ -18,7 +18,7 @@ if config.config_file_name is not None:
 # Import base first, then models to register them
 from app.db.base_class import Base
 # Import all models so they register with Base
-from app.models import user, feedback, category, tag, feedback_tag, status_event, admin_response
+from app.models import user, feedback, category, tag, feedback_tag, status_event, admin_response, job_checkpoint, feedback_daily_stats, topic_snapshot
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
@@ -0,0 +1,38 @@
+"""Add sentiment_version to feedback and job_checkpoints table
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable with no default: adding it is a catalog-only change, and NULL
+    # marks existing rows as stale so the sentiment backfill re-scores them.
+    # (Unlike 002, rows are not rewritten here; run `python -m app.cli
+    # backfill-sentiment` after deploying.)
+    op.add_column('feedback', sa.Column('sentiment_version', sa.String(32), nullable=True))
+
+    # Checkpoints let batch jobs resume after a crash
+    op.create_table(
+        'job_checkpoints',
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('position', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_checkpoints')
+    op.drop_column('feedback', 'sentiment_version')
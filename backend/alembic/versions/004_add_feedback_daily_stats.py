@@ -0,0 +1,46 @@
+"""Add feedback_daily_stats rollup table
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'feedback_daily_stats',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('sentiment_label', sa.String(20), nullable=False, server_default=''),
+        sa.Column('feedback_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('sentiment_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('sentiment_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('day', 'category_id', 'status', 'sentiment_label')
+    )
+
+    # Populate from existing feedback (same query as `python -m app.cli reconcile-daily-stats`)
+    op.execute("""
+        INSERT INTO feedback_daily_stats
+            (day, category_id, status, sentiment_label, feedback_count, sentiment_sum, sentiment_count)
+        SELECT date(created_at), COALESCE(category_id, 0), CAST(status AS VARCHAR(20)),
+               COALESCE(sentiment_label, ''), COUNT(id), COALESCE(SUM(sentiment_score), 0.0),
+               COUNT(sentiment_score)
+        FROM feedback
+        GROUP BY date(created_at), COALESCE(category_id, 0), CAST(status AS VARCHAR(20)),
+                 COALESCE(sentiment_label, '')
+    """)
+
+
+def downgrade():
+    op.drop_table('feedback_daily_stats')
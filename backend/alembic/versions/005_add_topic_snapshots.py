@@ -0,0 +1,41 @@
+"""Add topic_snapshots table
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'topic_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('k', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('corpus_size', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_feedback_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('fit_seconds', sa.Float(), nullable=True),
+        sa.Column('clusters', sa.JSON(), nullable=False),
+        sa.Column('model', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('k', 'version', name='uq_topic_snapshots_k_version')
+    )
+    op.create_index('ix_topic_snapshots_id', 'topic_snapshots', ['id'])
+    op.create_index('ix_topic_snapshots_k', 'topic_snapshots', ['k'])
+
+
+def downgrade():
+    op.drop_index('ix_topic_snapshots_k', table_name='topic_snapshots')
+    op.drop_index('ix_topic_snapshots_id', table_name='topic_snapshots')
+    op.drop_table('topic_snapshots')
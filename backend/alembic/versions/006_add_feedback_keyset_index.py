@@ -0,0 +1,45 @@
+"""Add (created_at, id) index for keyset pagination
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY keeps feedback writable while the index builds; it cannot
+    # run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        if bind.dialect.name == 'postgresql' and bind.execute(sa.text(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass('ix_feedback_created_at_id')"
+        )).scalar():
+            # Left INVALID by an interrupted CONCURRENTLY build; IF NOT
+            # EXISTS would keep it, so build it again
+            op.drop_index('ix_feedback_created_at_id', table_name='feedback', postgresql_concurrently=True)
+        op.create_index(
+            'ix_feedback_created_at_id',
+            'feedback',
+            ['created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_feedback_created_at_id',
+            table_name='feedback',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
@@ -0,0 +1,93 @@
+"""Add composite indexes for filtered newest-first lists and tag aggregation
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+# (name, table, leading columns); feedback indexes end in the (created_at, id) sort key
+COMPOSITE_INDEXES = [
+    ('ix_feedback_user_created_at', 'feedback', ['user_id']),
+    ('ix_feedback_status_created_at', 'feedback', ['status']),
+    ('ix_feedback_category_created_at', 'feedback', ['category_id']),
+]
+# Single-column indexes made redundant by the composites above
+REPLACED_INDEXES = [
+    ('ix_feedback_user_id', 'feedback', ['user_id']),
+    ('ix_feedback_status', 'feedback', ['status']),
+    ('ix_feedback_category_id', 'feedback', ['category_id']),
+]
+
+
+def _sort_key():
+    # SQLite compares julianday(created_at) (see app.db.functions.timestamp_key)
+    if op.get_bind().dialect.name == 'sqlite':
+        return [sa.text('julianday(created_at)'), 'id']
+    return ['created_at', 'id']
+
+
+def _is_valid(name):
+    """None if the index does not exist, else whether PostgreSQL may use it."""
+    return op.get_bind().execute(
+        sa.text('SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)'),
+        {'name': name},
+    ).scalar()
+
+
+def _create_concurrently(name, table, columns):
+    if op.get_bind().dialect.name == 'postgresql' and _is_valid(name) is False:
+        # Left INVALID by an interrupted CONCURRENTLY build; IF NOT EXISTS
+        # would keep it, so build it again
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def _check_valid(names):
+    """Stop before dropping the indexes these replace unless all of them are usable."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    invalid = [name for name in names if not _is_valid(name)]
+    if invalid:
+        raise RuntimeError(f"Indexes {invalid} are missing or INVALID; nothing was dropped, rerun the migration")
+
+
+def upgrade():
+    # CONCURRENTLY keeps feedback writable while the indexes build; it cannot
+    # run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        for name, table, columns in COMPOSITE_INDEXES:
+            _create_concurrently(name, table, columns + _sort_key())
+        _create_concurrently('ix_feedback_tags_tag_id', 'feedback_tags', ['tag_id', 'feedback_id'])
+        if op.get_bind().dialect.name == 'sqlite':
+            # 006 indexed the raw column, which SQLite cannot sort on
+            op.drop_index('ix_feedback_created_at_id', table_name='feedback', if_exists=True)
+            op.create_index('ix_feedback_created_at_id', 'feedback', _sort_key())
+        _check_valid([name for name, _, _ in COMPOSITE_INDEXES])
+        for name, table, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED_INDEXES:
+            _create_concurrently(name, table, columns)
+        _check_valid([name for name, _, _ in REPLACED_INDEXES])
+        if op.get_bind().dialect.name == 'sqlite':
+            op.drop_index('ix_feedback_created_at_id', table_name='feedback', if_exists=True)
+            op.create_index('ix_feedback_created_at_id', 'feedback', ['created_at', 'id'])
+        op.drop_index(
+            'ix_feedback_tags_tag_id', table_name='feedback_tags',
+            postgresql_concurrently=True, if_exists=True
+        )
+        for name, table, _ in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
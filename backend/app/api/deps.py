@@ -1,47 +1,96 @@
 from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.async_session import get_async_db, run_with_session
 from app.db.session import get_db
 from app.core.security import decode_access_token
-from app.models.user import User, UserRole
-from app.services.auth_service import AuthService
+from app.models.user import UserRole
+from app.services.analytics_service import AsyncAnalyticsService
+from app.services.auth_service import AsyncAuthService, AuthService
+from app.services.feedback_service import AsyncFeedbackService
+from app.services.principal_cache import Principal, principal_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
-    db: Annotated[Session, Depends(get_db)],
-    token: Annotated[str, Depends(oauth2_scheme)]
-) -> User:
-    """Get current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
+def client_ip(request: Request) -> str | None:
+    """The client's address; the proxy's headers are used with TRUST_PROXY_HEADERS."""
+    if settings.TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-real-ip") or request.headers.get("x-forwarded-for", "").split(",")[0]
+        if forwarded.strip():
+            return forwarded.strip()
+    return request.client.host if request.client else None
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def get_token_claims(
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> dict:
+    """Verified claims of the bearer access token."""
     payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
+    if payload is None or payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+async def get_current_user(
+    db: Annotated[Session, Depends(get_db)],
+    async_db: Annotated[AsyncSession | None, Depends(get_async_db)],
+    claims: Annotated[dict, Depends(get_token_claims)]
+) -> Principal:
+    """
+    Get current authenticated user from JWT token.
+    
+    The principal comes from the principal cache when it is there, so most
+    requests do not load the user row; a miss loads it on the async engine
+    in DB_ASYNC mode, else on the threadpool.
+    """
+    user_id = int(claims["sub"])
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
     
-    user_id = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    generation = principal_cache.generation
     
-    auth_service = AuthService(db)
-    user = auth_service.get_user_by_id(int(user_id))
+    def load(session: Session) -> Principal | None:
+        user = AuthService(session).get_user_by_id(user_id)
+        return Principal.from_user(user) if user is not None else None
     
-    if user is None:
-        raise credentials_exception
+    principal = await run_with_session(async_db if async_db is not None else db, load)
     
-    return user
+    if principal is None:
+        raise _credentials_exception()
+    
+    principal_cache.put(principal, generation)
+    return principal
 
 
-def get_current_admin(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
-    """Verify current user is an admin."""
+async def get_current_admin(
+    db: Annotated[Session, Depends(get_db)],
+    async_db: Annotated[AsyncSession | None, Depends(get_async_db)],
+    claims: Annotated[dict, Depends(get_token_claims)]
+) -> Principal:
+    """
+    Verify current user is an admin.
+    
+    Access tokens carry the role, so this needs no lookup; a role change
+    applies when the token is next refreshed. Tokens issued before the role
+    claim fall back to the user record.
+    """
+    if "role" in claims:
+        current_user = Principal.from_claims(claims)
+    else:
+        current_user = await get_current_user(db, async_db, claims)
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -51,6 +100,26 @@ def get_current_admin(
 
 
 # Type aliases for dependency injection
-CurrentUser = Annotated[User, Depends(get_current_user)]
-CurrentAdmin = Annotated[User, Depends(get_current_admin)]
+CurrentUser = Annotated[Principal, Depends(get_current_user)]
+CurrentAdmin = Annotated[Principal, Depends(get_current_admin)]
 DBSession = Annotated[Session, Depends(get_db)]
+AsyncDBSession = Annotated[AsyncSession | None, Depends(get_async_db)]
+
+
+# Services for the async routes: on the async engine in DB_ASYNC mode, else
+# on the sync session (which opens no connection unless it is used)
+async def get_feedback_service(db: DBSession, async_db: AsyncDBSession) -> AsyncFeedbackService:
+    return AsyncFeedbackService(async_db if async_db is not None else db)
+
+
+async def get_analytics_service(db: DBSession, async_db: AsyncDBSession) -> AsyncAnalyticsService:
+    return AsyncAnalyticsService(async_db if async_db is not None else db)
+
+
+async def get_auth_service(db: DBSession, async_db: AsyncDBSession) -> AsyncAuthService:
+    return AsyncAuthService(async_db if async_db is not None else db)
+
+
+FeedbackServiceDep = Annotated[AsyncFeedbackService, Depends(get_feedback_service)]
+AnalyticsServiceDep = Annotated[AsyncAnalyticsService, Depends(get_analytics_service)]
+AuthServiceDep = Annotated[AsyncAuthService, Depends(get_auth_service)]
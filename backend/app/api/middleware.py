@@ -0,0 +1,144 @@
+"""
+ASGI middleware for the API.
+
+Written as plain ASGI callables rather than BaseHTTPMiddleware so the
+request runs in the middleware's own context (context variables set here
+are visible to endpoints and dependencies) and streaming responses are
+passed through untouched.
+"""
+import math
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.deps import client_ip
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import decode_access_token
+from app.db.pool import pool_waits
+from app.db.query_stats import track_queries
+from app.services.rate_limit import rate_limiter
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements each HTTP request runs.
+
+    Per-route totals always go to the metrics registry. With
+    QUERY_STATS_HEADERS (or DEBUG) the count, total time and slowest
+    statement so far are also returned as X-DB-* response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and (settings.QUERY_STATS_HEADERS or settings.DEBUG):
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Query-Time-Ms"] = f"{stats.total_seconds * 1000:.2f}"
+                    if stats.slowest_statement is not None:
+                        headers["X-DB-Slowest-Query-Ms"] = f"{stats.slowest_seconds * 1000:.2f}"
+                        slowest = " ".join(stats.slowest_statement.split())[:200]
+                        headers["X-DB-Slowest-Query"] = slowest.encode("latin-1", "replace").decode("latin-1")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                # Label by route template so ids in paths do not create new series
+                route = scope.get("route")
+                label = getattr(route, "path", "unmatched")
+                metrics.inc("db_requests_total", route=label)
+                metrics.inc("db_queries_total", stats.count, route=label)
+                metrics.inc("db_query_seconds_total", stats.total_seconds, route=label)
+
+
+class RateLimitMiddleware:
+    """
+    Token buckets, concurrency caps and load shedding (RATE_LIMIT_* settings).
+
+    Decides on the event loop before routing, so a rejected request never
+    takes a threadpool thread or a database connection. In order:
+    - 503 for every request while pool checkouts wait longer than
+      LOAD_SHED_POOL_WAIT_SECONDS;
+    - 429 when the user's (or, without a valid token, the client IP's)
+      bucket, or its bucket for this path, is empty;
+    - 503 when the path already has its CONCURRENCY_LIMITS in flight.
+    Each decision is counted in rate_limit_decisions_total by decision and
+    route (the path if it has its own limits, else "other").
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "").rstrip("/") or "/"
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or path in settings.RATE_LIMIT_EXEMPT_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route = path if path in settings.RATE_LIMIT_ROUTES or path in settings.CONCURRENCY_LIMITS else "other"
+        now = time.monotonic()
+        if pool_waits.current_wait(now) > settings.LOAD_SHED_POOL_WAIT_SECONDS:
+            await self._reject(scope, receive, send, "shed_pool_wait", route, 503, 1)
+            return
+
+        key = _request_key(scope)
+        if key is not None:
+            limited = rate_limiter.take(key, path, now)
+            if limited is not None:
+                scope_name, retry_after = limited
+                await self._reject(scope, receive, send, f"limited_{scope_name}", route, 429, retry_after)
+                return
+
+        concurrency = settings.CONCURRENCY_LIMITS.get(path)
+        if concurrency is not None and not rate_limiter.acquire(path, concurrency):
+            await self._reject(scope, receive, send, "limited_concurrency", route, 503, 1)
+            return
+
+        metrics.inc("rate_limit_decisions_total", decision="allowed", route=route)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if concurrency is not None:
+                rate_limiter.release(path)
+
+    @staticmethod
+    async def _reject(
+        scope: Scope, receive: Receive, send: Send, decision: str, route: str, status_code: int, retry_after: float
+    ) -> None:
+        metrics.inc("rate_limit_decisions_total", decision=decision, route=route)
+        detail = "Too many requests, please retry later" if status_code == 429 else "Server busy, please retry shortly"
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+
+def _request_key(scope: Scope) -> str | None:
+    """The access token's user, else the client IP (None if neither is known)."""
+    request = Request(scope)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        claims = decode_access_token(token)
+        if claims is not None and claims.get("sub") is not None:
+            return f"user:{claims['sub']}"
+    ip = client_ip(request)
+    return f"ip:{ip}" if ip else None
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Query
-from typing import Optional
+import os
+import shutil
+import tempfile
 
-from app.api.deps import DBSession, CurrentAdmin
+from fastapi import APIRouter, BackgroundTasks, File, HTTPException, Query, UploadFile, status as http_status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import sessionmaker
+from typing import Literal, Optional
+
+from app.api.deps import DBSession, CurrentAdmin, FeedbackServiceDep
+from app.core.metrics import metrics
+from app.core.pagination import CountStrategy
 from app.schemas.feedback import (
     FeedbackListResponse,
     FeedbackResponse,
@@ -10,79 +18,244 @@ from app.schemas.feedback import (
     TagsUpdateRequest,
     AdminResponseCreate,
     AdminResponseResponse,
+    BulkCategoryRequest,
+    BulkStatusRequest,
+    BulkTagsRequest,
+    BulkUpdateResponse,
+    FeedbackImportStatus,
+    SentimentBackfillStatus,
 )
-from app.services.feedback_service import FeedbackService
-from app.models.feedback import FeedbackStatus
+from app.services.feedback_bulk import BulkFeedbackService
+from app.services.feedback_export import MEDIA_TYPES, FeedbackExport, parse_columns
+from app.services.feedback_import import FeedbackImport, ImportProgress, detect_format
+from app.services.sentiment_backfill import SentimentBackfill
+from app.models.feedback import FeedbackStatus, SentimentLabel
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+# Import started from the API in this worker process (large files are better
+# loaded with `python -m app.cli import-feedback`, which scores in parallel)
+_import: FeedbackImport | None = None
+
 
 @router.get("/feedback", response_model=FeedbackListResponse)
-def get_all_feedback(
-    db: DBSession,
+async def get_all_feedback(
+    service: FeedbackServiceDep,
     admin: CurrentAdmin,
     status: Optional[FeedbackStatus] = Query(None),
     category_id: Optional[int] = Query(None),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page; empty for the first page"),
+    count: Optional[CountStrategy] = Query(None, description="Total to compute; defaults to exact in page mode, none with a cursor")
 ):
     """Get all feedback (admin only)."""
-    service = FeedbackService(db)
-    return service.get_all_feedback(
+    return await service.get_all_feedback(
         status=status,
         category_id=category_id,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        count=count
+    )
+
+
+@router.get("/feedback/export")
+def export_feedback(
+    db: DBSession,
+    admin: CurrentAdmin,
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    status: Optional[FeedbackStatus] = Query(None),
+    category_id: Optional[int] = Query(None),
+    sentiment_label: Optional[SentimentLabel] = Query(None),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to include; default all"),
+    gzip: bool = Query(False, description="Compress the file with gzip")
+):
+    """Stream every matching feedback item as NDJSON or CSV (admin only)."""
+    try:
+        selected = parse_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    export = FeedbackExport(
+        sessionmaker(bind=db.get_bind()),
+        format=format,
+        columns=selected,
+        status=status,
+        category_id=category_id,
+        sentiment_label=sentiment_label
+    )
+    filename = f"feedback.{format}.gz" if gzip else f"feedback.{format}"
+    return StreamingResponse(
+        export.stream(compress=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 
 @router.put("/feedback/{feedback_id}/status", response_model=FeedbackResponse)
-def update_feedback_status(
+async def update_feedback_status(
     feedback_id: int,
     request: StatusUpdateRequest,
-    db: DBSession,
+    service: FeedbackServiceDep,
     admin: CurrentAdmin
 ):
     """Update feedback status (admin only)."""
-    service = FeedbackService(db)
-    feedback = service.update_status(feedback_id, admin.id, request.status)
-    return FeedbackResponse.model_validate(feedback)
+    return await service.update_status(feedback_id, admin.id, request.status)
 
 
 @router.put("/feedback/{feedback_id}/category", response_model=FeedbackResponse)
-def update_feedback_category(
+async def update_feedback_category(
     feedback_id: int,
     request: CategoryUpdateRequest,
-    db: DBSession,
+    service: FeedbackServiceDep,
     admin: CurrentAdmin
 ):
     """Update feedback category (admin only)."""
-    service = FeedbackService(db)
-    feedback = service.update_category(feedback_id, request.category_id)
-    return FeedbackResponse.model_validate(feedback)
+    return await service.update_category(feedback_id, request.category_id)
 
 
 @router.put("/feedback/{feedback_id}/tags", response_model=FeedbackResponse)
-def update_feedback_tags(
+async def update_feedback_tags(
     feedback_id: int,
     request: TagsUpdateRequest,
-    db: DBSession,
+    service: FeedbackServiceDep,
     admin: CurrentAdmin
 ):
     """Update feedback tags (admin only)."""
-    service = FeedbackService(db)
-    feedback = service.update_tags(feedback_id, request.tag_ids)
-    return FeedbackResponse.model_validate(feedback)
+    return await service.update_tags(feedback_id, request.tag_ids)
+
+
+@router.post("/feedback/bulk/status", response_model=BulkUpdateResponse)
+def bulk_update_status(
+    request: BulkStatusRequest,
+    db: DBSession,
+    admin: CurrentAdmin
+):
+    """Update the status of many feedback items by ids or filter (admin only)."""
+    service = BulkFeedbackService(db)
+    return service.update_status(request, admin.id, request.status)
+
+
+@router.post("/feedback/bulk/category", response_model=BulkUpdateResponse)
+def bulk_update_category(
+    request: BulkCategoryRequest,
+    db: DBSession,
+    admin: CurrentAdmin
+):
+    """Set the category of many feedback items by ids or filter (admin only)."""
+    service = BulkFeedbackService(db)
+    return service.update_category(request, request.category_id)
+
+
+@router.post("/feedback/bulk/tags", response_model=BulkUpdateResponse)
+def bulk_update_tags(
+    request: BulkTagsRequest,
+    db: DBSession,
+    admin: CurrentAdmin
+):
+    """Add, remove or replace tags on many feedback items (admin only)."""
+    service = BulkFeedbackService(db)
+    return service.update_tags(request, request.tag_ids, request.mode)
+
+
+@router.post(
+    "/feedback/import",
+    response_model=FeedbackImportStatus,
+    status_code=http_status.HTTP_202_ACCEPTED,
+)
+def start_feedback_import(
+    db: DBSession,
+    admin: CurrentAdmin,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Defaults to the file extension"),
+    offset: Optional[int] = Query(None, ge=0, description="Skip this many records"),
+    resume: bool = Query(False, description="Continue after the last committed batch of this file name"),
+    create_missing: bool = Query(True, description="Create unknown categories and tags")
+):
+    """Import feedback from a CSV or NDJSON upload, in the background (admin only)."""
+    global _import
+    if _import is not None and _import.progress.running:
+        raise HTTPException(
+            status_code=http_status.HTTP_409_CONFLICT,
+            detail="Feedback import already running"
+        )
+    try:
+        format = format or detect_format(file.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # The upload is closed when the response is sent, so the import reads a copy
+    with tempfile.NamedTemporaryFile(delete=False) as copy:
+        shutil.copyfileobj(file.file, copy)
+    
+    _import = FeedbackImport(
+        copy.name,
+        owner_id=admin.id,
+        format=format,
+        session_factory=sessionmaker(bind=db.get_bind()),
+        create_missing=create_missing,
+        name=file.filename
+    )
+    _import.progress.running = True
+    background_tasks.add_task(_run_import, _import, offset=offset, resume=resume)
+    return _import.progress
+
+
+def _run_import(job: FeedbackImport, **kwargs) -> None:
+    try:
+        job.run(**kwargs)
+    finally:
+        os.unlink(job.path)
+
+
+@router.get("/feedback/import", response_model=FeedbackImportStatus)
+def get_feedback_import(admin: CurrentAdmin):
+    """Get progress and rejected rows of the last import started from this worker."""
+    if _import is None:
+        return ImportProgress(name="")
+    return _import.progress
 
 
 @router.post("/feedback/{feedback_id}/respond", response_model=AdminResponseResponse)
-def respond_to_feedback(
+async def respond_to_feedback(
     feedback_id: int,
     request: AdminResponseCreate,
-    db: DBSession,
+    service: FeedbackServiceDep,
     admin: CurrentAdmin
 ):
     """Add admin response to feedback."""
-    service = FeedbackService(db)
-    response = service.add_admin_response(feedback_id, admin.id, request)
-    return AdminResponseResponse.model_validate(response)
+    return await service.add_admin_response(feedback_id, admin.id, request)
+
+
+@router.get("/metrics")
+def get_metrics(admin: CurrentAdmin):
+    """Get in-process counters and gauges for this worker (admin only)."""
+    return metrics.snapshot()
+
+
+@router.post(
+    "/sentiment/backfill",
+    response_model=SentimentBackfillStatus,
+    status_code=http_status.HTTP_202_ACCEPTED,
+)
+def request_sentiment_backfill(
+    db: DBSession,
+    admin: CurrentAdmin,
+    restart: bool = Query(False)
+):
+    """
+    Request a re-score of feedback whose sentiment_version is stale. The
+    run happens outside the web process, in
+    `python -m app.cli backfill-sentiment --if-requested`.
+    """
+    backfill = SentimentBackfill()
+    backfill.request(db, restart=restart)
+    return backfill.status(db)
+
+
+@router.get("/sentiment/backfill", response_model=SentimentBackfillStatus)
+def get_sentiment_backfill(db: DBSession, admin: CurrentAdmin):
+    """Get the pending request and checkpoint of the current version's backfill."""
+    return SentimentBackfill().status(db)
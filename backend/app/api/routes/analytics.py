@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Query
 
-from app.api.deps import DBSession, CurrentAdmin
+from app.api.deps import AnalyticsServiceDep, CurrentAdmin
 from app.schemas.analytics import (
     OverviewStats,
     TimeseriesResponse,
@@ -9,71 +9,70 @@ from app.schemas.analytics import (
     SentimentTrendsResponse,
     TopicsResponse,
 )
-from app.services.analytics_service import AnalyticsService
+from app.services.topic_model import topic_refresher
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 
 @router.get("/overview", response_model=OverviewStats)
-def get_overview(
-    db: DBSession,
+async def get_overview(
+    service: AnalyticsServiceDep,
     admin: CurrentAdmin
 ):
     """Get overview statistics."""
-    service = AnalyticsService(db)
-    return service.get_overview()
+    return await service.get_overview()
 
 
 @router.get("/timeseries", response_model=TimeseriesResponse)
-def get_timeseries(
-    db: DBSession,
+async def get_timeseries(
+    service: AnalyticsServiceDep,
     admin: CurrentAdmin,
     days: int = Query(30, ge=1, le=365)
 ):
     """Get feedback volume over time."""
-    service = AnalyticsService(db)
-    return service.get_timeseries(days=days)
+    return await service.get_timeseries(days=days)
 
 
 @router.get("/top-tags", response_model=TopTagsResponse)
-def get_top_tags(
-    db: DBSession,
+async def get_top_tags(
+    service: AnalyticsServiceDep,
     admin: CurrentAdmin,
     limit: int = Query(10, ge=1, le=50)
 ):
     """Get top tags by feedback count."""
-    service = AnalyticsService(db)
-    return service.get_top_tags(limit=limit)
+    return await service.get_top_tags(limit=limit)
 
 
 @router.get("/top-categories", response_model=TopCategoriesResponse)
-def get_top_categories(
-    db: DBSession,
+async def get_top_categories(
+    service: AnalyticsServiceDep,
     admin: CurrentAdmin,
     limit: int = Query(10, ge=1, le=50)
 ):
     """Get top categories by feedback count."""
-    service = AnalyticsService(db)
-    return service.get_top_categories(limit=limit)
+    return await service.get_top_categories(limit=limit)
 
 
 @router.get("/sentiment-trends", response_model=SentimentTrendsResponse)
-def get_sentiment_trends(
-    db: DBSession,
+async def get_sentiment_trends(
+    service: AnalyticsServiceDep,
     admin: CurrentAdmin,
     days: int = Query(30, ge=1, le=365)
 ):
     """Get sentiment score trends over time."""
-    service = AnalyticsService(db)
-    return service.get_sentiment_trends(days=days)
+    return await service.get_sentiment_trends(days=days)
 
 
 @router.get("/topics", response_model=TopicsResponse)
-def get_topics(
-    db: DBSession,
+async def get_topics(
+    service: AnalyticsServiceDep,
     admin: CurrentAdmin,
     k: int = Query(5, ge=2, le=20)
 ):
-    """Get topic clusters from feedback content."""
-    service = AnalyticsService(db)
-    return service.get_topics(k=k)
+    """Get topic clusters from the latest persisted snapshot."""
+    topics = await service.get_topics(k=k)
+    # Fitting is CPU-bound and never runs in the request: the topic
+    # refresher thread (or `python -m app.cli refresh-topics`) fits a
+    # pending k; watching it wakes the refresher
+    topic_refresher.watch(k)
+    return topics
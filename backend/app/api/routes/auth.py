@@ -1,35 +1,52 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Annotated
 
-from app.api.deps import DBSession, CurrentUser
-from app.schemas.auth import Token, RegisterRequest
+from app.api.deps import AuthServiceDep, CurrentUser, client_ip
+from app.schemas.auth import Token, RefreshRequest, RegisterRequest
 from app.schemas.user import UserResponse
-from app.services.auth_service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse)
-def register(
+async def register(
     request: RegisterRequest,
-    db: DBSession
+    auth_service: AuthServiceDep
 ):
     """Register a new user."""
-    auth_service = AuthService(db)
-    return auth_service.register(request)
+    return await auth_service.register(request)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: DBSession
+    auth_service: AuthServiceDep,
+    http_request: Request
 ):
     """Login and get access token."""
     from app.schemas.auth import LoginRequest
-    auth_service = AuthService(db)
     request = LoginRequest(email=form_data.username, password=form_data.password)
-    return auth_service.login(request)
+    return await auth_service.login(request, client_ip(http_request))
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(
+    request: RefreshRequest,
+    auth_service: AuthServiceDep
+):
+    """Exchange a refresh token for new tokens (checks the user's token version)."""
+    return await auth_service.refresh(request.refresh_token)
+
+
+@router.post("/logout")
+async def logout(
+    current_user: CurrentUser,
+    auth_service: AuthServiceDep
+):
+    """Revoke every refresh token of the current user (access tokens expire on their own)."""
+    await auth_service.revoke_tokens(current_user.id)
+    return {"message": "Logged out"}
 
 
 @router.get("/me", response_model=UserResponse)
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.api.deps import DBSession, CurrentAdmin, CurrentUser
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.models.category import Category
+from app.services.catalog import catalog_cache, etag_matches
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.get("/", response_model=list[CategoryResponse])
 def list_categories(
+    request: Request,
+    response: Response,
     db: DBSession,
     current_user: CurrentUser
 ):
-    """List all categories."""
-    categories = db.query(Category).order_by(Category.name).all()
-    return [CategoryResponse.model_validate(c) for c in categories]
+    """
+    List all categories.
+    
+    Served from the catalog cache. The ETag is the catalog version, so a
+    client sending it back in If-None-Match gets 304 until categories change.
+    """
+    version, categories = catalog_cache.list_categories(db)
+    etag = f'"categories-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return categories
 
 
 @router.post("/", response_model=CategoryResponse)
@@ -34,8 +47,10 @@ def create_category(
     
     category = Category(name=request.name)
     db.add(category)
+    version = catalog_cache.bump(db)
     db.commit()
     db.refresh(category)
+    catalog_cache.invalidate(version)
     
     return CategoryResponse.model_validate(category)
 
@@ -68,8 +83,10 @@ def update_category(
             )
         category.name = request.name
     
+    version = catalog_cache.bump(db)
     db.commit()
     db.refresh(category)
+    catalog_cache.invalidate(version)
     
     return CategoryResponse.model_validate(category)
 
@@ -89,6 +106,8 @@ def delete_category(
         )
     
     db.delete(category)
+    version = catalog_cache.bump(db)
     db.commit()
+    catalog_cache.invalidate(version)
     
     return {"message": "Category deleted successfully"}
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Query
 from typing import Optional
 
-from app.api.deps import DBSession, CurrentUser
+from app.api.deps import CurrentUser, FeedbackServiceDep
+from app.core.pagination import CountStrategy
 from app.schemas.feedback import (
     FeedbackCreate,
     FeedbackUpdate,
@@ -9,51 +10,50 @@ from app.schemas.feedback import (
     FeedbackListResponse,
     FeedbackDetailResponse,
 )
-from app.services.feedback_service import FeedbackService
 from app.models.feedback import FeedbackStatus
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
 
 @router.post("/", response_model=FeedbackResponse)
-def create_feedback(
+async def create_feedback(
     request: FeedbackCreate,
-    db: DBSession,
+    service: FeedbackServiceDep,
     current_user: CurrentUser
 ):
     """Create new feedback."""
-    service = FeedbackService(db)
-    feedback = service.create_feedback(current_user.id, request)
-    return FeedbackResponse.model_validate(feedback)
+    return await service.create_feedback(current_user.id, request)
 
 
 @router.get("/mine", response_model=FeedbackListResponse)
-def get_my_feedback(
-    db: DBSession,
+async def get_my_feedback(
+    service: FeedbackServiceDep,
     current_user: CurrentUser,
     status: Optional[FeedbackStatus] = Query(None),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page; empty for the first page"),
+    count: Optional[CountStrategy] = Query(None, description="Total to compute; defaults to exact in page mode, none with a cursor")
 ):
     """Get current user's feedback list."""
-    service = FeedbackService(db)
-    return service.get_user_feedback(
+    return await service.get_user_feedback(
         user_id=current_user.id,
         status=status,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        count=count
     )
 
 
 @router.get("/{feedback_id}", response_model=FeedbackDetailResponse)
-def get_feedback(
+async def get_feedback(
     feedback_id: int,
-    db: DBSession,
+    service: FeedbackServiceDep,
     current_user: CurrentUser
 ):
     """Get feedback by ID (owner or admin only)."""
-    service = FeedbackService(db)
-    feedback = service.get_feedback_by_id(feedback_id)
+    feedback = await service.get_feedback_by_id(feedback_id)
     
     if not feedback:
         from fastapi import HTTPException, status
@@ -71,29 +71,26 @@ def get_feedback(
             detail="Not authorized to view this feedback"
         )
     
-    return FeedbackDetailResponse.model_validate(feedback)
+    return feedback
 
 
 @router.put("/{feedback_id}", response_model=FeedbackResponse)
-def update_feedback(
+async def update_feedback(
     feedback_id: int,
     request: FeedbackUpdate,
-    db: DBSession,
+    service: FeedbackServiceDep,
     current_user: CurrentUser
 ):
     """Update feedback (owner only, if not resolved)."""
-    service = FeedbackService(db)
-    feedback = service.update_feedback(feedback_id, current_user.id, request)
-    return FeedbackResponse.model_validate(feedback)
+    return await service.update_feedback(feedback_id, current_user.id, request)
 
 
 @router.delete("/{feedback_id}")
-def delete_feedback(
+async def delete_feedback(
     feedback_id: int,
-    db: DBSession,
+    service: FeedbackServiceDep,
     current_user: CurrentUser
 ):
     """Delete feedback (owner only, if not resolved)."""
-    service = FeedbackService(db)
-    service.delete_feedback(feedback_id, current_user.id)
+    await service.delete_feedback(feedback_id, current_user.id)
     return {"message": "Feedback deleted successfully"}
@@ -1,20 +1,33 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.api.deps import DBSession, CurrentAdmin, CurrentUser
 from app.schemas.tag import TagCreate, TagUpdate, TagResponse
 from app.models.tag import Tag
+from app.services.catalog import catalog_cache, etag_matches
 
 router = APIRouter(prefix="/tags", tags=["Tags"])
 
 
 @router.get("/", response_model=list[TagResponse])
 def list_tags(
+    request: Request,
+    response: Response,
     db: DBSession,
     current_user: CurrentUser
 ):
-    """List all tags."""
-    tags = db.query(Tag).order_by(Tag.name).all()
-    return [TagResponse.model_validate(t) for t in tags]
+    """
+    List all tags.
+    
+    Served from the catalog cache. The ETag is the catalog version, so a
+    client sending it back in If-None-Match gets 304 until tags change.
+    """
+    version, tags = catalog_cache.list_tags(db)
+    etag = f'"tags-{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return tags
 
 
 @router.post("/", response_model=TagResponse)
@@ -34,8 +47,10 @@ def create_tag(
     
     tag = Tag(name=request.name)
     db.add(tag)
+    version = catalog_cache.bump(db)
     db.commit()
     db.refresh(tag)
+    catalog_cache.invalidate(version)
     
     return TagResponse.model_validate(tag)
 
@@ -68,8 +83,10 @@ def update_tag(
             )
         tag.name = request.name
     
+    version = catalog_cache.bump(db)
     db.commit()
     db.refresh(tag)
+    catalog_cache.invalidate(version)
     
     return TagResponse.model_validate(tag)
 
@@ -89,6 +106,8 @@ def delete_tag(
         )
     
     db.delete(tag)
+    version = catalog_cache.bump(db)
     db.commit()
+    catalog_cache.invalidate(version)
     
     return {"message": "Tag deleted successfully"}
@@ -0,0 +1,124 @@
+"""
+Command-line entry point for maintenance jobs.
+Run with: python -m app.cli <command> [options]
+"""
+import argparse
+import logging
+import os
+
+from app.core.config import settings
+
+
+def backfill_sentiment(args: argparse.Namespace) -> None:
+    """Re-score feedback rows whose sentiment_version is stale."""
+    from app.services.sentiment_backfill import SentimentBackfill
+
+    backfill = SentimentBackfill(
+        chunk_size=args.chunk_size,
+        processes=args.processes,
+        pause_seconds=args.pause,
+    )
+    if args.if_requested:
+        if backfill.run_requested(max_chunks=args.max_chunks) is None:
+            logging.getLogger(__name__).info("No sentiment backfill requested")
+        return
+    backfill.run(restart=args.restart, max_chunks=args.max_chunks)
+
+
+def reconcile_daily_stats(args: argparse.Namespace) -> None:
+    """Rebuild the feedback_daily_stats rollup from the feedback table."""
+    from app.db.session import SessionLocal
+    from app.services.daily_stats import DailyStatsService
+
+    db = SessionLocal()
+    try:
+        DailyStatsService(db).reconcile()
+    finally:
+        db.close()
+
+
+def refresh_topics(args: argparse.Namespace) -> None:
+    """Fit topic snapshots for the given cluster counts."""
+    from app.db.session import SessionLocal
+    from app.services.topic_model import refresh_topics as refresh
+
+    for k in args.k or settings.TOPICS_DEFAULT_K:
+        refresh(SessionLocal, k)
+
+
+def import_feedback(args: argparse.Namespace) -> None:
+    """Import feedback from a CSV or NDJSON file."""
+    from app.db.session import SessionLocal
+    from app.models.user import User
+    from app.services.feedback_import import FeedbackImport
+
+    db = SessionLocal()
+    try:
+        owner_id = db.query(User.id).filter(User.email == args.owner_email).scalar()
+    finally:
+        db.close()
+    if owner_id is None:
+        raise SystemExit(f"No user with email {args.owner_email}")
+
+    job = FeedbackImport(
+        args.path,
+        owner_id=owner_id,
+        format=args.format,
+        batch_size=args.batch_size,
+        processes=args.processes,
+        create_missing=not args.no_create,
+    )
+    progress = job.run(offset=args.offset, resume=args.resume)
+    for error in progress.errors:
+        print(f"row {error['row']}: {error['error']}")
+    print(f"{progress.imported} imported, {progress.failed} rejected, {progress.offset} records read")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-sentiment", help=backfill_sentiment.__doc__)
+    backfill.add_argument("--chunk-size", type=int, default=settings.SENTIMENT_BACKFILL_CHUNK_SIZE)
+    backfill.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                          help="scoring processes (0 or 1 scores in-process)")
+    backfill.add_argument("--pause", type=float, default=settings.SENTIMENT_BACKFILL_PAUSE_SECONDS,
+                          help="seconds to sleep between chunks (throttle)")
+    backfill.add_argument("--max-chunks", type=int, default=None)
+    backfill.add_argument("--restart", action="store_true",
+                          help="ignore the checkpoint and rescan from the first row")
+    backfill.add_argument("--if-requested", action="store_true",
+                          help="run only if requested through POST /admin/sentiment/backfill")
+    backfill.set_defaults(handler=backfill_sentiment)
+
+    reconcile = commands.add_parser("reconcile-daily-stats", help=reconcile_daily_stats.__doc__)
+    reconcile.set_defaults(handler=reconcile_daily_stats)
+
+    topics = commands.add_parser("refresh-topics", help=refresh_topics.__doc__)
+    topics.add_argument("--k", type=int, action="append",
+                        help="cluster count, repeatable (default: TOPICS_DEFAULT_K)")
+    topics.set_defaults(handler=refresh_topics)
+
+    importer = commands.add_parser("import-feedback", help=import_feedback.__doc__)
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "ndjson"], default=None,
+                          help="default: from the file extension")
+    importer.add_argument("--owner-email", default=settings.ADMIN_EMAIL,
+                          help="owner of records without user_email")
+    importer.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    importer.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                          help="scoring processes (0 or 1 scores in-process)")
+    importer.add_argument("--offset", type=int, default=None, help="skip this many records")
+    importer.add_argument("--resume", action="store_true",
+                          help="continue after the last committed batch of this file")
+    importer.add_argument("--no-create", action="store_true",
+                          help="reject records with unknown categories or tags instead of creating them")
+    importer.set_defaults(handler=import_feedback)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,3 +1,5 @@
+import os
+
 from pydantic_settings import BaseSettings
 
 
@@ -8,13 +10,136 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "postgresql://postgres:postgres@db:5432/feedback_db"
+    # Connections per worker process: pool_size kept open, up to max_overflow
+    # more under load, then checkouts wait up to the timeout
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # Serve the feedback, analytics and auth routes through AsyncSession on
+    # an async driver, so a request waiting on the database holds no thread.
+    # The async URL defaults to DATABASE_URL with the async driver
+    # (postgresql+asyncpg, sqlite+aiosqlite). Other routes stay on the sync
+    # engine, which keeps its own pool.
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: str | None = None
     
     # JWT Authentication
     # IMPORTANT: Set SECRET_KEY via environment variable in production!
     # The default is for local development only and is NOT secure.
     SECRET_KEY: str = "dev-only-secret-change-in-production"
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24  # 24 hours
+    # Access tokens carry the role and are not checked against the database,
+    # so keep them short; refresh tokens are checked at /auth/refresh
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    
+    # Password hashing runs on its own threads (bcrypt is CPU-bound, so no
+    # more than the cores); at most this many more requests wait for one
+    # (others get 503), and none waits longer than the timeout
+    PASSWORD_HASH_WORKERS: int = min(4, os.cpu_count() or 1)
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 5
+    # Failed logins allowed per account and per client IP within the window
+    # before further attempts get 429
+    LOGIN_FAILURE_WINDOW_SECONDS: float = 300
+    LOGIN_MAX_FAILURES_PER_ACCOUNT: int = 5
+    LOGIN_MAX_FAILURES_PER_IP: int = 50
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    # Take the client IP from X-Real-IP / X-Forwarded-For (set behind nginx)
+    TRUST_PROXY_HEADERS: bool = False
+    
+    # Sentiment analysis
+    # When enabled, new feedback is stored with a "pending" label and scored
+    # by the background enrichment workers instead of on the request thread.
+    SENTIMENT_ASYNC: bool = False
+    SENTIMENT_WORKERS: int = 2
+    SENTIMENT_BATCH_SIZE: int = 64
+    SENTIMENT_BATCH_WAIT_SECONDS: float = 0.2
+    # Retries of a batch that failed to write (backoff doubles each time)
+    SENTIMENT_RETRY_ATTEMPTS: int = 3
+    SENTIMENT_RETRY_BACKOFF_SECONDS: float = 1.0
+    # Memoized (score, label) results keyed by text hash; 0 disables the cache
+    SENTIMENT_CACHE_SIZE: int = 10000
+    # Backfill of rows scored by an older lexicon version
+    SENTIMENT_BACKFILL_CHUNK_SIZE: int = 500
+    SENTIMENT_BACKFILL_PAUSE_SECONDS: float = 0.05
+    
+    # Topic clustering
+    # /analytics/topics serves persisted snapshots; a background job refits
+    # a k once its snapshot is older than the interval or enough new
+    # feedback has arrived.
+    TOPICS_REFRESH_ENABLED: bool = True
+    TOPICS_REFRESH_CHECK_SECONDS: int = 60
+    TOPICS_REFRESH_INTERVAL_SECONDS: int = 60 * 60
+    TOPICS_REFRESH_NEW_ROWS: int = 200
+    TOPICS_DEFAULT_K: list[int] = [5]
+    TOPICS_SNAPSHOT_RETENTION: int = 3  # snapshots kept per k
+    # A worker that dies mid-fit blocks other workers from refitting its k
+    # for at most this long
+    TOPICS_REFRESH_LEASE_SECONDS: int = 30 * 60
+    # Corpora this large are clustered with the bounded-memory streaming engine
+    TOPICS_STREAMING_MIN_ROWS: int = 20000
+    TOPICS_STREAM_CHUNK_SIZE: int = 2000
+    
+    # List totals requested with count=cached are reused per filter
+    # combination for this long (and dropped on writes in this process)
+    FEEDBACK_COUNT_CACHE_TTL_SECONDS: float = 30
+    FEEDBACK_COUNT_CACHE_SIZE: int = 1024
+    
+    # Authenticated principals (id, email, role) are reused per user for this
+    # long; changes committed in this process drop the entry at once
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    # Verified access tokens whose claims are reused until their exp
+    TOKEN_CACHE_SIZE: int = 10000
+    
+    # SQL accounting: per-route statement counts are always exported to
+    # /admin/metrics; X-DB-* response headers are added when this or DEBUG
+    # is on. Statements slower than SLOW_QUERY_LOG_MS are logged.
+    QUERY_STATS_HEADERS: bool = False
+    SLOW_QUERY_LOG_MS: float = 500
+    
+    # Bulk admin updates: rows locked and committed per chunk, and the most
+    # items one request (id list or filter) may touch
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 10000
+    
+    # Feedback import: records per committed batch, and how many rejected
+    # records are kept in the progress report
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_ERRORS: int = 1000
+    
+    # Feedback export: rows fetched from the server-side cursor and encoded
+    # per chunk of the streamed response
+    EXPORT_CHUNK_SIZE: int = 1000
+    
+    # Category/tag catalog cache: how often each process reads the shared
+    # catalog version to pick up changes made by other workers
+    CATALOG_VERSION_CHECK_SECONDS: float = 5
+    
+    # Rate limiting and load shedding, per worker process. Requests are keyed
+    # by the access token's user, or by client IP without one. Each key has
+    # a token bucket (requests per second, burst) for all routes, and a
+    # tighter one for each path in RATE_LIMIT_ROUTES; over either is 429.
+    # Paths in CONCURRENCY_LIMITS are capped at that many requests in
+    # flight across all users, and every request is shed while pool
+    # checkouts wait longer than LOAD_SHED_POOL_WAIT_SECONDS (both 503).
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_SECOND: float = 20
+    RATE_LIMIT_BURST: int = 60
+    RATE_LIMIT_ROUTES: dict[str, tuple[float, int]] = {
+        "/analytics/topics": (1, 5),
+        "/admin/feedback": (5, 20),
+        "/admin/feedback/export": (0.1, 2),
+    }
+    CONCURRENCY_LIMITS: dict[str, int] = {
+        "/analytics/topics": 4,
+        "/admin/feedback": 8,
+        "/admin/feedback/export": 2,
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_EXEMPT_PATHS: list[str] = ["/", "/health", "/admin/metrics"]
+    LOAD_SHED_POOL_WAIT_SECONDS: float = 1
     
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:3000"]
@@ -0,0 +1,71 @@
+"""
+In-process metrics registry.
+
+Counters and gauges are kept in memory per worker process and exposed as
+JSON by GET /admin/metrics. Gauges can be registered as callbacks so values
+such as queue depth are read at scrape time.
+"""
+import threading
+from typing import Callable
+
+
+def _key(name: str, labels: dict[str, str]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._gauge_callbacks: dict[str, Callable[[], float]] = {}
+        self._counter_callbacks: dict[str, Callable[[], float]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge to an absolute value."""
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], float], **labels: str) -> None:
+        """Register a gauge whose value is computed when metrics are read."""
+        with self._lock:
+            self._gauge_callbacks[_key(name, labels)] = callback
+
+    def register_counter(self, name: str, callback: Callable[[], float], **labels: str) -> None:
+        """Register a counter maintained elsewhere (e.g. by a cache) and read at scrape time."""
+        with self._lock:
+            self._counter_callbacks[_key(name, labels)] = callback
+
+    def get(self, name: str, **labels: str) -> float:
+        """Current value of a counter or gauge (0 if never recorded)."""
+        key = _key(name, labels)
+        with self._lock:
+            callback = self._gauge_callbacks.get(key) or self._counter_callbacks.get(key)
+            if callback is None:
+                return self._counters.get(key, self._gauges.get(key, 0))
+        return callback()
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Return all counters and gauges."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            gauge_callbacks = dict(self._gauge_callbacks)
+            counter_callbacks = dict(self._counter_callbacks)
+        for key, callback in gauge_callbacks.items():
+            gauges[key] = callback()
+        for key, callback in counter_callbacks.items():
+            counters[key] = callback()
+        return {"counters": counters, "gauges": gauges}
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,55 @@
+"""
+Opaque cursors for keyset pagination, and the count strategies list
+endpoints accept.
+
+A cursor holds the sort key (created_at, id) of the row a page continues
+from and the direction to read in, as URL-safe base64 JSON. Clients must
+treat it as opaque; only the service that issued it decodes it.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import NamedTuple
+
+from fastapi import HTTPException, status
+
+NEXT = "next"
+PREV = "prev"
+
+
+class CountStrategy(str, Enum):
+    """How a list endpoint computes its total (see app.services.feedback_counts)."""
+    EXACT = "exact"
+    NONE = "none"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: int
+    direction: str  # NEXT: rows after this key, PREV: rows before it
+
+
+def encode_cursor(created_at: datetime, id: int, direction: str) -> str:
+    """Encode a sort key and direction as an opaque cursor."""
+    payload = json.dumps({"t": created_at.isoformat(), "i": id, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Decode a cursor, rejecting anything this module did not produce."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor = Cursor(datetime.fromisoformat(payload["t"]), int(payload["i"]), payload["d"])
+        if cursor.direction not in (NEXT, PREV):
+            raise ValueError(cursor.direction)
+        return cursor
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
@@ -1,8 +1,13 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Any
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from .config import settings
+from .metrics import metrics
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -24,15 +29,110 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict[str, Any]]:
-    """Decode and validate a JWT access token."""
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a JWT refresh token (only accepted by /auth/refresh)."""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "type": "refresh"})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+class VerifiedTokenCache:
+    """
+    Claims of tokens that already passed verification, keyed by SHA-256 digest.
+
+    Clients reuse one token for many requests, so this skips the signature
+    check and JSON parsing after the first. An entry is dropped at the
+    token's exp, and every entry is dropped when SECRET_KEY or ALGORITHM
+    changes (key rotation). Tokens without exp are not cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self._key: tuple[str, str] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict[str, Any]]:
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            self._check_key()
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] > time.time():
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return dict(entry[0])
+            self._entries.pop(digest, None)
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict[str, Any], key: tuple[str, str]) -> None:
+        """Store claims verified with `key` (not stored if the key has rotated since)."""
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            self._check_key()
+            if key != self._key:
+                return
+            self._entries[digest] = (dict(claims), float(expires_at))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _check_key(self) -> None:
+        key = (settings.SECRET_KEY, settings.ALGORITHM)
+        if key != self._key:
+            self._entries.clear()
+            self._key = key
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+verified_tokens = VerifiedTokenCache(settings.TOKEN_CACHE_SIZE)
+metrics.register_counter("token_cache_hits_total", lambda: verified_tokens.hits)
+metrics.register_counter("token_cache_misses_total", lambda: verified_tokens.misses)
+metrics.register_gauge("token_cache_entries", verified_tokens.__len__)
+
+
+def _decode(token: str) -> Optional[dict[str, Any]]:
+    """Verified claims of any of our tokens (cached once verified)."""
+    payload = verified_tokens.get(token)
+    if payload is not None:
         return payload
+    key = (settings.SECRET_KEY, settings.ALGORITHM)
+    try:
+        payload = jwt.decode(token, key[0], algorithms=[key[1]])
     except JWTError:
         return None
+    verified_tokens.put(token, payload, key)
+    return payload
+
+
+def decode_access_token(token: str) -> Optional[dict[str, Any]]:
+    """Decode and validate a JWT access token (refresh tokens are rejected)."""
+    payload = _decode(token)
+    # Tokens issued before the type claim are access tokens
+    if payload is None or payload.get("type", "access") != "access":
+        return None
+    return payload
+
+
+def decode_refresh_token(token: str) -> Optional[dict[str, Any]]:
+    """Decode and validate a JWT refresh token."""
+    payload = _decode(token)
+    if payload is None or payload.get("type") != "refresh":
+        return None
+    return payload
@@ -0,0 +1,89 @@
+"""
+Async engine for DB_ASYNC mode.
+
+The async services run the existing ORM code through AsyncSession.run_sync:
+SQLAlchemy drives it in a greenlet on the event loop and every statement
+awaits the async driver, so the SQL is shared with the sync path. The engine
+is created on first use, so the async driver is only needed in this mode.
+"""
+from collections.abc import AsyncIterator, Callable
+from typing import TypeVar
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.pool import MonitoredAsyncQueuePool
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+def async_database_url(url: str) -> str:
+    """The same database with its dialect's async driver."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global _engine, _sessionmaker
+    if _sessionmaker is None:
+        url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+        pool_options = {}
+        # In-memory SQLite keeps the dialect's single shared connection
+        if make_url(url).database not in (None, "", ":memory:"):
+            pool_options = dict(
+                poolclass=MonitoredAsyncQueuePool,
+                pool_pre_ping=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            )
+        _engine = create_async_engine(url, **pool_options)
+        _sessionmaker = async_sessionmaker(_engine, autoflush=False)
+    return _sessionmaker
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = _sessionmaker = None
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession | None]:
+    """Dependency: an AsyncSession in DB_ASYNC mode, None on the sync path."""
+    if not settings.DB_ASYNC:
+        yield None
+        return
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def run_with_session(
+    db: Session | AsyncSession,
+    fn: Callable[[Session], T],
+    convert: Callable[[T], R] | None = None,
+) -> T | R:
+    """
+    fn(session) without blocking the event loop on the database: through
+    run_sync on an AsyncSession, on the threadpool for a sync Session.
+
+    run_sync runs fn on the event loop, so fn should only do the database
+    work; convert(result), such as building response schemas, runs on the
+    threadpool afterwards (in the same threadpool call for a sync Session).
+    """
+    if isinstance(db, AsyncSession):
+        result = await db.run_sync(fn)
+        return await run_in_threadpool(convert, result) if convert is not None else result
+    if convert is not None:
+        return await run_in_threadpool(lambda: convert(fn(db)))
+    return await run_in_threadpool(fn, db)
@@ -9,6 +9,9 @@ from app.models.tag import Tag
 from app.models.feedback_tag import FeedbackTag
 from app.models.status_event import StatusEvent
 from app.models.admin_response import AdminResponse
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.feedback_daily_stats import FeedbackDailyStats
+from app.models.topic_snapshot import TopicSnapshot
 
 __all__ = [
     "Base",
@@ -19,4 +22,7 @@ __all__ = [
     "FeedbackTag",
     "StatusEvent",
     "AdminResponse",
+    "JobCheckpoint",
+    "FeedbackDailyStats",
+    "TopicSnapshot",
 ]
@@ -0,0 +1,54 @@
+"""
+Portable SQL expressions that need dialect-specific SQL.
+
+PostgreSQL runs in production and SQLite in the test suite, so anything
+beyond standard SQL is compiled per dialect here instead of being spelled
+out in services.
+"""
+from sqlalchemy import Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class seconds_between(FunctionElement):
+    """Seconds elapsed from the first timestamp to the second, as a float."""
+    type = Float()
+    name = "seconds_between"
+    inherit_cache = True
+
+
+@compiles(seconds_between)
+def _seconds_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return f"EXTRACT(EPOCH FROM ({compiler.process(end, **kw)} - {compiler.process(start, **kw)}))"
+
+
+@compiles(seconds_between, "sqlite")
+def _seconds_between_sqlite(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return (
+        f"((julianday({compiler.process(end, **kw)}) - "
+        f"julianday({compiler.process(start, **kw)})) * 86400.0)"
+    )
+
+
+class timestamp_key(FunctionElement):
+    """
+    A timestamp in a form that sorts and compares correctly.
+
+    PostgreSQL compares timestamps natively. SQLite stores them as text whose
+    format depends on how the row was written (CURRENT_TIMESTAMP has no
+    fractional seconds, Python values do), so it compares julianday() values.
+    """
+    name = "timestamp_key"
+    inherit_cache = True
+
+
+@compiles(timestamp_key)
+def _timestamp_key_default(element, compiler, **kw):
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(timestamp_key, "sqlite")
+def _timestamp_key_sqlite(element, compiler, **kw):
+    return f"julianday({compiler.process(list(element.clauses)[0], **kw)})"
@@ -0,0 +1,88 @@
+"""
+Connection pool checkout timing.
+
+The API engines use MonitoredQueuePool (MonitoredAsyncQueuePool for the
+async engine), which time every checkout and report it to pool_waits. Once all pool_size + max_overflow connections are
+in use, checkouts queue for up to pool_timeout, holding a request thread
+each; pool_waits.current_wait() is how long checkouts are waiting right now
+(the oldest waiter, or the longest recent wait), which the rate limit
+middleware uses to shed load before that queue builds up.
+"""
+import itertools
+import threading
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.metrics import metrics
+
+
+class PoolWaitMonitor:
+    """Checkouts in progress and the longest wait seen in the last `window_seconds`."""
+
+    def __init__(self, window_seconds: float = 2.0):
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._waiting: dict[int, float] = {}
+        self._peak = 0.0
+        self._peak_at = float("-inf")
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+
+    def start(self, now: float) -> int:
+        waiter = next(self._ids)
+        with self._lock:
+            self._waiting[waiter] = now
+        return waiter
+
+    def finish(self, waiter: int, now: float) -> None:
+        with self._lock:
+            wait = now - self._waiting.pop(waiter)
+            self.checkouts += 1
+            self.wait_seconds_total += wait
+            if wait >= self._peak or now - self._peak_at > self.window_seconds:
+                self._peak, self._peak_at = wait, now
+
+    def current_wait(self, now: float | None = None) -> float:
+        """Seconds the oldest pending checkout has waited, or the recent peak if longer."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            oldest = now - min(self._waiting.values()) if self._waiting else 0.0
+            recent = self._peak if now - self._peak_at <= self.window_seconds else 0.0
+        return max(oldest, recent)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._waiting.clear()
+            self._peak, self._peak_at = 0.0, float("-inf")
+
+
+pool_waits = PoolWaitMonitor()
+metrics.register_counter("db_pool_checkouts_total", lambda: pool_waits.checkouts)
+metrics.register_counter("db_pool_wait_seconds_total", lambda: pool_waits.wait_seconds_total)
+metrics.register_gauge("db_pool_waiting", lambda: pool_waits.waiting)
+metrics.register_gauge("db_pool_wait_seconds", lambda: pool_waits.current_wait())
+
+
+class _MonitoredCheckout:
+    """Reports how long each checkout waited to pool_waits."""
+
+    def _do_get(self):
+        waiter = pool_waits.start(time.monotonic())
+        try:
+            return super()._do_get()
+        finally:
+            pool_waits.finish(waiter, time.monotonic())
+
+
+class MonitoredQueuePool(_MonitoredCheckout, QueuePool):
+    pass
+
+
+class MonitoredAsyncQueuePool(_MonitoredCheckout, AsyncAdaptedQueuePool):
+    pass
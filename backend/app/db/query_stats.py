@@ -0,0 +1,76 @@
+"""
+Per-request SQL statement accounting.
+
+Cursor execution events on every Engine are timed and added to the
+QueryStats of the current request, which track_queries() installs in a
+context variable (the request middleware does this for each HTTP request;
+sync endpoints and dependencies run in a copy of that context, so they
+report into the same object). Statements outside a tracked block are not
+recorded. Only counters and timings are kept per request; statement text
+is kept only when asked for (the tests' query_budget fixture).
+"""
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    Statement count, total time and slowest statement of one unit of work,
+    plus every statement's text with keep_statements.
+    """
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: str | None = None
+        self.keep_statements = keep_statements
+        self.statements: list[str] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if self.keep_statements:
+            self.statements.append(statement)
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """Record statements executed in this context (and contexts copied from it)."""
+    stats = QueryStats(keep_statements)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_LOG_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.0f} ms): {' '.join(statement.split())[:500]}")
@@ -2,12 +2,15 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 from app.core.config import settings
+from app.db.pool import MonitoredQueuePool
 
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=MonitoredQueuePool,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -4,6 +4,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.api.middleware import QueryStatsMiddleware, RateLimitMiddleware
 from app.api.routes import (
     auth_router,
     users_router,
@@ -13,6 +14,7 @@ from app.api.routes import (
     categories_router,
     tags_router,
 )
+from app.services.sentiment_engine import get_sentiment_engine
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +43,9 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Internal server error. Please try again later."}
     )
 
+# Rate limiting sits inside CORS so its 429/503 responses carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # CORS middleware
 cors_origins = settings.CORS_ORIGINS or ["http://localhost:5173", "http://localhost", "http://localhost:80"]
 logger.info(f"CORS origins configured: {cors_origins}")
@@ -52,6 +57,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryStatsMiddleware)
 
 # Include routers
 app.include_router(auth_router)
@@ -62,6 +68,10 @@ app.include_router(analytics_router)
 app.include_router(categories_router)
 app.include_router(tags_router)
 
+# Build the shared sentiment engine at import time so pre-forking servers
+# (e.g. gunicorn --preload) parse the lexicon once and share it copy-on-write
+get_sentiment_engine()
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -93,10 +103,29 @@ async def startup_event():
         except Exception as e:
             logger.error(f"Failed to seed demo data: {e}")
     
+    if settings.SENTIMENT_ASYNC:
+        from app.services.sentiment_worker import sentiment_queue
+        sentiment_queue.start()
+    
+    if settings.TOPICS_REFRESH_ENABLED:
+        from app.services.topic_model import topic_refresher
+        topic_refresher.start()
+    
     logger.info("API Docs available at: /docs")
     logger.info("=" * 50)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close the async engine's connections."""
+    from app.db.async_session import dispose_async_engine
+    from app.services.sentiment_worker import sentiment_queue
+    from app.services.topic_model import topic_refresher
+    sentiment_queue.stop()
+    topic_refresher.stop()
+    await dispose_async_engine()
+
+
 @app.get("/")
 def root():
     """Health check endpoint."""
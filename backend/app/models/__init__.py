@@ -5,6 +5,9 @@ from .tag import Tag
 from .feedback_tag import FeedbackTag
 from .status_event import StatusEvent
 from .admin_response import AdminResponse
+from .job_checkpoint import JobCheckpoint
+from .feedback_daily_stats import FeedbackDailyStats
+from .topic_snapshot import TopicSnapshot
 
 __all__ = [
     "User",
@@ -16,4 +19,7 @@ __all__ = [
     "FeedbackTag",
     "StatusEvent",
     "AdminResponse",
+    "JobCheckpoint",
+    "FeedbackDailyStats",
+    "TopicSnapshot",
 ]
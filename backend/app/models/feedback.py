@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
 from app.db.base_class import Base
+from app.db.functions import timestamp_key
 
 
 class FeedbackStatus(str, enum.Enum):
@@ -17,25 +18,26 @@ class SentimentLabel(str, enum.Enum):
     NEGATIVE = "negative"
     NEUTRAL = "neutral"
     POSITIVE = "positive"
+    PENDING = "pending"  # awaiting background sentiment enrichment
 
 
 class Feedback(Base):
     __tablename__ = "feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     # Use values_callable to ensure PostgreSQL gets lowercase values
     status = Column(
         Enum(FeedbackStatus, values_callable=lambda x: [e.value for e in x]),
         default=FeedbackStatus.NEW,
-        nullable=False,
-        index=True
+        nullable=False
     )
     sentiment_score = Column(Float, nullable=True)
-    sentiment_label = Column(String(20), nullable=True, index=True)  # negative, neutral, positive
+    sentiment_label = Column(String(20), nullable=True, index=True)  # negative, neutral, positive, pending
+    sentiment_version = Column(String(32), nullable=True)  # lexicon version that produced the score
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     resolved_at = Column(DateTime(timezone=True), nullable=True)
@@ -49,3 +51,14 @@ class Feedback(Base):
 
     def __repr__(self):
         return f"<Feedback(id={self.id}, title={self.title}, status={self.status})>"
+
+
+# Lists filter on at most one column and sort/seek newest first on
+# (created_at, id), so each filter gets a composite index ending in the sort
+# key; the leading column also serves counts and GROUP BY on it. The sort
+# key is julianday(created_at) on SQLite (see app.db.functions).
+_newest_first = (timestamp_key(Feedback.created_at), Feedback.id)
+Index("ix_feedback_created_at_id", *_newest_first)
+Index("ix_feedback_user_created_at", Feedback.user_id, *_newest_first)
+Index("ix_feedback_status_created_at", Feedback.status, *_newest_first)
+Index("ix_feedback_category_created_at", Feedback.category_id, *_newest_first)
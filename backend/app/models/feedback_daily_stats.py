@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, Date
+from app.db.base_class import Base
+
+
+class FeedbackDailyStats(Base):
+    """
+    Per-day feedback rollup, maintained by FeedbackService writes and
+    rebuilt by `python -m app.cli reconcile-daily-stats`.
+
+    Dimensions are part of the primary key so writes can upsert; 0 and ''
+    stand for "no category" and "no sentiment label".
+    """
+    __tablename__ = "feedback_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True, default=0)
+    status = Column(String(20), primary_key=True)
+    sentiment_label = Column(String(20), primary_key=True, default="")
+    feedback_count = Column(Integer, nullable=False, default=0)
+    # Sum and count of non-null sentiment scores, for averaging
+    sentiment_sum = Column(Float, nullable=False, default=0)
+    sentiment_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<FeedbackDailyStats(day={self.day}, status={self.status}, count={self.feedback_count})>"
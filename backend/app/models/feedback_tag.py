@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from app.db.base_class import Base
 
 
 class FeedbackTag(Base):
     """Many-to-many relationship between Feedback and Tag."""
     __tablename__ = "feedback_tags"
+    __table_args__ = (
+        # Covers per-tag aggregation; the primary key only serves feedback_id lookups
+        Index("ix_feedback_tags_tag_id", "tag_id", "feedback_id"),
+    )
 
     feedback_id = Column(Integer, ForeignKey("feedback.id", ondelete="CASCADE"), primary_key=True)
     tag_id = Column(Integer, ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+
+class JobCheckpoint(Base):
+    """Last committed position of a resumable batch job."""
+    __tablename__ = "job_checkpoints"
+
+    name = Column(String(100), primary_key=True)
+    position = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<JobCheckpoint(name={self.name}, position={self.position})>"
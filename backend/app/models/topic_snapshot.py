@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, DateTime, JSON, LargeBinary, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+
+class TopicSnapshot(Base):
+    """A fitted topic model for one cluster count (k), served by /analytics/topics."""
+    __tablename__ = "topic_snapshots"
+    __table_args__ = (UniqueConstraint("k", "version", name="uq_topic_snapshots_k_version"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    k = Column(Integer, nullable=False, index=True)
+    version = Column(Integer, nullable=False)  # increases with every refresh of this k
+    corpus_size = Column(Integer, nullable=False, default=0)
+    last_feedback_id = Column(Integer, nullable=False, default=0)  # highest id in the corpus
+    fit_seconds = Column(Float, nullable=True)
+    clusters = Column(JSON, nullable=False)  # list of TopicCluster dicts
+    # .npz archive of the centroids, per-feedback assignments and TF-IDF
+    # vocabulary (NULL when the corpus was too small to cluster)
+    model = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<TopicSnapshot(k={self.k}, version={self.version}, corpus_size={self.corpus_size})>"
@@ -23,6 +23,8 @@ class User(Base):
         nullable=False
     )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped to revoke every refresh token issued so far
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     feedbacks = relationship("Feedback", back_populates="user")
@@ -1,4 +1,4 @@
-from .auth import Token, TokenPayload, LoginRequest, RegisterRequest
+from .auth import Token, TokenPayload, RefreshRequest, LoginRequest, RegisterRequest
 from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserInDB
 from .category import CategoryBase, CategoryCreate, CategoryUpdate, CategoryResponse
 from .tag import TagBase, TagCreate, TagUpdate, TagResponse
@@ -15,6 +15,7 @@ from .feedback import (
     AdminResponseCreate,
     AdminResponseResponse,
     StatusEventResponse,
+    SentimentBackfillStatus,
 )
 from .analytics import (
     OverviewStats,
@@ -34,6 +35,7 @@ __all__ = [
     # Auth
     "Token",
     "TokenPayload",
+    "RefreshRequest",
     "LoginRequest",
     "RegisterRequest",
     # User
@@ -65,6 +67,7 @@ __all__ = [
     "AdminResponseCreate",
     "AdminResponseResponse",
     "StatusEventResponse",
+    "SentimentBackfillStatus",
     # Analytics
     "OverviewStats",
     "TimeseriesPoint",
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
 
 
 class OverviewStats(BaseModel):
@@ -7,6 +7,7 @@ class OverviewStats(BaseModel):
     open_feedback: int
     resolved_feedback: int
     average_resolution_time_hours: float | None
+    pending_sentiment: int = 0  # awaiting background sentiment scoring
 
 
 class TimeseriesPoint(BaseModel):
@@ -46,6 +47,7 @@ class SentimentPoint(BaseModel):
 
 class SentimentTrendsResponse(BaseModel):
     data: list[SentimentPoint]
+    pending_count: int = 0  # rows in the window excluded while sentiment is pending
 
 
 class TopicCluster(BaseModel):
@@ -59,3 +61,9 @@ class TopicCluster(BaseModel):
 
 class TopicsResponse(BaseModel):
     clusters: list[TopicCluster]
+    k: int | None = None
+    status: str = "ready"  # "pending" until the first snapshot for k is fitted
+    version: int | None = None
+    generated_at: datetime | None = None
+    age_seconds: float | None = None
+    corpus_size: int = 0
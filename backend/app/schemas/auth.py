@@ -1,13 +1,24 @@
 from pydantic import BaseModel, EmailStr
 
+from app.models.user import UserRole
+
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str | None = None
     token_type: str = "bearer"
 
 
 class TokenPayload(BaseModel):
     sub: int | None = None
+    email: str | None = None
+    role: UserRole | None = None
+    ver: int | None = None
+    type: str = "access"
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class LoginRequest(BaseModel):
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import datetime
-from app.models.feedback import FeedbackStatus
+from typing import Literal
+from app.models.feedback import FeedbackStatus, SentimentLabel
+from app.core.pagination import CountStrategy
 from .category import CategoryResponse
 from .tag import TagResponse
 
@@ -39,9 +41,13 @@ class FeedbackResponse(FeedbackBase):
 
 class FeedbackListResponse(BaseModel):
     items: list[FeedbackResponse]
-    total: int
-    page: int
+    total: int | None = None  # None when count_strategy is "none"
+    count_strategy: CountStrategy = CountStrategy.EXACT  # what produced total
+    has_more: bool = False  # another page follows in the newest-first order
+    page: int | None = None  # page/page_size mode only
     page_size: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
 
 class StatusUpdateRequest(BaseModel):
@@ -56,6 +62,52 @@ class TagsUpdateRequest(BaseModel):
     tag_ids: list[int]
 
 
+class BulkFilter(BaseModel):
+    """Feedback matching every given field (an empty filter matches all)."""
+    status: FeedbackStatus | None = None
+    category_id: int | None = None
+    sentiment_label: SentimentLabel | None = None
+
+
+class BulkSelection(BaseModel):
+    """Either explicit ids or a filter, not both."""
+    ids: list[int] | None = None
+    filter: BulkFilter | None = None
+
+    @model_validator(mode="after")
+    def one_selector(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ids or filter")
+        return self
+
+
+class BulkStatusRequest(BulkSelection):
+    status: FeedbackStatus
+
+
+class BulkCategoryRequest(BulkSelection):
+    category_id: int
+
+
+class BulkTagsRequest(BulkSelection):
+    tag_ids: list[int]
+    mode: Literal["add", "remove", "replace"] = "add"
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    result: Literal["updated", "unchanged", "not_found", "failed"]
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    unchanged: int
+    not_found: int  # includes filter matches that changed before their chunk ran
+    failed: int = 0  # a referenced category or tag was deleted during the update
+    chunks: int
+    results: list[BulkItemResult]
+
+
 class AdminResponseCreate(BaseModel):
     message: str
 
@@ -83,6 +135,38 @@ class StatusEventResponse(BaseModel):
         from_attributes = True
 
 
+class SentimentBackfillStatus(BaseModel):
+    version: str
+    requested: bool  # waiting for `backfill-sentiment --if-requested`
+    restart: bool
+    last_id: int  # last committed id
+    checkpoint_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based record number in the file
+    error: str
+
+
+class FeedbackImportStatus(BaseModel):
+    name: str
+    running: bool
+    offset: int
+    imported: int
+    failed: int
+    batches: int
+    started_at: datetime | None
+    finished_at: datetime | None
+    error: str | None
+    errors: list[ImportRowError]
+
+    class Config:
+        from_attributes = True
+
+
 class FeedbackDetailResponse(FeedbackResponse):
     """Feedback with admin responses and status history."""
     admin_responses: list[AdminResponseResponse] = []
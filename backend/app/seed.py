@@ -14,7 +14,8 @@ from app.models.user import User, UserRole
 from app.models.category import Category
 from app.models.tag import Tag
 from app.models.feedback import Feedback, FeedbackStatus
-from app.services.feedback_service import FeedbackService
+from app.services.daily_stats import DailyStatsService, feedback_snapshot
+from app.services.sentiment_engine import LEXICON_VERSION, score_batch
 
 logger = logging.getLogger(__name__)
 
@@ -182,8 +183,10 @@ def create_sample_feedback(
     
     logger.info("Creating sample feedback items...")
     
-    # Use the FeedbackService to properly calculate sentiment
-    feedback_service = FeedbackService(db)
+    # Score all samples in one batch with the shared sentiment engine
+    sentiment = score_batch(
+        f"{item['title']} {item['content']}" for item in SAMPLE_FEEDBACK
+    )
     
     statuses = [
         FeedbackStatus.NEW,
@@ -196,17 +199,13 @@ def create_sample_feedback(
         FeedbackStatus.REJECTED,
     ]
     
+    created = []
     for i, feedback_data in enumerate(SAMPLE_FEEDBACK):
         # Spread feedback across the last 14 days
         days_ago = random.randint(0, 13)
         hours_ago = random.randint(0, 23)
         created_at = datetime.utcnow() - timedelta(days=days_ago, hours=hours_ago)
         
-        # Calculate sentiment score using the service
-        combined_text = f"{feedback_data['title']} {feedback_data['content']}"
-        sentiment_score = feedback_service._calculate_sentiment(combined_text)
-        sentiment_label = get_sentiment_label(sentiment_score, combined_text)
-        
         # Assign random category and tags
         category = random.choice(categories)
         feedback_tags = random.sample(tags, k=random.randint(1, 3))
@@ -220,8 +219,9 @@ def create_sample_feedback(
             content=feedback_data["content"],
             category_id=category.id,
             status=status,
-            sentiment_score=sentiment_score,
-            sentiment_label=sentiment_label,
+            sentiment_score=float(sentiment.scores[i]),
+            sentiment_label=str(sentiment.labels[i]),
+            sentiment_version=LEXICON_VERSION,
             created_at=created_at,
             updated_at=created_at,
             resolved_at=created_at if status == FeedbackStatus.RESOLVED else None
@@ -229,40 +229,13 @@ def create_sample_feedback(
         feedback.tags = feedback_tags
         
         db.add(feedback)
+        created.append(feedback)
     
+    DailyStatsService(db).apply(added=[feedback_snapshot(f) for f in created])
     db.commit()
     logger.info(f"Created {len(SAMPLE_FEEDBACK)} sample feedback items")
 
 
-def get_sentiment_label(score: float, text: str) -> str:
-    """
-    Get sentiment label from score with keyword override.
-    Uses improved thresholds and proper word matching.
-    """
-    import re
-    
-    # Extract individual words (not substrings) for accurate matching
-    cleaned = re.sub(r'[^a-zA-Z0-9\s]', ' ', text.lower())
-    words = set(cleaned.split())
-    
-    # Strong keyword overrides - exact word matches only
-    strong_negative = {"terrible", "awful", "unusable", "hate", "broken", "worst", "horrible"}
-    strong_positive = {"amazing", "love", "perfect", "excellent", "fantastic", "great", "best"}
-    
-    if words & strong_negative:  # Set intersection
-        return "negative"
-    if words & strong_positive:  # Set intersection
-        return "positive"
-    
-    # Use improved thresholds
-    if score <= -0.20:
-        return "negative"
-    elif score >= 0.20:
-        return "positive"
-    else:
-        return "neutral"
-
-
 if __name__ == "__main__":
     # Allow running directly for testing
     logging.basicConfig(level=logging.INFO)
@@ -1,10 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, timedelta
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
 
-from app.models.feedback import Feedback, FeedbackStatus
+from app.db.async_session import run_with_session
+from app.db.functions import seconds_between
+from app.models.feedback import Feedback, FeedbackStatus, SentimentLabel
+from app.models.feedback_daily_stats import FeedbackDailyStats
 from app.models.tag import Tag
 from app.models.category import Category
 from app.models.feedback_tag import FeedbackTag
@@ -19,90 +21,91 @@ from app.schemas.analytics import (
     SentimentTrendsResponse,
     SentimentPoint,
     TopicsResponse,
-    TopicCluster,
 )
+from app.services.topic_model import TopicModelService, topics_response
 
 
 class AnalyticsService:
+    """
+    Dashboard aggregates. Each get_* runs its query (a _*_rows method) and
+    builds the response from the rows (a _*_response staticmethod), so the
+    async service can build responses off the event loop.
+    """
+
     def __init__(self, db: Session):
         self.db = db
 
     def get_overview(self) -> OverviewStats:
-        """Get overview statistics."""
-        total = self.db.query(func.count(Feedback.id)).scalar() or 0
-        
+        """Get overview statistics in a single aggregate query."""
+        return self._overview_response(self._overview_rows())
+
+    def _overview_rows(self):
         open_statuses = [FeedbackStatus.NEW, FeedbackStatus.TRIAGED, FeedbackStatus.IN_PROGRESS]
-        open_count = (
-            self.db.query(func.count(Feedback.id))
-            .filter(Feedback.status.in_(open_statuses))
-            .scalar() or 0
-        )
-        
-        resolved_count = (
-            self.db.query(func.count(Feedback.id))
-            .filter(Feedback.status == FeedbackStatus.RESOLVED)
-            .scalar() or 0
-        )
-        
-        # Calculate average resolution time
+        resolved = Feedback.status == FeedbackStatus.RESOLVED
+
+        return self.db.query(
+            func.count(Feedback.id).label('total'),
+            func.count(Feedback.id).filter(Feedback.status.in_(open_statuses)).label('open'),
+            func.count(Feedback.id).filter(resolved).label('resolved'),
+            func.count(Feedback.id).filter(
+                Feedback.sentiment_label == SentimentLabel.PENDING.value
+            ).label('pending'),
+            # Average resolution time is computed by the database, so memory
+            # use does not grow with resolved history
+            func.avg(
+                seconds_between(Feedback.created_at, Feedback.resolved_at)
+            ).filter(resolved, Feedback.resolved_at.isnot(None)).label('avg_resolution_seconds'),
+        ).one()
+
+    @staticmethod
+    def _overview_response(row) -> OverviewStats:
         avg_resolution_time = None
-        resolved_feedback = (
-            self.db.query(Feedback)
-            .filter(
-                Feedback.status == FeedbackStatus.RESOLVED,
-                Feedback.resolved_at.isnot(None)
-            )
-            .all()
-        )
-        
-        if resolved_feedback:
-            total_hours = sum(
-                (f.resolved_at - f.created_at).total_seconds() / 3600
-                for f in resolved_feedback
-                if f.resolved_at and f.created_at
-            )
-            avg_resolution_time = total_hours / len(resolved_feedback)
-        
+        if row.avg_resolution_seconds is not None:
+            avg_resolution_time = float(row.avg_resolution_seconds) / 3600
+
         return OverviewStats(
-            total_feedback=total,
-            open_feedback=open_count,
-            resolved_feedback=resolved_count,
-            average_resolution_time_hours=avg_resolution_time
+            total_feedback=row.total,
+            open_feedback=row.open,
+            resolved_feedback=row.resolved,
+            average_resolution_time_hours=avg_resolution_time,
+            pending_sentiment=row.pending
         )
 
     def get_timeseries(self, days: int = 30) -> TimeseriesResponse:
-        """Get feedback volume over time."""
-        start_date = datetime.utcnow() - timedelta(days=days)
-        
+        """Get feedback volume over time (from the daily rollup)."""
+        return self._timeseries_response(*self._timeseries_rows(days))
+
+    def _timeseries_rows(self, days: int):
+        start_date = datetime.utcnow().date() - timedelta(days=days)
         results = (
             self.db.query(
-                func.date(Feedback.created_at).label('date'),
-                func.count(Feedback.id).label('count')
+                FeedbackDailyStats.day,
+                func.sum(FeedbackDailyStats.feedback_count).label('count')
             )
-            .filter(Feedback.created_at >= start_date)
-            .group_by(func.date(Feedback.created_at))
-            .order_by(func.date(Feedback.created_at))
+            .filter(FeedbackDailyStats.day >= start_date)
+            .group_by(FeedbackDailyStats.day)
             .all()
         )
-        
+        return start_date, results
+
+    @staticmethod
+    def _timeseries_response(start_date, results) -> TimeseriesResponse:
         # Fill in missing dates with zero counts
-        date_counts = {r.date: r.count for r in results}
-        data = []
-        current_date = start_date.date()
+        date_counts = {r.day: r.count for r in results}
         end_date = datetime.utcnow().date()
-        
-        while current_date <= end_date:
-            data.append(TimeseriesPoint(
-                date=current_date,
-                count=date_counts.get(current_date, 0)
-            ))
-            current_date += timedelta(days=1)
+        data = [
+            TimeseriesPoint(date=day, count=date_counts.get(day, 0))
+            for day in (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
+        ]
         
         return TimeseriesResponse(data=data)
 
     def get_top_tags(self, limit: int = 10) -> TopTagsResponse:
         """Get top tags by feedback count."""
-        results = (
+        return self._top_tags_response(self._top_tags_rows(limit))
+
+    def _top_tags_rows(self, limit: int):
+        return (
             self.db.query(
                 Tag.id,
                 Tag.name,
@@ -114,7 +117,9 @@ class AnalyticsService:
             .limit(limit)
             .all()
         )
-        
+
+    @staticmethod
+    def _top_tags_response(results) -> TopTagsResponse:
         return TopTagsResponse(
             data=[
                 TagCount(tag_id=r.id, tag_name=r.name, count=r.count)
@@ -124,7 +129,10 @@ class AnalyticsService:
 
     def get_top_categories(self, limit: int = 10) -> TopCategoriesResponse:
         """Get top categories by feedback count."""
-        results = (
+        return self._top_categories_response(self._top_categories_rows(limit))
+
+    def _top_categories_rows(self, limit: int):
+        return (
             self.db.query(
                 Category.id,
                 Category.name,
@@ -136,7 +144,9 @@ class AnalyticsService:
             .limit(limit)
             .all()
         )
-        
+
+    @staticmethod
+    def _top_categories_response(results) -> TopCategoriesResponse:
         return TopCategoriesResponse(
             data=[
                 CategoryCount(category_id=r.id, category_name=r.name, count=r.count)
@@ -145,29 +155,45 @@ class AnalyticsService:
         )
 
     def get_sentiment_trends(self, days: int = 30) -> SentimentTrendsResponse:
-        """Get sentiment score trends over time."""
-        start_date = datetime.utcnow() - timedelta(days=days)
+        """Get sentiment score trends over time (from the daily rollup)."""
+        return self._sentiment_trends_response(*self._sentiment_trends_rows(days))
+
+    def _sentiment_trends_rows(self, days: int):
+        start_date = datetime.utcnow().date() - timedelta(days=days)
+        is_pending = FeedbackDailyStats.sentiment_label == SentimentLabel.PENDING.value
         
         results = (
             self.db.query(
-                func.date(Feedback.created_at).label('date'),
-                func.avg(Feedback.sentiment_score).label('avg_sentiment'),
-                func.count(Feedback.id).label('count')
+                FeedbackDailyStats.day,
+                func.sum(FeedbackDailyStats.sentiment_sum).label('sentiment_sum'),
+                func.sum(FeedbackDailyStats.sentiment_count).label('count')
             )
             .filter(
-                Feedback.created_at >= start_date,
-                Feedback.sentiment_score.isnot(None)
+                FeedbackDailyStats.day >= start_date,
+                # Pending rows have no score yet; keep them out of the averages
+                ~is_pending
             )
-            .group_by(func.date(Feedback.created_at))
-            .order_by(func.date(Feedback.created_at))
+            .group_by(FeedbackDailyStats.day)
+            .having(func.sum(FeedbackDailyStats.sentiment_count) > 0)
+            .order_by(FeedbackDailyStats.day)
             .all()
         )
         
+        pending_count = (
+            self.db.query(func.sum(FeedbackDailyStats.feedback_count))
+            .filter(FeedbackDailyStats.day >= start_date, is_pending)
+            .scalar() or 0
+        )
+        return results, pending_count
+
+    @staticmethod
+    def _sentiment_trends_response(results, pending_count) -> SentimentTrendsResponse:
         return SentimentTrendsResponse(
+            pending_count=pending_count,
             data=[
                 SentimentPoint(
-                    date=r.date,
-                    average_sentiment=round(r.avg_sentiment, 3) if r.avg_sentiment else 0,
+                    date=r.day,
+                    average_sentiment=round(r.sentiment_sum / r.count, 3),
                     count=r.count
                 )
                 for r in results
@@ -175,77 +201,48 @@ class AnalyticsService:
         )
 
     def get_topics(self, k: int = 5) -> TopicsResponse:
-        """Cluster feedback into topics using TF-IDF and KMeans."""
-        # Get all feedback with content
-        feedbacks = (
-            self.db.query(Feedback)
-            .filter(Feedback.content.isnot(None))
-            .all()
+        """Latest persisted topic clusters for k (see topic_model)."""
+        return TopicModelService(self.db).get_topics(k)
+
+
+class AsyncAnalyticsService:
+    """
+    AnalyticsService for async routes (see AsyncFeedbackService): only the
+    queries run through run_with_session; responses are built from their
+    rows on the threadpool.
+    """
+
+    def __init__(self, db: Session | AsyncSession):
+        self.db = db
+
+    async def _run(self, fn, convert):
+        return await run_with_session(self.db, lambda session: fn(AnalyticsService(session)), convert)
+
+    async def get_overview(self) -> OverviewStats:
+        return await self._run(lambda service: service._overview_rows(), AnalyticsService._overview_response)
+
+    async def get_timeseries(self, days: int = 30) -> TimeseriesResponse:
+        return await self._run(
+            lambda service: service._timeseries_rows(days),
+            lambda rows: AnalyticsService._timeseries_response(*rows),
         )
-        
-        if len(feedbacks) < k:
-            # Not enough feedback to cluster
-            return TopicsResponse(clusters=[])
-        
-        # Prepare text data
-        texts = [f"{f.title} {f.content}" for f in feedbacks]
-        feedback_ids = [f.id for f in feedbacks]
-        feedback_titles = [f.title for f in feedbacks]
-        
-        # TF-IDF vectorization
-        vectorizer = TfidfVectorizer(
-            max_features=1000,
-            stop_words='english',
-            ngram_range=(1, 2),
-            min_df=2,
-            max_df=0.95
+
+    async def get_top_tags(self, limit: int = 10) -> TopTagsResponse:
+        return await self._run(lambda service: service._top_tags_rows(limit), AnalyticsService._top_tags_response)
+
+    async def get_top_categories(self, limit: int = 10) -> TopCategoriesResponse:
+        return await self._run(
+            lambda service: service._top_categories_rows(limit), AnalyticsService._top_categories_response
+        )
+
+    async def get_sentiment_trends(self, days: int = 30) -> SentimentTrendsResponse:
+        return await self._run(
+            lambda service: service._sentiment_trends_rows(days),
+            lambda rows: AnalyticsService._sentiment_trends_response(*rows),
+        )
+
+    async def get_topics(self, k: int = 5) -> TopicsResponse:
+        return await self._run(
+            lambda service: TopicModelService(service.db).latest(k),
+            lambda snapshot: topics_response(k, snapshot),
         )
-        
-        try:
-            tfidf_matrix = vectorizer.fit_transform(texts)
-        except ValueError:
-            # Not enough documents or vocabulary
-            return TopicsResponse(clusters=[])
-        
-        # KMeans clustering
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        cluster_labels = kmeans.fit_predict(tfidf_matrix)
-        
-        # Get feature names for keywords
-        feature_names = vectorizer.get_feature_names_out()
-        
-        # Build cluster information
-        clusters = []
-        for cluster_id in range(k):
-            # Get indices of feedback in this cluster
-            cluster_indices = [i for i, label in enumerate(cluster_labels) if label == cluster_id]
-            
-            if not cluster_indices:
-                continue
-            
-            # Get top keywords for this cluster
-            cluster_center = kmeans.cluster_centers_[cluster_id]
-            top_keyword_indices = cluster_center.argsort()[-5:][::-1]
-            keywords = [feature_names[i] for i in top_keyword_indices]
-            
-            # Get example feedback
-            example_indices = cluster_indices[:3]  # Top 3 examples
-            example_ids = [feedback_ids[i] for i in example_indices]
-            example_titles_list = [feedback_titles[i] for i in example_indices]
-            
-            # Generate label from top keywords
-            label = ", ".join(keywords[:3])
-            
-            clusters.append(TopicCluster(
-                cluster_id=cluster_id,
-                label=label,
-                keywords=keywords,
-                example_feedback_ids=example_ids,
-                example_titles=example_titles_list,
-                count=len(cluster_indices)
-            ))
-        
-        # Sort by count descending
-        clusters.sort(key=lambda x: x.count, reverse=True)
-        
-        return TopicsResponse(clusters=clusters)
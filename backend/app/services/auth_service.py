@@ -1,10 +1,18 @@
 import logging
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.db.async_session import run_with_session
 from app.models.user import User, UserRole
 from app.schemas.auth import RegisterRequest, LoginRequest
 from app.schemas.user import UserResponse
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.services.login_throttle import login_throttle
+from app.services.password_hashing import password_hasher
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    decode_refresh_token,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,55 +26,122 @@ class AuthService:
         logger.info(f"Registration attempt for email: {request.email}")
         
         try:
-            # Check if user exists
-            existing_user = self.db.query(User).filter(User.email == request.email).first()
-            if existing_user:
-                logger.warning(f"Registration failed - email already exists: {request.email}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
-            
-            # Create user
-            user = User(
-                email=request.email,
-                hashed_password=get_password_hash(request.password),
-                role=UserRole.USER
-            )
-            self.db.add(user)
-            self.db.commit()
-            self.db.refresh(user)
-            
-            logger.info(f"User registered successfully: {request.email} (ID: {user.id})")
-            return UserResponse.model_validate(user)
+            self._check_email_available(request.email)
+            hashed_password = password_hasher.hash(request.password)
+            return self._add_user(request.email, hashed_password)
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Registration error for {request.email}: {e}", exc_info=True)
-            self.db.rollback()
+            self._registration_failed(request, e)
+
+    def _check_email_available(self, email: str) -> None:
+        existing_user = self.db.query(User).filter(User.email == email).first()
+        if existing_user:
+            logger.warning(f"Registration failed - email already exists: {email}")
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Registration failed: {str(e)}"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered"
             )
+        # Return the connection to the pool while bcrypt runs
+        self.db.rollback()
 
-    def login(self, request: LoginRequest) -> dict:
-        """Authenticate user and return token."""
-        user = self.db.query(User).filter(User.email == request.email).first()
+    def _add_user(self, email: str, hashed_password: str) -> UserResponse:
+        user = User(
+            email=email,
+            hashed_password=hashed_password,
+            role=UserRole.USER
+        )
+        self.db.add(user)
+        self.db.commit()
+        self.db.refresh(user)
+        
+        logger.info(f"User registered successfully: {email} (ID: {user.id})")
+        return UserResponse.model_validate(user)
+
+    def _registration_failed(self, request: RegisterRequest, error: Exception):
+        logger.error(f"Registration error for {request.email}: {error}", exc_info=True)
+        self.db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Registration failed: {str(error)}"
+        )
+
+    def login(self, request: LoginRequest, client_ip: str | None = None) -> dict:
+        """
+        Authenticate user and return token.
         
-        if not user or not verify_password(request.password, user.hashed_password):
+        Accounts and client IPs with too many recent failures get 429 before
+        any password is checked; verification runs on the bounded hasher
+        without holding a database connection.
+        """
+        login_throttle.check(request.email, client_ip)
+        password_hasher.check_capacity()
+        user = self._find_for_login(request.email)
+        verified = user is not None and password_hasher.verify(request.password, user.hashed_password)
+        return self._login_result(request, client_ip, user, verified)
+
+    def _find_for_login(self, email: str) -> User | None:
+        user = self.db.query(User).filter(User.email == email).first()
+        if user is not None:
+            # Detached with its loaded columns, so the rollback releasing the
+            # connection does not expire them
+            self.db.expunge(user)
+        self.db.rollback()
+        return user
+
+    @classmethod
+    def _login_result(cls, request: LoginRequest, client_ip: str | None, user: User | None, verified: bool) -> dict:
+        if not verified:
+            login_throttle.record_failure(request.email, client_ip)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        access_token = create_access_token(data={"sub": str(user.id)})
+        login_throttle.record_success(request.email)
+        return cls.issue_tokens(user)
+
+    @staticmethod
+    def issue_tokens(user: User) -> dict:
+        """
+        Access and refresh tokens for a user.
+        
+        The access token carries the role, so admin routes are authorized
+        without a lookup; both carry the user's token version.
+        """
+        claims = {"sub": str(user.id), "ver": user.token_version}
+        access_token = create_access_token(
+            data={**claims, "email": user.email, "role": UserRole(user.role).value}
+        )
         return {
             "access_token": access_token,
+            "refresh_token": create_refresh_token(data=claims),
             "token_type": "bearer"
         }
 
+    def refresh(self, refresh_token: str) -> dict:
+        """New tokens for a refresh token whose token version is still current."""
+        payload = decode_refresh_token(refresh_token)
+        user = self.get_user_by_id(int(payload["sub"])) if payload else None
+        if user is None or payload.get("ver") != user.token_version:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or revoked refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return self.issue_tokens(user)
+
+    def revoke_tokens(self, user_id: int) -> None:
+        """Revoke every refresh token issued to a user so far."""
+        user = self.get_user_by_id(user_id)
+        if user is None:
+            return
+        user.token_version += 1
+        self.db.commit()
+        logger.info(f"Revoked refresh tokens for user {user_id} (token version {user.token_version})")
+
     def get_user_by_id(self, user_id: int) -> User | None:
         """Get user by ID."""
         return self.db.query(User).filter(User.id == user_id).first()
@@ -86,7 +161,7 @@ class AuthService:
         
         user = User(
             email=email,
-            hashed_password=get_password_hash(password),
+            hashed_password=password_hasher.hash(password),
             role=UserRole.ADMIN
         )
         self.db.add(user)
@@ -94,3 +169,45 @@ class AuthService:
         self.db.refresh(user)
         
         return user
+
+
+class AsyncAuthService:
+    """
+    AuthService for async routes (see AsyncFeedbackService).
+    
+    Queries run through AuthService with run_with_session; password hashes
+    are awaited on the bounded hasher, so no thread or connection is held
+    while bcrypt runs.
+    """
+
+    def __init__(self, db: Session | AsyncSession):
+        self.db = db
+
+    async def _run(self, fn):
+        return await run_with_session(self.db, lambda session: fn(AuthService(session)))
+
+    async def register(self, request: RegisterRequest) -> UserResponse:
+        """Register a new user."""
+        logger.info(f"Registration attempt for email: {request.email}")
+        try:
+            await self._run(lambda auth: auth._check_email_available(request.email))
+            hashed_password = await password_hasher.ahash(request.password)
+            return await self._run(lambda auth: auth._add_user(request.email, hashed_password))
+        except HTTPException:
+            raise
+        except Exception as e:
+            await self._run(lambda auth, error=e: auth._registration_failed(request, error))
+
+    async def login(self, request: LoginRequest, client_ip: str | None = None) -> dict:
+        """Authenticate user and return tokens (see AuthService.login)."""
+        login_throttle.check(request.email, client_ip)
+        password_hasher.check_capacity()
+        user = await self._run(lambda auth: auth._find_for_login(request.email))
+        verified = user is not None and await password_hasher.averify(request.password, user.hashed_password)
+        return AuthService._login_result(request, client_ip, user, verified)
+
+    async def refresh(self, refresh_token: str) -> dict:
+        return await self._run(lambda auth: auth.refresh(refresh_token))
+
+    async def revoke_tokens(self, user_id: int) -> None:
+        await self._run(lambda auth: auth.revoke_tokens(user_id))
@@ -0,0 +1,224 @@
+"""
+Per-process cache of the category and tag catalogs.
+
+Both tables are small and change rarely, while every feedback response
+embeds a category and tags and the frontend lists both on almost every
+view. Write paths build their responses from this cache and the list
+endpoints serve it directly.
+
+Every change to either table increments a shared version (a job_checkpoints
+row) in the same transaction, then drops this process's copy. Each process
+reads the shared version at most every CATALOG_VERSION_CHECK_SECONDS and
+drops its copy when it moved, so changes made in other workers show up
+within that interval. The version is also the ETag of the list endpoints.
+An id missing from the cache re-reads the version at once and reloads the
+catalog only if it moved; ids still missing are remembered until it does,
+so requests naming unknown ids do not reload the catalogs every time.
+"""
+import threading
+import time
+from collections.abc import Iterable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.category import Category
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.tag import Tag
+from app.schemas.category import CategoryResponse
+from app.schemas.tag import TagResponse
+
+# job_checkpoints row holding the shared catalog version
+VERSION_NAME = "catalog_version"
+# Unknown ids remembered per catalog before the set is started over
+MAX_REMEMBERED_MISSES = 10_000
+
+
+class CatalogCache:
+    """Categories and tags by id (and by name for listing), loaded in full on demand."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._categories: dict[int, CategoryResponse] | None = None
+        self._tags: dict[int, TagResponse] | None = None
+        # Ids known not to exist at the current version
+        self._missing_categories: set[int] = set()
+        self._missing_tags: set[int] = set()
+        self._checked_at = float("-inf")
+        self.version: int | None = None
+        self.generation = 0
+        self.reloads = 0
+        self.misses = 0
+        self.remote_invalidations = 0
+
+    def category(self, db: Session, category_id: int | None) -> CategoryResponse | None:
+        """The category with this id, or None if it does not exist."""
+        if category_id is None:
+            return None
+        self._check_version(db)
+        categories = self._categories
+        if categories is None:
+            categories = self._reload_categories(db)
+        elif category_id not in categories and category_id not in self._missing_categories:
+            categories = self._resolve_misses(db, {category_id}, "_categories", self._reload_categories)
+        return categories.get(category_id)
+
+    def tags(self, db: Session, tag_ids: Iterable[int]) -> list[TagResponse]:
+        """The existing tags among tag_ids, ordered by id; unknown ids are skipped."""
+        wanted = set(tag_ids)
+        if not wanted:
+            return []
+        self._check_version(db)
+        tags = self._tags
+        if tags is None:
+            tags = self._reload_tags(db)
+        else:
+            unknown = wanted - tags.keys() - self._missing_tags
+            if unknown:
+                tags = self._resolve_misses(db, unknown, "_tags", self._reload_tags)
+        return [tags[tag_id] for tag_id in sorted(wanted) if tag_id in tags]
+
+    def list_categories(self, db: Session) -> tuple[int, list[CategoryResponse]]:
+        """(version, all categories ordered by name)."""
+        self._check_version(db)
+        version = self.version
+        categories = self._categories
+        if categories is None:
+            categories = self._reload_categories(db)
+        return version, sorted(categories.values(), key=lambda c: c.name)
+
+    def list_tags(self, db: Session) -> tuple[int, list[TagResponse]]:
+        """(version, all tags ordered by name)."""
+        self._check_version(db)
+        version = self.version
+        tags = self._tags
+        if tags is None:
+            tags = self._reload_tags(db)
+        return version, sorted(tags.values(), key=lambda t: t.name)
+
+    def bump(self, db: Session) -> int:
+        """
+        Increment the shared version in db's transaction and return it.
+
+        Call before committing a category or tag change and pass the result
+        to invalidate() after the commit.
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(JobCheckpoint).values(name=VERSION_NAME, position=1)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[JobCheckpoint.name],
+                set_={"position": JobCheckpoint.position + 1},
+            )
+            return db.execute(stmt.returning(JobCheckpoint.position)).scalar_one()
+
+        version = db.execute(
+            update(JobCheckpoint)
+            .where(JobCheckpoint.name == VERSION_NAME)
+            .values(position=JobCheckpoint.position + 1)
+            .returning(JobCheckpoint.position)
+        ).scalar()
+        if version is None:
+            db.execute(insert(JobCheckpoint).values(name=VERSION_NAME, position=1))
+            version = 1
+        return version
+
+    def invalidate(self, version: int | None = None) -> None:
+        """
+        Drop both catalogs. `version` is what bump() returned for the
+        committed change; without it the shared version is re-read on next use.
+        """
+        with self._lock:
+            self._drop()
+            if version is None:
+                self._checked_at = float("-inf")
+            else:
+                self.version = version
+
+    def _drop(self) -> None:
+        self._categories = None
+        self._tags = None
+        self._missing_categories = set()
+        self._missing_tags = set()
+        self.generation += 1
+
+    def _check_version(self, db: Session, force: bool = False) -> None:
+        """
+        Drop the catalogs if another process changed them (at most once per
+        check interval unless forced).
+        """
+        now = time.monotonic()
+        if not force and now < self._checked_at + settings.CATALOG_VERSION_CHECK_SECONDS:
+            return
+        version = db.execute(
+            select(JobCheckpoint.position).where(JobCheckpoint.name == VERSION_NAME)
+        ).scalar() or 0
+        with self._lock:
+            self._checked_at = now
+            if version != self.version:
+                if self.version is not None:
+                    self.remote_invalidations += 1
+                self._drop()
+                self.version = version
+
+    def _resolve_misses(self, db: Session, ids: set[int], attr: str, reload) -> dict:
+        """
+        The catalog in `attr` once ids were not found in it: reloaded if the
+        shared version moved (another worker may have added them), else as
+        it is. Ids it still lacks are remembered as missing.
+        """
+        self._check_version(db, force=True)
+        generation = self.generation
+        catalog = getattr(self, attr)
+        if catalog is None:
+            catalog = reload(db)
+        with self._lock:
+            # Not remembered if a change was invalidated in the meantime
+            if generation == self.generation:
+                missing = getattr(self, f"_missing{attr}")
+                if len(missing) >= MAX_REMEMBERED_MISSES:
+                    missing.clear()
+                missing.update(ids - catalog.keys())
+            self.misses += 1
+        return catalog
+
+    def _reload_categories(self, db: Session) -> dict[int, CategoryResponse]:
+        generation = self.generation
+        rows = db.execute(select(Category.id, Category.name, Category.created_at)).all()
+        categories = {row.id: CategoryResponse.model_validate(row) for row in rows}
+        with self._lock:
+            # Not stored if a change was invalidated while this reload ran
+            if generation == self.generation:
+                self._categories = categories
+            self.reloads += 1
+        return categories
+
+    def _reload_tags(self, db: Session) -> dict[int, TagResponse]:
+        generation = self.generation
+        rows = db.execute(select(Tag.id, Tag.name, Tag.created_at)).all()
+        tags = {row.id: TagResponse.model_validate(row) for row in rows}
+        with self._lock:
+            # Not stored if a change was invalidated while this reload ran
+            if generation == self.generation:
+                self._tags = tags
+            self.reloads += 1
+        return tags
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header names etag (weak comparison, or "*")."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+catalog_cache = CatalogCache()
+metrics.register_counter("catalog_cache_reloads_total", lambda: catalog_cache.reloads)
+metrics.register_counter("catalog_cache_misses_total", lambda: catalog_cache.misses)
+metrics.register_counter("catalog_cache_remote_invalidations_total", lambda: catalog_cache.remote_invalidations)
+metrics.register_gauge("catalog_cache_version", lambda: catalog_cache.version or 0)
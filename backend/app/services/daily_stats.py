@@ -0,0 +1,210 @@
+"""
+Maintenance of the feedback_daily_stats rollup.
+
+Every write that changes a feedback row's day, category, status or
+sentiment passes the row's before/after snapshots to DailyStatsService in
+the same transaction, which turns them into per-key deltas and upserts
+them. Dashboards then aggregate over days instead of feedback rows.
+reconcile() rebuilds the table from feedback when drift is suspected.
+"""
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import String, cast, delete, func, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.models.feedback import Feedback
+from app.models.feedback_daily_stats import FeedbackDailyStats
+
+logger = logging.getLogger(__name__)
+
+_stats = FeedbackDailyStats.__table__
+_KEY_COLUMNS = ["day", "category_id", "status", "sentiment_label"]
+
+
+class StatsSnapshot(NamedTuple):
+    """The parts of a feedback row that the rollup depends on."""
+    day: date
+    category_id: int
+    status: str
+    sentiment_label: str
+    sentiment_score: float | None
+
+
+def snapshot(
+    created_at: datetime,
+    category_id: int | None,
+    status,
+    sentiment_label: str | None,
+    sentiment_score: float | None,
+) -> StatsSnapshot:
+    """Build a snapshot from column values (ORM object or Core row)."""
+    return StatsSnapshot(
+        day=created_at.date(),
+        category_id=category_id or 0,
+        status=getattr(status, "value", status),
+        sentiment_label=sentiment_label or "",
+        sentiment_score=sentiment_score,
+    )
+
+
+# Columns to select for row_snapshot()
+SNAPSHOT_COLUMNS = (
+    Feedback.created_at,
+    Feedback.category_id,
+    Feedback.status,
+    Feedback.sentiment_label,
+    Feedback.sentiment_score,
+)
+
+
+def row_snapshot(row, label: str | None = None, score: float | None = None) -> StatsSnapshot:
+    """Snapshot of a row selected with SNAPSHOT_COLUMNS, optionally re-scored."""
+    if label is None:
+        label, score = row.sentiment_label, row.sentiment_score
+    return snapshot(row.created_at, row.category_id, row.status, label, score)
+
+
+def feedback_snapshot(feedback: Feedback) -> StatsSnapshot:
+    """Snapshot of a Feedback object (flush first so created_at is set)."""
+    return snapshot(
+        feedback.created_at,
+        feedback.category_id,
+        feedback.status,
+        feedback.sentiment_label,
+        feedback.sentiment_score,
+    )
+
+
+class DailyStatsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(
+        self,
+        removed: Iterable[StatsSnapshot] = (),
+        added: Iterable[StatsSnapshot] = (),
+        alongside: UpdateBase | None = None,
+    ) -> None:
+        """
+        Move rows out of and into the rollup. Does not commit.
+
+        `alongside` is another INSERT/UPDATE/DELETE of the same write; on
+        PostgreSQL it rides on the upsert as a data-modifying CTE, saving a
+        round trip. Elsewhere it is executed separately.
+        """
+        deltas = defaultdict(lambda: [0, 0.0, 0])
+        for sign, snapshots in ((-1, removed), (1, added)):
+            for snap in snapshots:
+                delta = deltas[snap[:4]]
+                delta[0] += sign
+                if snap.sentiment_score is not None:
+                    delta[1] += sign * snap.sentiment_score
+                    delta[2] += sign
+        rows = [
+            {
+                "day": key[0],
+                "category_id": key[1],
+                "status": key[2],
+                "sentiment_label": key[3],
+                "feedback_count": count,
+                "sentiment_sum": score_sum,
+                "sentiment_count": score_count,
+            }
+            for key, (count, score_sum, score_count) in deltas.items()
+            if count or score_count
+        ]
+        if rows:
+            self._upsert(rows, alongside)
+        elif alongside is not None:
+            self.db.execute(alongside)
+
+    def move(
+        self,
+        before: StatsSnapshot,
+        after: StatsSnapshot,
+        alongside: UpdateBase | None = None,
+    ) -> None:
+        """Record a change to one row (only `alongside` runs when nothing relevant changed)."""
+        if before != after:
+            self.apply(removed=[before], added=[after], alongside=alongside)
+        elif alongside is not None:
+            self.db.execute(alongside)
+
+    def _upsert(self, rows: list[dict], alongside: UpdateBase | None = None) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if alongside is not None and dialect != "postgresql":
+            self.db.execute(alongside)
+            alongside = None
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(_stats).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=_KEY_COLUMNS,
+                set_={
+                    column: _stats.c[column] + stmt.excluded[column]
+                    for column in ("feedback_count", "sentiment_sum", "sentiment_count")
+                },
+            )
+            if alongside is not None:
+                stmt = stmt.add_cte(alongside.cte("alongside"))
+            self.db.execute(stmt)
+            return
+
+        # Other databases: update, then insert keys that did not exist yet
+        for row in rows:
+            result = self.db.execute(
+                update(_stats)
+                .where(*(_stats.c[column] == row[column] for column in _KEY_COLUMNS))
+                .values(
+                    feedback_count=_stats.c.feedback_count + row["feedback_count"],
+                    sentiment_sum=_stats.c.sentiment_sum + row["sentiment_sum"],
+                    sentiment_count=_stats.c.sentiment_count + row["sentiment_count"],
+                )
+            )
+            if result.rowcount == 0:
+                self.db.execute(insert(_stats).values(**row))
+
+    def reconcile(self) -> int:
+        """Rebuild the rollup from the feedback table and commit."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            # Writers block on their upsert until the rebuild commits, so no
+            # delta is lost between the DELETE and the INSERT ... SELECT
+            self.db.execute(text("LOCK TABLE feedback_daily_stats IN EXCLUSIVE MODE"))
+
+        day = func.date(Feedback.created_at)
+        category_id = func.coalesce(Feedback.category_id, 0)
+        status = cast(Feedback.status, String(20))
+        sentiment_label = func.coalesce(Feedback.sentiment_label, "")
+        source = (
+            select(
+                day,
+                category_id,
+                status,
+                sentiment_label,
+                func.count(Feedback.id),
+                func.coalesce(func.sum(Feedback.sentiment_score), 0.0),
+                func.count(Feedback.sentiment_score),
+            )
+            .group_by(day, category_id, status, sentiment_label)
+        )
+        try:
+            self.db.execute(delete(_stats))
+            result = self.db.execute(
+                insert(_stats).from_select(
+                    [*_KEY_COLUMNS, "feedback_count", "sentiment_sum", "sentiment_count"],
+                    source,
+                )
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        logger.info(f"Rebuilt feedback_daily_stats ({result.rowcount} rows)")
+        return result.rowcount
@@ -0,0 +1,227 @@
+"""
+Set-based admin updates over many feedback items.
+
+Items are selected by an id list or a filter and processed in chunks of
+BULK_CHUNK_SIZE ids, each in its own short transaction: the chunk's rows
+are read in id order (and locked on PostgreSQL), changed with one UPDATE,
+their status events written with one multi-row INSERT and the rollup
+adjusted with one upsert. If a chunk fails, earlier chunks stay committed.
+Filters are re-checked per chunk, so rows that stopped matching since the
+selection are reported as not found. If a row the update references (the
+category, a tag) is deleted meanwhile, the chunk is rolled back and its
+items and those of later chunks are reported as failed.
+"""
+import logging
+from collections.abc import Callable
+from datetime import datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.feedback import Feedback, FeedbackStatus
+from app.models.feedback_tag import FeedbackTag
+from app.models.status_event import StatusEvent
+from app.models.tag import Tag
+from app.schemas.feedback import BulkFilter, BulkItemResult, BulkSelection, BulkUpdateResponse
+from app.services.catalog import catalog_cache
+from app.services.daily_stats import SNAPSHOT_COLUMNS, DailyStatsService, row_snapshot
+from app.services.feedback_counts import count_cache
+
+logger = logging.getLogger(__name__)
+
+_feedback = Feedback.__table__
+
+
+class BulkFeedbackService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.stats = DailyStatsService(db)
+
+    def update_status(
+        self,
+        selection: BulkSelection,
+        admin_id: int,
+        new_status: FeedbackStatus
+    ) -> BulkUpdateResponse:
+        """Move the selected feedback to new_status, with a status event per changed item."""
+        values = {"status": new_status}
+        if new_status == FeedbackStatus.RESOLVED:
+            values["resolved_at"] = datetime.utcnow()
+
+        def apply(rows) -> set[int]:
+            changed = [row for row in rows if row.status != new_status]
+            if not changed:
+                return set()
+            ids = [row.id for row in changed]
+            self.db.execute(update(_feedback).where(_feedback.c.id.in_(ids)).values(**values))
+            events = insert(StatusEvent).values([
+                {
+                    "feedback_id": row.id,
+                    "old_status": row.status.value,
+                    "new_status": new_status.value,
+                    "changed_by": admin_id,
+                }
+                for row in changed
+            ])
+            before = [row_snapshot(row) for row in changed]
+            after = [snap._replace(status=new_status.value) for snap in before]
+            self.stats.apply(removed=before, added=after, alongside=events)
+            return set(ids)
+
+        result = self._run(selection, apply)
+        count_cache.invalidate()
+        return result
+
+    def update_category(self, selection: BulkSelection, category_id: int) -> BulkUpdateResponse:
+        """Move the selected feedback to a category."""
+        if catalog_cache.category(self.db, category_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+
+        def apply(rows) -> set[int]:
+            changed = [row for row in rows if row.category_id != category_id]
+            if not changed:
+                return set()
+            ids = [row.id for row in changed]
+            self.db.execute(update(_feedback).where(_feedback.c.id.in_(ids)).values(category_id=category_id))
+            before = [row_snapshot(row) for row in changed]
+            after = [snap._replace(category_id=category_id) for snap in before]
+            self.stats.apply(removed=before, added=after)
+            return set(ids)
+
+        result = self._run(selection, apply)
+        count_cache.invalidate()
+        return result
+
+    def update_tags(self, selection: BulkSelection, tag_ids: list[int], mode: str) -> BulkUpdateResponse:
+        """
+        Add, remove or replace tags on the selected feedback.
+
+        Unknown tag ids are ignored. Items whose links changed get their
+        updated_at bumped.
+        """
+        tag_ids = [tag.id for tag in catalog_cache.tags(self.db, tag_ids)]
+
+        def apply(rows) -> set[int]:
+            ids = [row.id for row in rows]
+            changed = set()
+            if mode == "remove" or mode == "replace":
+                unlink = delete(FeedbackTag).where(FeedbackTag.feedback_id.in_(ids))
+                if mode == "remove":
+                    unlink = unlink.where(FeedbackTag.tag_id.in_(tag_ids))
+                elif tag_ids:
+                    unlink = unlink.where(FeedbackTag.tag_id.not_in(tag_ids))
+                changed.update(self.db.scalars(unlink.returning(FeedbackTag.feedback_id)))
+            if (mode == "add" or mode == "replace") and tag_ids:
+                missing = (
+                    select(Feedback.id, Tag.id)
+                    .join_from(Feedback, Tag, Tag.id.in_(tag_ids))
+                    .where(
+                        Feedback.id.in_(ids),
+                        ~exists().where(FeedbackTag.feedback_id == Feedback.id, FeedbackTag.tag_id == Tag.id)
+                    )
+                )
+                link = (
+                    insert(FeedbackTag)
+                    .from_select(["feedback_id", "tag_id"], missing)
+                    .returning(FeedbackTag.feedback_id)
+                )
+                changed.update(self.db.scalars(link))
+            if changed:
+                self.db.execute(
+                    update(_feedback).where(_feedback.c.id.in_(changed)).values(updated_at=func.now())
+                )
+            return changed
+
+        return self._run(selection, apply)
+
+    def _run(self, selection: BulkSelection, apply: Callable[[list], set[int]]) -> BulkUpdateResponse:
+        """
+        Call apply(rows) once per chunk with the chunk's current rows
+        (id plus SNAPSHOT_COLUMNS) and commit; apply returns the changed ids.
+        """
+        conditions = _filter_conditions(selection.filter) if selection.filter else []
+        ids = self._selected_ids(selection, conditions)
+        results = []
+        updated = chunks = 0
+        for start in range(0, len(ids), settings.BULK_CHUNK_SIZE):
+            chunk = ids[start:start + settings.BULK_CHUNK_SIZE]
+            try:
+                rows = self.db.execute(
+                    select(Feedback.id, *SNAPSHOT_COLUMNS)
+                    .where(Feedback.id.in_(chunk), *conditions)
+                    .order_by(Feedback.id)
+                    .with_for_update()
+                ).all()
+                changed = apply(rows)
+                self.db.commit()
+            except IntegrityError:
+                # Deleted by another worker since the cache was loaded; later
+                # chunks would fail the same way
+                self.db.rollback()
+                catalog_cache.invalidate()
+                logger.warning(f"Bulk update stopped in chunk {chunks + 1}: a referenced row was deleted")
+                results.extend(BulkItemResult(id=feedback_id, result="failed") for feedback_id in ids[start:])
+                break
+            except Exception:
+                self.db.rollback()
+                logger.error(f"Bulk update failed in chunk {chunks + 1}; {updated} items were already updated")
+                raise
+            chunks += 1
+            updated += len(changed)
+            found = {row.id for row in rows}
+            results.extend(
+                BulkItemResult(
+                    id=feedback_id,
+                    result="updated" if feedback_id in changed else "unchanged" if feedback_id in found else "not_found"
+                )
+                for feedback_id in chunk
+            )
+
+        logger.info(f"Bulk update: {len(ids)} items in {chunks} chunks, {updated} updated")
+        return BulkUpdateResponse(
+            updated=updated,
+            unchanged=sum(1 for r in results if r.result == "unchanged"),
+            not_found=sum(1 for r in results if r.result == "not_found"),
+            failed=sum(1 for r in results if r.result == "failed"),
+            chunks=chunks,
+            results=results
+        )
+
+    def _selected_ids(self, selection: BulkSelection, conditions: list) -> list[int]:
+        """Distinct ids to process, ascending (the order rows are locked in)."""
+        limit = settings.BULK_MAX_ITEMS
+        if selection.ids is not None:
+            ids = sorted(set(selection.ids))
+            if len(ids) > limit:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"At most {limit} items per bulk update"
+                )
+            return ids
+
+        ids = list(self.db.scalars(
+            select(Feedback.id).where(*conditions).order_by(Feedback.id).limit(limit + 1)
+        ))
+        if len(ids) > limit:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Filter matches more than {limit} items; narrow it"
+            )
+        return ids
+
+
+def _filter_conditions(bulk_filter: BulkFilter) -> list:
+    conditions = []
+    if bulk_filter.status:
+        conditions.append(Feedback.status == bulk_filter.status)
+    if bulk_filter.category_id:
+        conditions.append(Feedback.category_id == bulk_filter.category_id)
+    if bulk_filter.sentiment_label:
+        conditions.append(Feedback.sentiment_label == bulk_filter.sentiment_label.value)
+    return conditions
@@ -0,0 +1,135 @@
+"""
+Total counts for the feedback list endpoints.
+
+An exact COUNT(*) over the filtered query is the slowest part of a list
+page at scale, so callers pick a strategy:
+
+- exact: COUNT(*) of the filtered query
+- none: no total; the page only reports has_more
+- estimated: the PostgreSQL planner's row estimate (EXPLAIN, no scan);
+  other dialects fall back to an exact count
+- cached: an exact count memoized per filter combination for a short TTL,
+  dropped whenever feedback is created, deleted or moved between filters
+
+The response reports the strategy that actually produced the total.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.pagination import CountStrategy
+
+logger = logging.getLogger(__name__)
+
+
+class CountCache:
+    """
+    Per-process TTL cache of exact counts keyed by filter combination.
+
+    invalidate() bumps a generation so a count computed concurrently with a
+    write is not stored afterwards. Other workers only see a write once their
+    entry expires, so the TTL bounds cross-process staleness.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[int, float]] = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> int | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, total: int, generation: int) -> None:
+        """Store a count computed while `generation` was current."""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (total, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached count (called after writes that change list membership)."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+count_cache = CountCache(settings.FEEDBACK_COUNT_CACHE_TTL_SECONDS, settings.FEEDBACK_COUNT_CACHE_SIZE)
+metrics.register_counter("feedback_count_cache_hits_total", lambda: count_cache.hits)
+metrics.register_counter("feedback_count_cache_misses_total", lambda: count_cache.misses)
+metrics.register_counter("feedback_count_cache_invalidations_total", lambda: count_cache.invalidations)
+metrics.register_gauge("feedback_count_cache_entries", count_cache.__len__)
+
+
+def estimate_count(db: Session, query: Query) -> int | None:
+    """Planner row estimate for a query on PostgreSQL; None elsewhere or on failure."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    # Filters are ids and enum members, so rendering them inline is safe
+    statement = query.order_by(None).statement.compile(
+        dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    try:
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+    except Exception as e:
+        logger.warning(f"Count estimate failed, falling back to exact: {e}")
+        db.rollback()
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_feedback(
+    db: Session,
+    query: Query,
+    strategy: CountStrategy,
+    key: Hashable
+) -> tuple[int | None, CountStrategy]:
+    """Total for a filtered feedback query and the strategy that produced it."""
+    if strategy == CountStrategy.NONE:
+        return None, strategy
+
+    if strategy == CountStrategy.ESTIMATED:
+        estimate = estimate_count(db, query)
+        if estimate is not None:
+            return estimate, strategy
+        return query.order_by(None).count(), CountStrategy.EXACT
+
+    if strategy == CountStrategy.CACHED:
+        total = count_cache.get(key)
+        if total is not None:
+            return total, strategy
+        generation = count_cache.generation
+        total = query.order_by(None).count()
+        count_cache.put(key, total, generation)
+        return total, strategy
+
+    return query.order_by(None).count(), CountStrategy.EXACT
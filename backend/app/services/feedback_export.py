@@ -0,0 +1,163 @@
+"""
+Streaming export of feedback as NDJSON or CSV.
+
+Rows are read in id order through a server-side cursor (yield_per; a named
+cursor on PostgreSQL) and turned into output one partition of
+EXPORT_CHUNK_SIZE rows at a time. Each partition needs one extra query for
+its tag links. Category and tag names come from the catalog cache, so
+memory use does not grow with the number of rows exported. Output can be
+gzip-compressed on the fly.
+
+The export opens its own session: the response body is produced after the
+request's dependencies (and their session) have been closed.
+"""
+import csv
+import io
+import json
+import logging
+import zlib
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.feedback import Feedback, FeedbackStatus, SentimentLabel
+from app.models.feedback_tag import FeedbackTag
+from app.services.catalog import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+# Exportable columns in output order; "category" and "tags" are names
+COLUMNS = (
+    "id", "user_id", "title", "content", "category", "tags", "status",
+    "sentiment_score", "sentiment_label", "created_at", "updated_at", "resolved_at",
+)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def parse_columns(columns: str | None) -> list[str]:
+    """Columns from a comma-separated list (all when empty); raises ValueError."""
+    if not columns:
+        return list(COLUMNS)
+    selected = [column.strip() for column in columns.split(",") if column.strip()]
+    unknown = [column for column in selected if column not in COLUMNS]
+    if unknown or not selected:
+        raise ValueError(f"Unknown columns {unknown}; choose from {', '.join(COLUMNS)}")
+    return selected
+
+
+class FeedbackExport:
+    """One export: filters, columns and output format."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        format: str = "ndjson",
+        columns: list[str] | None = None,
+        status: FeedbackStatus | None = None,
+        category_id: int | None = None,
+        sentiment_label: SentimentLabel | None = None,
+        chunk_size: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.format = format
+        self.columns = columns or list(COLUMNS)
+        self.conditions = []
+        if status:
+            self.conditions.append(Feedback.status == status)
+        if category_id:
+            self.conditions.append(Feedback.category_id == category_id)
+        if sentiment_label:
+            self.conditions.append(Feedback.sentiment_label == sentiment_label.value)
+        self.chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+        self.rows = 0
+
+    def stream(self, compress: bool = False) -> Iterator[bytes]:
+        """Encoded output, one chunk per partition (one gzip stream when compress)."""
+        if not compress:
+            yield from self._encoded()
+            return
+        gzip = zlib.compressobj(wbits=31)  # gzip container
+        for chunk in self._encoded():
+            data = gzip.compress(chunk)
+            if data:
+                yield data
+        yield gzip.flush()
+
+    def _encoded(self) -> Iterator[bytes]:
+        if self.format == "csv":
+            yield _csv_rows([self.columns])
+        for records in self._partitions():
+            if self.format == "csv":
+                yield _csv_rows(records)
+            else:
+                yield "".join(json.dumps(dict(zip(self.columns, record))) + "\n" for record in records).encode()
+
+    def _partitions(self) -> Iterator[list[list]]:
+        """Lists of output records (values in column order) per partition."""
+        columns = [Feedback.id] + [
+            getattr(Feedback, column) for column in self.columns
+            if column not in ("id", "category", "tags")
+        ]
+        if "category" in self.columns:
+            columns.append(Feedback.category_id)
+        db = self.session_factory()
+        try:
+            result = db.execute(
+                select(*columns)
+                .where(*self.conditions)
+                .order_by(Feedback.id)
+                .execution_options(yield_per=self.chunk_size)
+            )
+            for rows in result.partitions():
+                tags = self._tag_names(db, [row.id for row in rows]) if "tags" in self.columns else {}
+                records = []
+                for row in rows:
+                    values = row._mapping
+                    record = []
+                    for column in self.columns:
+                        if column == "category":
+                            category = catalog_cache.category(db, values["category_id"])
+                            record.append(category.name if category else None)
+                        elif column == "tags":
+                            record.append(tags.get(row.id, []))
+                        else:
+                            record.append(_plain(values[column]))
+                    records.append(record)
+                self.rows += len(records)
+                yield records
+        finally:
+            db.close()
+        logger.info(f"Exported {self.rows} feedback rows as {self.format}")
+
+    @staticmethod
+    def _tag_names(db: Session, feedback_ids: list[int]) -> dict[int, list[str]]:
+        links = db.execute(
+            select(FeedbackTag.feedback_id, FeedbackTag.tag_id)
+            .where(FeedbackTag.feedback_id.in_(feedback_ids))
+        ).all()
+        names = defaultdict(list)
+        tags = {tag.id: tag.name for tag in catalog_cache.tags(db, {link.tag_id for link in links})}
+        for link in links:
+            if link.tag_id in tags:
+                names[link.feedback_id].append(tags[link.tag_id])
+        return {feedback_id: sorted(tag_names) for feedback_id, tag_names in names.items()}
+
+
+def _plain(value):
+    """JSON/CSV-friendly value: enums by value, timestamps in ISO 8601."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+def _csv_rows(records: list[list]) -> bytes:
+    # Tags are "|"-separated, the format the CSV import reads
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        ["|".join(v) if isinstance(v, list) else v for v in record] for record in records
+    )
+    return buffer.getvalue().encode()
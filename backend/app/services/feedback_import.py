@@ -0,0 +1,472 @@
+"""
+Bulk import of historical feedback from CSV or NDJSON files.
+
+Records are streamed from the file and processed in batches, each in its
+own transaction:
+- invalid records are reported per row and skipped
+- sentiment is scored for the batch, in a process pool when processes > 1
+- category and tag names are resolved through in-memory name -> id maps,
+  creating missing ones unless create_missing is off; owner emails are
+  resolved with one lookup per batch
+- feedback ids are allocated up front so feedback, feedback_tags and the
+  initial status_events go in with COPY on PostgreSQL or multi-row INSERTs
+  elsewhere, and the daily rollup is adjusted with one upsert
+- the number of records consumed is stored in job_checkpoints, so an
+  interrupted import resumes after the last committed batch
+
+Fields: title, content (required), user_email (default: the importing
+owner), category, tags (a list, or "|"-separated in CSV), status (default
+new), created_at and resolved_at (ISO 8601).
+"""
+import csv
+import io
+import json
+import logging
+import math
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.category import Category
+from app.models.feedback import Feedback, FeedbackStatus
+from app.models.feedback_tag import FeedbackTag
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.status_event import StatusEvent
+from app.models.tag import Tag
+from app.models.user import User
+from app.services.catalog import catalog_cache
+from app.services.daily_stats import DailyStatsService, snapshot
+from app.services.feedback_counts import count_cache
+from app.services.sentiment_engine import LEXICON_VERSION, score_batch
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+
+_FEEDBACK_COLUMNS = [
+    "id", "user_id", "title", "content", "category_id", "status", "sentiment_score",
+    "sentiment_label", "sentiment_version", "created_at", "updated_at", "resolved_at",
+]
+_EVENT_COLUMNS = ["feedback_id", "old_status", "new_status", "changed_by", "created_at"]
+
+
+class RowError(ValueError):
+    """A record that cannot be imported."""
+
+
+def _score_texts(texts: list[str]) -> list[tuple[float, str]]:
+    """Process-pool entry point; each worker process builds its own engine."""
+    result = score_batch(texts)
+    return list(zip(result.scores.tolist(), result.labels.tolist()))
+
+
+def detect_format(filename: str) -> str:
+    """File format from the extension (.csv, .ndjson/.jsonl)."""
+    suffix = Path(filename).suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Cannot tell the format of {filename!r}; pass csv or ndjson")
+
+
+def read_records(stream: io.TextIOBase, format: str) -> Iterator[dict]:
+    """Yield raw records; malformed NDJSON lines yield a RowError instead."""
+    if format == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield RowError(f"invalid JSON: {e.msg}")
+            continue
+        yield record if isinstance(record, dict) else RowError("expected a JSON object")
+
+
+def _parse_datetime(value, name: str) -> datetime | None:
+    """A naive UTC timestamp; offsets are converted, so the rollup day is the UTC day reconcile() sees."""
+    if value in (None, ""):
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise RowError(f"{name} is not an ISO 8601 timestamp: {value!r}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_record(record: dict) -> dict:
+    """Validate one record into import fields; raises RowError."""
+    title = (record.get("title") or "").strip()
+    content = (record.get("content") or "").strip()
+    if not title or not content:
+        raise RowError("title and content are required")
+    if len(title) > 255:
+        raise RowError("title is longer than 255 characters")
+    try:
+        status = FeedbackStatus(record.get("status") or FeedbackStatus.NEW.value)
+    except ValueError:
+        raise RowError(f"unknown status {record.get('status')!r}")
+    tags = record.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split("|")
+    if not isinstance(tags, list):
+        raise RowError("tags must be a list of names")
+    return {
+        "title": title,
+        "content": content,
+        "user_email": (record.get("user_email") or "").strip() or None,
+        "category": (record.get("category") or "").strip() or None,
+        "tags": sorted({str(tag).strip() for tag in tags if str(tag).strip()}),
+        "status": status,
+        "created_at": _parse_datetime(record.get("created_at"), "created_at") or datetime.utcnow(),
+        "resolved_at": _parse_datetime(record.get("resolved_at"), "resolved_at"),
+    }
+
+
+@dataclass
+class ImportProgress:
+    name: str
+    running: bool = False
+    offset: int = 0  # records consumed and committed; resume position
+    imported: int = 0
+    failed: int = 0
+    batches: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    # First IMPORT_MAX_ERRORS rejected records: {"row": n, "error": message}
+    errors: list[dict] = field(default_factory=list)
+    _stop: threading.Event = field(default_factory=threading.Event, repr=False)
+
+
+class FeedbackImport:
+    """Import one CSV or NDJSON file in committed batches."""
+
+    def __init__(
+        self,
+        path: str,
+        owner_id: int,
+        format: str | None = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = settings.IMPORT_BATCH_SIZE,
+        processes: int = 0,
+        create_missing: bool = True,
+        name: str | None = None,
+    ):
+        self.path = path
+        self.owner_id = owner_id
+        self.format = format or detect_format(path)
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        # 0 or 1 scores in-process (the web server and SQLite tests use this)
+        self.processes = processes
+        self.create_missing = create_missing
+        self.checkpoint_name = f"feedback_import:{name or Path(path).name}"
+        self.progress = ImportProgress(name=self.checkpoint_name)
+        self._categories: dict[str, int] = {}
+        self._tags: dict[str, int] = {}
+        self._users: dict[str, int] = {}
+
+    def stop(self) -> None:
+        """Ask a running import to stop after the current batch."""
+        self.progress._stop.set()
+
+    def run(
+        self,
+        offset: int | None = None,
+        resume: bool = False,
+        max_batches: int | None = None
+    ) -> ImportProgress:
+        """
+        Import the file, starting after `offset` records (0 by default, or
+        the stored checkpoint with resume=True).
+        """
+        progress = self.progress
+        progress.running = True
+        progress.started_at = datetime.utcnow()
+        progress.finished_at = None
+        progress.error = None
+        progress._stop.clear()
+
+        executor = ProcessPoolExecutor(self.processes) if self.processes > 1 else None
+        try:
+            if offset is None:
+                offset = self._load_checkpoint() if resume else 0
+            progress.offset = offset
+            if offset:
+                logger.info(f"Import {self.checkpoint_name}: skipping the first {offset} records")
+            self._load_catalogs()
+
+            with open(self.path, newline="", encoding="utf-8") as stream:
+                batch = []
+                for number, record in enumerate(read_records(stream, self.format), start=1):
+                    if number <= offset:
+                        continue
+                    batch.append((number, record))
+                    if len(batch) >= self.batch_size:
+                        self._run_batch(batch, executor)
+                        batch = []
+                        if max_batches is not None and progress.batches >= max_batches:
+                            progress._stop.set()
+                        if progress._stop.is_set():
+                            break
+                if batch and not progress._stop.is_set():
+                    self._run_batch(batch, executor)
+        except Exception as e:
+            progress.error = str(e)
+            logger.error(f"Import {self.checkpoint_name} failed after {progress.offset} records: {e}")
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            progress.running = False
+            progress.finished_at = datetime.utcnow()
+
+        logger.info(
+            f"Import {self.checkpoint_name}: {progress.imported} imported, "
+            f"{progress.failed} rejected in {progress.batches} batch(es)"
+        )
+        return progress
+
+    def _run_batch(self, batch: list[tuple[int, dict]], executor: ProcessPoolExecutor | None) -> None:
+        """Validate, score and write one batch, then commit it with the checkpoint."""
+        progress = self.progress
+        db = self.session_factory()
+        catalog_version = None
+        created = False
+        try:
+            parsed, errors = [], []
+            for number, record in batch:
+                try:
+                    if isinstance(record, RowError):
+                        raise record
+                    parsed.append((number, parse_record(record)))
+                except RowError as e:
+                    errors.append({"row": number, "error": str(e)})
+
+            owners = self._resolve_users(db, {row["user_email"] for _, row in parsed if row["user_email"]})
+            valid = []
+            for number, row in parsed:
+                if row["user_email"] and row["user_email"] not in owners:
+                    errors.append({"row": number, "error": f"unknown user {row['user_email']!r}"})
+                    continue
+                row["user_id"] = owners.get(row["user_email"], self.owner_id)
+                valid.append((number, row))
+
+            if self.create_missing:
+                created = self._create_missing(db, [row for _, row in valid])
+                if created:
+                    catalog_version = catalog_cache.bump(db)
+            else:
+                valid = self._reject_unknown_names(valid, errors)
+            rows = [row for _, row in valid]
+
+            if rows:
+                scores = self._score([f"{row['title']} {row['content']}" for row in rows], executor)
+                self._write(db, rows, scores)
+            self._save_checkpoint(db, batch[-1][0])
+            db.commit()
+        except Exception:
+            db.rollback()
+            if created:
+                # The maps hold ids of names this transaction inserted
+                self._load_catalogs()
+            raise
+        finally:
+            db.close()
+
+        if rows:
+            count_cache.invalidate()
+        if catalog_version is not None:
+            catalog_cache.invalidate(catalog_version)
+        progress.offset = batch[-1][0]
+        progress.imported += len(rows)
+        progress.failed += len(errors)
+        progress.batches += 1
+        room = settings.IMPORT_MAX_ERRORS - len(progress.errors)
+        progress.errors.extend(sorted(errors, key=lambda e: e["row"])[:max(room, 0)])
+        logger.info(
+            f"Import {self.checkpoint_name}: {progress.offset} records read, "
+            f"{progress.imported} imported, {progress.failed} rejected"
+        )
+
+    def _write(self, db: Session, rows: list[dict], scores: list[tuple[float, str]]) -> None:
+        ids = self._allocate_ids(db, len(rows))
+        feedback, links, events, snapshots = [], [], [], []
+        for feedback_id, row, (score, label) in zip(ids, rows, scores):
+            category_id = self._categories.get(row["category"]) if row["category"] else None
+            resolved_at = row["resolved_at"]
+            if row["status"] == FeedbackStatus.RESOLVED and resolved_at is None:
+                resolved_at = row["created_at"]
+            feedback.append({
+                "id": feedback_id,
+                "user_id": row["user_id"],
+                "title": row["title"],
+                "content": row["content"],
+                "category_id": category_id,
+                "status": row["status"],
+                "sentiment_score": score,
+                "sentiment_label": label,
+                "sentiment_version": LEXICON_VERSION,
+                "created_at": row["created_at"],
+                "updated_at": row["created_at"],
+                "resolved_at": resolved_at,
+            })
+            links.extend({"feedback_id": feedback_id, "tag_id": self._tags[tag]} for tag in row["tags"])
+            events.append({
+                "feedback_id": feedback_id,
+                "old_status": None,
+                "new_status": row["status"].value,
+                "changed_by": row["user_id"],
+                "created_at": row["created_at"],
+            })
+            snapshots.append(snapshot(row["created_at"], category_id, row["status"], label, score))
+
+        if db.get_bind().dialect.name == "postgresql":
+            _copy(db, "feedback", _FEEDBACK_COLUMNS, feedback)
+            _copy(db, "feedback_tags", ["feedback_id", "tag_id"], links)
+            _copy(db, "status_events", _EVENT_COLUMNS, events)
+        else:
+            db.execute(insert(Feedback.__table__), feedback)
+            if links:
+                db.execute(insert(FeedbackTag.__table__), links)
+            db.execute(insert(StatusEvent.__table__), events)
+        DailyStatsService(db).apply(added=snapshots)
+
+    @staticmethod
+    def _allocate_ids(db: Session, count: int) -> list[int]:
+        """
+        Reserve feedback ids for a batch: from the id sequence on PostgreSQL,
+        after max(id) elsewhere (SQLite admits one writer at a time, so the
+        range stays free until this transaction commits).
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            return list(db.scalars(
+                text("SELECT nextval(pg_get_serial_sequence('feedback', 'id')) FROM generate_series(1, :n)"),
+                {"n": count},
+            ))
+        start = db.scalar(select(func.coalesce(func.max(Feedback.id), 0))) + 1
+        return list(range(start, start + count))
+
+    def _score(
+        self, texts: list[str], executor: ProcessPoolExecutor | None
+    ) -> list[tuple[float, str]]:
+        if executor is None:
+            return _score_texts(texts)
+        size = math.ceil(len(texts) / self.processes)
+        parts = [texts[i:i + size] for i in range(0, len(texts), size)]
+        return [result for part in executor.map(_score_texts, parts) for result in part]
+
+    def _load_catalogs(self) -> None:
+        db = self.session_factory()
+        try:
+            self._categories = dict(db.execute(select(Category.name, Category.id)).all())
+            self._tags = dict(db.execute(select(Tag.name, Tag.id)).all())
+        finally:
+            db.close()
+
+    def _resolve_users(self, db: Session, emails: set[str]) -> dict[str, int]:
+        unknown = emails - self._users.keys()
+        if unknown:
+            self._users.update(db.execute(select(User.email, User.id).where(User.email.in_(unknown))).all())
+        return self._users
+
+    def _create_missing(self, db: Session, rows: list[dict]) -> bool:
+        """
+        Add categories and tags the maps do not know yet to them, inserting
+        those that do not exist; True if any were inserted. Names created
+        since the maps were loaded (by an admin or another import) are
+        skipped by the insert and picked up by the select.
+        """
+        categories = {row["category"] for row in rows if row["category"]} - self._categories.keys()
+        tags = {tag for row in rows for tag in row["tags"]} - self._tags.keys()
+        dialect = db.get_bind().dialect.name
+        inserted = False
+        for model, names, names_to_ids in ((Category, categories, self._categories), (Tag, tags, self._tags)):
+            if not names:
+                continue
+            values = [{"name": name} for name in sorted(names)]
+            if dialect in ("postgresql", "sqlite"):
+                dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+                stmt = dialect_insert(model).values(values).on_conflict_do_nothing(index_elements=[model.name])
+                inserted |= db.execute(stmt).rowcount > 0
+            else:
+                existing = set(db.scalars(select(model.name).where(model.name.in_(names))))
+                values = [value for value in values if value["name"] not in existing]
+                if values:
+                    db.execute(insert(model), values)
+                    inserted = True
+            names_to_ids.update(db.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+        return inserted
+
+    def _reject_unknown_names(self, valid: list[tuple[int, dict]], errors: list[dict]) -> list[tuple[int, dict]]:
+        kept = []
+        for number, row in valid:
+            unknown = [tag for tag in row["tags"] if tag not in self._tags]
+            if row["category"] and row["category"] not in self._categories:
+                errors.append({"row": number, "error": f"unknown category {row['category']!r}"})
+            elif unknown:
+                errors.append({"row": number, "error": f"unknown tags {unknown}"})
+            else:
+                kept.append((number, row))
+        return kept
+
+    def _load_checkpoint(self) -> int:
+        db = self.session_factory()
+        try:
+            checkpoint = db.get(JobCheckpoint, self.checkpoint_name)
+            return checkpoint.position if checkpoint else 0
+        finally:
+            db.close()
+
+    def _save_checkpoint(self, db: Session, position: int) -> None:
+        checkpoint = db.get(JobCheckpoint, self.checkpoint_name)
+        if checkpoint is None:
+            db.add(JobCheckpoint(name=self.checkpoint_name, position=position))
+        else:
+            checkpoint.position = position
+        db.flush()
+
+
+def _copy_value(value) -> str:
+    """
+    One CSV field. Unquoted empty fields are NULL (imported text values are
+    never empty). Naive timestamps are UTC and are written with an explicit
+    +00:00, so a non-UTC session TimeZone cannot shift them.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    return getattr(value, "value", value)
+
+
+def _copy(db: Session, table: str, columns: list[str], rows: list[dict]) -> None:
+    """COPY rows into a table over the session's connection (psycopg2)."""
+    if not rows:
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    cursor = db.connection().connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
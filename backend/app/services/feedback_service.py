@@ -1,120 +1,144 @@
-import re
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 from fastapi import HTTPException, status
 from datetime import datetime
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from typing import NamedTuple
 
-from app.models.feedback import Feedback, FeedbackStatus
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.pagination import NEXT, PREV, CountStrategy, decode_cursor, encode_cursor
+from app.db.async_session import run_with_session
+from app.db.functions import timestamp_key
+from app.models.feedback import Feedback, FeedbackStatus, SentimentLabel
 from app.models.tag import Tag
-from app.models.category import Category
+from app.models.feedback_tag import FeedbackTag
 from app.models.status_event import StatusEvent
 from app.models.admin_response import AdminResponse
 from app.schemas.feedback import (
     FeedbackCreate,
     FeedbackUpdate,
     FeedbackResponse,
+    FeedbackDetailResponse,
     FeedbackListResponse,
     AdminResponseCreate,
+    AdminResponseResponse,
+)
+from app.services.catalog import catalog_cache
+from app.services.daily_stats import SNAPSHOT_COLUMNS, DailyStatsService, feedback_snapshot, row_snapshot
+from app.services.feedback_counts import count_cache, count_feedback
+from app.services.sentiment_engine import (  # noqa: F401 - re-exported for existing imports
+    CUSTOM_LEXICON,
+    STRONG_NEGATIVE_KEYWORDS,
+    STRONG_POSITIVE_KEYWORDS,
+    extract_words,
+    get_sentiment_engine,
 )
+from app.services.sentiment_worker import sentiment_queue
 
+_feedback = Feedback.__table__
+# Columns FeedbackResponse reads from a feedback row
+_RESPONSE_COLUMNS = tuple(_feedback.c[name] for name in (
+    "id", "user_id", "title", "content", "category_id", "status",
+    "sentiment_score", "sentiment_label", "created_at", "updated_at", "resolved_at",
+))
 
-def extract_words(text: str) -> set[str]:
-    """
-    Extract individual words from text for keyword matching.
-    - Lowercase
-    - Replace punctuation with spaces
-    - Split into words
-    - Return as set for O(1) membership testing
-    """
-    # Replace non-alphanumeric chars with spaces, then split
-    cleaned = re.sub(r'[^a-zA-Z0-9\s]', ' ', text.lower())
-    return set(cleaned.split())
-
-# Custom lexicon for product feedback sentiment analysis
-CUSTOM_LEXICON = {
-    # Strong negative words
-    "terrible": -3.5,
-    "awful": -3.5,
-    "unusable": -3.8,
-    "broken": -3.0,
-    "buggy": -2.5,
-    "confusing": -2.7,
-    "clunky": -2.3,
-    "frustrating": -2.5,
-    "horrible": -3.5,
-    "worst": -3.5,
-    "hate": -3.0,
-    "painful": -2.5,
-    "unreliable": -2.5,
-    # Positive words
-    "intuitive": 2.4,
-    "smooth": 2.2,
-    "clean": 1.8,
-    "amazing": 3.2,
-    "great": 2.5,
-    "excellent": 3.0,
-    "fantastic": 3.2,
-    "perfect": 3.5,
-    "love": 3.0,
-    "best": 2.8,
-    "beautiful": 2.5,
-    "helpful": 2.0,
-    "responsive": 2.0,
-    "fast": 1.8,
-}
-
-# Keywords for forced sentiment override
-STRONG_NEGATIVE_KEYWORDS = {"terrible", "awful", "unusable", "hate", "broken", "worst", "horrible"}
-STRONG_POSITIVE_KEYWORDS = {"amazing", "love", "perfect", "excellent", "fantastic", "great", "best"}
+
+class FeedbackPage(NamedTuple):
+    """A page of feedback rows as read by _paginate, before _page_response converts it."""
+    items: list[Feedback]
+    page_size: int
+    has_next: bool
+    has_prev: bool
+    total: int | None = None
+    count: CountStrategy = CountStrategy.NONE
+    page: int | None = None
 
 
 class FeedbackService:
     def __init__(self, db: Session):
         self.db = db
-        self.sentiment_analyzer = SentimentIntensityAnalyzer()
-        # Add custom lexicon to VADER
-        self.sentiment_analyzer.lexicon.update(CUSTOM_LEXICON)
+        # Shared, process-wide analyzer (lexicon is loaded once, not per request)
+        self.sentiment = get_sentiment_engine()
+        self.stats = DailyStatsService(db)
 
     def _calculate_sentiment(self, text: str) -> float:
         """Calculate sentiment score using VADER with custom lexicon."""
-        scores = self.sentiment_analyzer.polarity_scores(text)
-        return scores['compound']  # Returns -1 to 1
+        return self.sentiment.score(text)
 
     def _get_sentiment_label(self, score: float, text: str) -> str:
+        """Get sentiment label from score with keyword override."""
+        return self.sentiment.label(score, text)
+
+    @staticmethod
+    def _analyze_sentiment(text: str) -> tuple[float | None, str]:
         """
-        Get sentiment label from score with keyword override.
-        Uses improved thresholds for product feedback.
+        Analyze sentiment and return both score and label.
+        In async mode, returns (None, "pending") and leaves scoring to the
+        background enrichment queue.
         """
-        # Extract actual words (not substrings) for accurate matching
-        # This prevents "unbroken" from matching "broken"
-        words = extract_words(text)
-        
-        # Strong keyword overrides - check for exact word matches
-        if words & STRONG_NEGATIVE_KEYWORDS:  # Set intersection
-            return "negative"
-        if words & STRONG_POSITIVE_KEYWORDS:  # Set intersection
-            return "positive"
-        
-        # Use improved thresholds (wider neutral band than default VADER)
-        if score <= -0.20:
-            return "negative"
-        elif score >= 0.20:
-            return "positive"
-        else:
-            return "neutral"
+        if settings.SENTIMENT_ASYNC:
+            return None, SentimentLabel.PENDING.value
+        return get_sentiment_engine().analyze(text)
 
-    def _analyze_sentiment(self, text: str) -> tuple[float, str]:
-        """Analyze sentiment and return both score and label."""
-        score = self._calculate_sentiment(text)
-        label = self._get_sentiment_label(score, text)
-        return score, label
+    def _sentiment_version(self, label: str) -> str | None:
+        """Lexicon version to store with a result (None while pending)."""
+        return None if label == SentimentLabel.PENDING else self.sentiment.version
 
-    def create_feedback(self, user_id: int, request: FeedbackCreate) -> Feedback:
-        """Create new feedback."""
+    def create_feedback(
+        self,
+        user_id: int,
+        request: FeedbackCreate,
+        sentiment: tuple[float | None, str] | None = None
+    ) -> Feedback:
+        """
+        Create new feedback.
+        
+        Tag ids are checked against the catalog cache (unknown ids are
+        ignored) and linked with one multi-row insert. `sentiment` is the
+        (score, label) of the text when the caller analyzed it already.
+        
+        If the insert hits a constraint (a cached tag or the category was
+        deleted by another worker), the catalogs are reloaded and it is
+        retried once with the same sentiment; a second failure is a 400.
+        """
         # Calculate sentiment with both score and label
-        combined_text = f"{request.title} {request.content}"
-        sentiment_score, sentiment_label = self._analyze_sentiment(combined_text)
+        if sentiment is None:
+            sentiment = self._analyze_sentiment(f"{request.title} {request.content}")
+        
+        try:
+            feedback_id = self._insert_feedback(user_id, request, *sentiment)
+        except IntegrityError:
+            self.db.rollback()
+            catalog_cache.invalidate()
+            try:
+                feedback_id = self._insert_feedback(user_id, request, *sentiment)
+            except IntegrityError:
+                self.db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Category or tags no longer exist"
+                )
+        
+        count_cache.invalidate()
+        feedback = self._load_for_response(feedback_id)
+        
+        if feedback.sentiment_label == SentimentLabel.PENDING:
+            sentiment_queue.submit(feedback.id)
         
+        return feedback
+
+    def _insert_feedback(
+        self,
+        user_id: int,
+        request: FeedbackCreate,
+        sentiment_score: float | None,
+        sentiment_label: str
+    ) -> int:
+        """Insert and commit the feedback, its initial status event and tag links; returns its id."""
         feedback = Feedback(
             user_id=user_id,
             title=request.title,
@@ -122,14 +146,11 @@ class FeedbackService:
             category_id=request.category_id,
             sentiment_score=sentiment_score,
             sentiment_label=sentiment_label,
+            sentiment_version=self._sentiment_version(sentiment_label),
             status=FeedbackStatus.NEW
         )
         
-        # Add tags if provided
-        if request.tag_ids:
-            tags = self.db.query(Tag).filter(Tag.id.in_(request.tag_ids)).all()
-            feedback.tags = tags
-        
+        tag_ids = [tag.id for tag in catalog_cache.tags(self.db, request.tag_ids or [])]
         self.db.add(feedback)
         
         # Create initial status event
@@ -141,64 +162,147 @@ class FeedbackService:
         )
         self.db.add(status_event)
         
-        self.db.commit()
-        self.db.refresh(feedback)
+        # Flush to get the server-side created_at for the rollup day
+        self.db.flush()
+        if tag_ids:
+            self.db.execute(
+                insert(FeedbackTag),
+                [{"feedback_id": feedback.id, "tag_id": tag_id} for tag_id in tag_ids]
+            )
+        self.stats.apply(added=[feedback_snapshot(feedback)])
         
-        return feedback
+        feedback_id = feedback.id
+        self.db.commit()
+        return feedback_id
 
     def get_feedback_by_id(self, feedback_id: int) -> Feedback | None:
-        """Get feedback by ID with relationships loaded."""
+        """
+        Get feedback by ID with everything the detail view shows.
+        
+        The many-to-one category is joined; each collection is loaded by its
+        own IN query, so rows read grow with the sum of the collection sizes
+        instead of their product.
+        """
         return (
             self.db.query(Feedback)
             .options(
                 joinedload(Feedback.category),
-                joinedload(Feedback.tags),
-                joinedload(Feedback.admin_responses),
-                joinedload(Feedback.status_events)
+                selectinload(Feedback.tags),
+                selectinload(Feedback.admin_responses),
+                selectinload(Feedback.status_events)
             )
             .filter(Feedback.id == feedback_id)
             .first()
         )
 
+    def _get_for_write(self, feedback_id: int, *columns) -> Feedback | None:
+        """
+        Load the columns write paths check (owner, status, rollup snapshot)
+        plus any extra `columns`; relationships stay unloaded.
+        """
+        return (
+            self.db.query(Feedback)
+            .options(load_only(Feedback.user_id, *SNAPSHOT_COLUMNS, *columns))
+            .filter(Feedback.id == feedback_id)
+            .first()
+        )
+
+    def _load_for_response(self, feedback_id: int) -> Feedback:
+        """Reload a written row with what FeedbackResponse shows."""
+        return (
+            self.db.query(Feedback)
+            .options(joinedload(Feedback.category), selectinload(Feedback.tags))
+            .populate_existing()
+            .filter(Feedback.id == feedback_id)
+            .one()
+        )
+
+    def _update_returning(self, feedback_id: int, values: dict, old_column):
+        """
+        UPDATE one feedback row and return (row, previous value of old_column).
+
+        The row holds the response columns and the row's tag ids; it is None
+        when the feedback does not exist. On PostgreSQL the previous value
+        comes from a locked sub-select in the same statement; other dialects
+        read it first.
+        """
+        aggregate = func.array_agg if self._dialect == "postgresql" else func.group_concat
+        tag_ids = (
+            select(aggregate(FeedbackTag.tag_id))
+            .where(FeedbackTag.feedback_id == _feedback.c.id)
+            .scalar_subquery()
+            .label("tag_ids")
+        )
+        stmt = update(_feedback).values(**values)
+        
+        if self._dialect == "postgresql":
+            old = (
+                select(_feedback.c.id, old_column)
+                .where(_feedback.c.id == feedback_id)
+                .with_for_update()
+                .subquery("old")
+            )
+            stmt = stmt.where(_feedback.c.id == old.c.id).returning(
+                *_RESPONSE_COLUMNS, tag_ids, old.c[old_column.key].label("old_value")
+            )
+            row = self.db.execute(stmt).first()
+            return row, row.old_value if row is not None else None
+        
+        old = self.db.execute(select(old_column).where(_feedback.c.id == feedback_id)).first()
+        if old is None:
+            return None, None
+        stmt = stmt.where(_feedback.c.id == feedback_id).returning(*_RESPONSE_COLUMNS, tag_ids)
+        return self.db.execute(stmt).first(), old[0]
+
+    @property
+    def _dialect(self) -> str:
+        return self.db.get_bind().dialect.name
+
+    def _response(self, row, tag_ids) -> FeedbackResponse:
+        """FeedbackResponse from a RETURNING row plus the cached category and tags."""
+        if isinstance(tag_ids, str):
+            tag_ids = [int(tag_id) for tag_id in tag_ids.split(",")]
+        return FeedbackResponse.model_validate({
+            **row._mapping,
+            "category": catalog_cache.category(self.db, row.category_id),
+            "tags": catalog_cache.tags(self.db, tag_ids or []),
+        })
+
     def get_user_feedback(
         self,
         user_id: int,
         status: FeedbackStatus | None = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: str | None = None,
+        count: CountStrategy | None = None
     ) -> FeedbackListResponse:
         """Get feedback for a specific user."""
+        query, count_key = self._user_feedback_query(user_id, status)
+        return self._page_response(self._paginate(query, count_key, page, page_size, cursor, count))
+
+    def _user_feedback_query(self, user_id: int, status: FeedbackStatus | None = None):
         query = self.db.query(Feedback).filter(Feedback.user_id == user_id)
         
         if status:
             query = query.filter(Feedback.status == status)
         
-        total = query.count()
-        
-        items = (
-            query
-            .options(joinedload(Feedback.category), joinedload(Feedback.tags))
-            .order_by(Feedback.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-        )
-        
-        return FeedbackListResponse(
-            items=[FeedbackResponse.model_validate(item) for item in items],
-            total=total,
-            page=page,
-            page_size=page_size
-        )
+        return query, ("user", user_id, status)
 
     def get_all_feedback(
         self,
         status: FeedbackStatus | None = None,
         category_id: int | None = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        cursor: str | None = None,
+        count: CountStrategy | None = None
     ) -> FeedbackListResponse:
         """Get all feedback (admin only)."""
+        query, count_key = self._all_feedback_query(status, category_id)
+        return self._page_response(self._paginate(query, count_key, page, page_size, cursor, count))
+
+    def _all_feedback_query(self, status: FeedbackStatus | None = None, category_id: int | None = None):
         query = self.db.query(Feedback)
         
         if status:
@@ -206,32 +310,104 @@ class FeedbackService:
         if category_id:
             query = query.filter(Feedback.category_id == category_id)
         
-        total = query.count()
+        return query, ("all", status, category_id)
+
+    def _paginate(
+        self,
+        query,
+        count_key: tuple,
+        page: int,
+        page_size: int,
+        cursor: str | None,
+        count: CountStrategy | None
+    ) -> FeedbackPage:
+        """
+        Page through a feedback query, newest first.
+        
+        Without a cursor this is the page/page_size compatibility mode
+        (OFFSET, exact count by default). With a cursor ("" for the first
+        page) rows are read by seeking past the (created_at, id) key, so every
+        page costs the same and no count is run unless one is requested.
+        Both modes return cursors and has_more.
+        """
+        if count is None:
+            count = CountStrategy.EXACT if cursor is None else CountStrategy.NONE
+        total, count = count_feedback(self.db, query, count, count_key)
+        
+        # Relationships are loaded by id after the page is read: joined eager
+        # loads would wrap the LIMIT in a subquery and re-sort its result
+        query = query.options(selectinload(Feedback.category), selectinload(Feedback.tags))
+        created_at = timestamp_key(Feedback.created_at)
+        newest_first = (created_at.desc(), Feedback.id.desc())
+        
+        if cursor is None:
+            items = (
+                query
+                .order_by(*newest_first)
+                .offset((page - 1) * page_size)
+                .limit(page_size + 1)
+                .all()
+            )
+            return FeedbackPage(
+                items[:page_size], page_size, has_next=len(items) > page_size, has_prev=page > 1,
+                total=total, count=count, page=page
+            )
+        
+        position = decode_cursor(cursor) if cursor else None
+        if position is not None:
+            seek = timestamp_key(literal(position.created_at, Feedback.created_at.type))
+            key = tuple_(seek, position.id)
+            # The redundant bound on the leading column lets SQLite range-seek
+            # the index; PostgreSQL seeks on the row comparison alone
+            if position.direction == PREV:
+                query = query.filter(created_at >= seek, tuple_(created_at, Feedback.id) > key)
+            else:
+                query = query.filter(created_at <= seek, tuple_(created_at, Feedback.id) < key)
+        
+        if position is not None and position.direction == PREV:
+            # Read backwards from the cursor, then restore newest-first order
+            items = query.order_by(created_at.asc(), Feedback.id.asc()).limit(page_size + 1).all()
+            has_more = len(items) > page_size
+            items = items[:page_size][::-1]
+            return FeedbackPage(
+                items, page_size, has_next=True, has_prev=has_more, total=total, count=count
+            )
         
-        items = (
-            query
-            .options(joinedload(Feedback.category), joinedload(Feedback.tags))
-            .order_by(Feedback.created_at.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
+        items = query.order_by(*newest_first).limit(page_size + 1).all()
+        has_more = len(items) > page_size
+        return FeedbackPage(
+            items[:page_size], page_size, has_next=has_more, has_prev=position is not None,
+            total=total, count=count
         )
-        
+
+    @staticmethod
+    def _page_response(page: FeedbackPage) -> FeedbackListResponse:
+        items, has_next, has_prev = page.items, page.has_next, page.has_prev
         return FeedbackListResponse(
             items=[FeedbackResponse.model_validate(item) for item in items],
-            total=total,
-            page=page,
-            page_size=page_size
+            total=page.total,
+            count_strategy=page.count,
+            has_more=has_next,
+            page=page.page,
+            page_size=page.page_size,
+            next_cursor=encode_cursor(items[-1].created_at, items[-1].id, NEXT) if items and has_next else None,
+            prev_cursor=encode_cursor(items[0].created_at, items[0].id, PREV) if items and has_prev else None
         )
 
     def update_feedback(
         self,
         feedback_id: int,
         user_id: int,
-        request: FeedbackUpdate
+        request: FeedbackUpdate,
+        scored: tuple[str, tuple[float | None, str]] | None = None
     ) -> Feedback:
-        """Update feedback (owner only, if not resolved)."""
-        feedback = self.get_feedback_by_id(feedback_id)
+        """
+        Update feedback (owner only, if not resolved).
+        
+        `scored` is a (text, (score, label)) pair the caller analyzed
+        already; it is used if the updated text is still that text.
+        """
+        feedback = self._get_for_write(feedback_id, Feedback.title, Feedback.content)
         
         if not feedback:
             raise HTTPException(
@@ -251,23 +427,52 @@ class FeedbackService:
                 detail="Cannot edit resolved feedback"
             )
         
-        if request.title:
+        before = feedback_snapshot(feedback)
+        text_changed = False
+        if request.title and request.title != feedback.title:
             feedback.title = request.title
-        if request.content:
+            text_changed = True
+        if request.content and request.content != feedback.content:
             feedback.content = request.content
-        
-        # Recalculate sentiment (both score and label) when text changes
-        combined_text = f"{feedback.title} {feedback.content}"
-        feedback.sentiment_score, feedback.sentiment_label = self._analyze_sentiment(combined_text)
+            text_changed = True
+        
+        # Recalculate sentiment (both score and label) only when text changes;
+        # texts seen before are answered from the sentiment cache
+        if text_changed:
+            combined_text = f"{feedback.title} {feedback.content}"
+            if scored is not None and scored[0] == combined_text:
+                feedback.sentiment_score, feedback.sentiment_label = scored[1]
+            else:
+                feedback.sentiment_score, feedback.sentiment_label = self._analyze_sentiment(combined_text)
+            feedback.sentiment_version = self._sentiment_version(feedback.sentiment_label)
+            self.stats.move(before, feedback_snapshot(feedback))
         
         self.db.commit()
-        self.db.refresh(feedback)
+        feedback = self._load_for_response(feedback_id)
+        
+        if feedback.sentiment_label == SentimentLabel.PENDING:
+            sentiment_queue.submit(feedback.id)
         
         return feedback
 
+    def _updated_text(self, feedback_id: int, request: FeedbackUpdate) -> str | None:
+        """
+        The text update_feedback would analyze for request, or None if the
+        text would not change; releases the connection afterwards.
+        """
+        feedback = self._get_for_write(feedback_id, Feedback.title, Feedback.content)
+        text = None
+        if feedback is not None:
+            title = request.title or feedback.title
+            content = request.content or feedback.content
+            if (title, content) != (feedback.title, feedback.content):
+                text = f"{title} {content}"
+        self.db.rollback()
+        return text
+
     def delete_feedback(self, feedback_id: int, user_id: int) -> None:
         """Delete feedback (owner only, if not resolved)."""
-        feedback = self.get_feedback_by_id(feedback_id)
+        feedback = self._get_for_write(feedback_id)
         
         if not feedback:
             raise HTTPException(
@@ -287,92 +492,151 @@ class FeedbackService:
                 detail="Cannot delete resolved feedback"
             )
         
-        self.db.delete(feedback)
+        self.stats.apply(removed=[feedback_snapshot(feedback)])
+        # Delete children set-based: the ORM cascade would first load every
+        # tag link, status event and response just to delete them one by one
+        for child in (FeedbackTag, StatusEvent, AdminResponse):
+            self.db.execute(delete(child).where(child.feedback_id == feedback_id))
+        self.db.execute(delete(Feedback).where(Feedback.id == feedback_id))
         self.db.commit()
+        count_cache.invalidate()
 
     def update_status(
         self,
         feedback_id: int,
         admin_id: int,
         new_status: FeedbackStatus
-    ) -> Feedback:
-        """Update feedback status (admin only)."""
-        feedback = self.get_feedback_by_id(feedback_id)
+    ) -> FeedbackResponse:
+        """
+        Update feedback status (admin only).
         
-        if not feedback:
+        Two statements on PostgreSQL: UPDATE ... RETURNING (the new row and
+        its old status), then the rollup upsert carrying the status event
+        INSERT.
+        """
+        values = {"status": new_status}
+        if new_status == FeedbackStatus.RESOLVED:
+            values["resolved_at"] = datetime.utcnow()
+        row, old_status = self._update_returning(feedback_id, values, _feedback.c.status)
+        
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Feedback not found"
             )
         
-        old_status = feedback.status
-        feedback.status = new_status
-        
-        if new_status == FeedbackStatus.RESOLVED:
-            feedback.resolved_at = datetime.utcnow()
-        
-        # Create status event
-        status_event = StatusEvent(
+        status_event = insert(StatusEvent).values(
             feedback_id=feedback_id,
             old_status=old_status.value,
             new_status=new_status.value,
             changed_by=admin_id
         )
-        self.db.add(status_event)
+        after = row_snapshot(row)
+        self.stats.move(after._replace(status=old_status.value), after, alongside=status_event)
         
         self.db.commit()
-        self.db.refresh(feedback)
+        count_cache.invalidate()
         
-        return feedback
+        return self._response(row, row.tag_ids)
 
     def update_category(
         self,
         feedback_id: int,
         category_id: int
-    ) -> Feedback:
-        """Update feedback category (admin only)."""
-        feedback = self.get_feedback_by_id(feedback_id)
+    ) -> FeedbackResponse:
+        """
+        Update feedback category (admin only).
         
-        if not feedback:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Feedback not found"
+        Two statements on PostgreSQL: UPDATE ... RETURNING, then the rollup
+        upsert. The category is checked against the catalog cache.
+        """
+        category_not_found = HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found"
+        )
+        if catalog_cache.category(self.db, category_id) is None:
+            raise category_not_found
+        
+        try:
+            row, old_category_id = self._update_returning(
+                feedback_id, {"category_id": category_id}, _feedback.c.category_id
             )
+        except IntegrityError:
+            # Deleted by another worker since the cache was loaded
+            self.db.rollback()
+            catalog_cache.invalidate()
+            raise category_not_found
         
-        category = self.db.query(Category).filter(Category.id == category_id).first()
-        if not category:
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
+                detail="Feedback not found"
             )
         
-        feedback.category_id = category_id
+        after = row_snapshot(row)
+        self.stats.move(after._replace(category_id=old_category_id or 0), after)
         self.db.commit()
-        self.db.refresh(feedback)
+        count_cache.invalidate()
         
-        return feedback
+        return self._response(row, row.tag_ids)
 
     def update_tags(
         self,
         feedback_id: int,
         tag_ids: list[int]
-    ) -> Feedback:
-        """Update feedback tags (admin only)."""
-        feedback = self.get_feedback_by_id(feedback_id)
+    ) -> FeedbackResponse:
+        """
+        Update feedback tags (admin only).
         
-        if not feedback:
+        Links are replaced set-based: tags no longer listed are unlinked and
+        listed tags that exist and are not linked yet are inserted. On
+        PostgreSQL both run as CTEs of the UPDATE ... RETURNING that bumps
+        updated_at, so the whole change is one statement. Unknown tag ids
+        are ignored.
+        """
+        unlink = delete(FeedbackTag).where(FeedbackTag.feedback_id == feedback_id)
+        if tag_ids:
+            unlink = unlink.where(FeedbackTag.tag_id.not_in(tag_ids))
+        linked = select(FeedbackTag.tag_id).where(FeedbackTag.feedback_id == feedback_id)
+        # Joining feedback inserts nothing if the feedback does not exist
+        new_links = (
+            select(_feedback.c.id, Tag.id)
+            .join_from(Tag, _feedback, _feedback.c.id == feedback_id)
+            .where(Tag.id.in_(tag_ids), Tag.id.not_in(linked))
+        )
+        touch = (
+            update(_feedback)
+            .where(_feedback.c.id == feedback_id)
+            .values(updated_at=func.now())
+            .returning(*_RESPONSE_COLUMNS)
+        )
+        
+        if self._dialect == "postgresql":
+            touch = touch.add_cte(unlink.cte("unlink"))
+            if tag_ids:
+                link = (
+                    postgresql.insert(FeedbackTag)
+                    .from_select(["feedback_id", "tag_id"], new_links)
+                    .on_conflict_do_nothing()
+                )
+                touch = touch.add_cte(link.cte("link"))
+            row = self.db.execute(touch).first()
+        else:
+            row = self.db.execute(touch).first()
+            if row is not None:
+                self.db.execute(unlink)
+                if tag_ids:
+                    self.db.execute(insert(FeedbackTag).from_select(["feedback_id", "tag_id"], new_links))
+        
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Feedback not found"
             )
         
-        tags = self.db.query(Tag).filter(Tag.id.in_(tag_ids)).all()
-        feedback.tags = tags
-        
         self.db.commit()
-        self.db.refresh(feedback)
         
-        return feedback
+        return self._response(row, tag_ids)
 
     def add_admin_response(
         self,
@@ -381,7 +645,7 @@ class FeedbackService:
         request: AdminResponseCreate
     ) -> AdminResponse:
         """Add admin response to feedback."""
-        feedback = self.get_feedback_by_id(feedback_id)
+        feedback = self._get_for_write(feedback_id)
         
         if not feedback:
             raise HTTPException(
@@ -400,3 +664,91 @@ class FeedbackService:
         self.db.refresh(admin_response)
         
         return admin_response
+
+
+class AsyncFeedbackService:
+    """
+    FeedbackService for async routes.
+    
+    Each call runs the FeedbackService method with run_with_session: on an
+    AsyncSession (DB_ASYNC) its statements await the async driver, on a sync
+    Session it runs on the threadpool. run_sync executes on the event loop,
+    so on an AsyncSession only the database work runs there: sentiment is
+    analyzed beforehand and ORM rows are converted to response schemas
+    afterwards, both on the threadpool. Rows are eagerly loaded, so the
+    conversion needs no lazy loads.
+    """
+
+    def __init__(self, db: Session | AsyncSession):
+        self.db = db
+
+    async def _run(self, fn, convert=None):
+        return await run_with_session(self.db, lambda session: fn(FeedbackService(session)), convert)
+
+    @property
+    def _on_event_loop(self) -> bool:
+        """Whether _run executes FeedbackService on the event loop."""
+        return isinstance(self.db, AsyncSession)
+
+    async def create_feedback(self, user_id: int, request: FeedbackCreate) -> FeedbackResponse:
+        sentiment = None
+        if self._on_event_loop:
+            sentiment = await run_in_threadpool(
+                FeedbackService._analyze_sentiment, f"{request.title} {request.content}"
+            )
+        return await self._run(
+            lambda service: service.create_feedback(user_id, request, sentiment),
+            FeedbackResponse.model_validate,
+        )
+
+    async def get_feedback_by_id(self, feedback_id: int) -> FeedbackDetailResponse | None:
+        def detail(feedback: Feedback | None) -> FeedbackDetailResponse | None:
+            return FeedbackDetailResponse.model_validate(feedback) if feedback is not None else None
+        return await self._run(lambda service: service.get_feedback_by_id(feedback_id), detail)
+
+    async def get_user_feedback(self, user_id: int, status: FeedbackStatus | None = None, **paging) -> FeedbackListResponse:
+        return await self._run(
+            lambda service: service._paginate(*service._user_feedback_query(user_id, status), **paging),
+            FeedbackService._page_response,
+        )
+
+    async def get_all_feedback(
+        self, status: FeedbackStatus | None = None, category_id: int | None = None, **paging
+    ) -> FeedbackListResponse:
+        return await self._run(
+            lambda service: service._paginate(*service._all_feedback_query(status, category_id), **paging),
+            FeedbackService._page_response,
+        )
+
+    async def update_feedback(self, feedback_id: int, user_id: int, request: FeedbackUpdate) -> FeedbackResponse:
+        scored = None
+        if self._on_event_loop and not settings.SENTIMENT_ASYNC:
+            # One extra read for the current text, so the update itself
+            # only writes; a concurrent edit in between is analyzed inline
+            text = await self._run(lambda service: service._updated_text(feedback_id, request))
+            if text is not None:
+                scored = text, await run_in_threadpool(FeedbackService._analyze_sentiment, text)
+        return await self._run(
+            lambda service: service.update_feedback(feedback_id, user_id, request, scored),
+            FeedbackResponse.model_validate,
+        )
+
+    async def delete_feedback(self, feedback_id: int, user_id: int) -> None:
+        await self._run(lambda service: service.delete_feedback(feedback_id, user_id))
+
+    async def update_status(self, feedback_id: int, admin_id: int, new_status: FeedbackStatus) -> FeedbackResponse:
+        return await self._run(lambda service: service.update_status(feedback_id, admin_id, new_status))
+
+    async def update_category(self, feedback_id: int, category_id: int) -> FeedbackResponse:
+        return await self._run(lambda service: service.update_category(feedback_id, category_id))
+
+    async def update_tags(self, feedback_id: int, tag_ids: list[int]) -> FeedbackResponse:
+        return await self._run(lambda service: service.update_tags(feedback_id, tag_ids))
+
+    async def add_admin_response(
+        self, feedback_id: int, admin_id: int, request: AdminResponseCreate
+    ) -> AdminResponseResponse:
+        return await self._run(
+            lambda service: service.add_admin_response(feedback_id, admin_id, request),
+            AdminResponseResponse.model_validate,
+        )
@@ -0,0 +1,111 @@
+"""
+Per-account and per-IP login failure throttling.
+
+Failed logins are kept as timestamps in sliding windows of
+LOGIN_FAILURE_WINDOW_SECONDS. Once an account or a client IP has too many
+failures in its window, further attempts get 429 with Retry-After before
+any password is hashed, until the oldest failure leaves the window. A
+successful login clears its account's failures but not its IP's.
+
+State is per process and bounded: the least recently failing keys are
+dropped beyond LOGIN_THROTTLE_MAX_KEYS.
+"""
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowCounter:
+    """Event timestamps per key within a sliding window, for a bounded number of keys."""
+
+    def __init__(self, window_seconds: float, max_keys: int):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._events: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def count(self, key: str, now: float) -> tuple[int, float]:
+        """(events in the window, seconds until the oldest one leaves it)."""
+        events = self._events.get(key)
+        if not events:
+            return 0, 0.0
+        while events and events[0] <= now - self.window_seconds:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return 0, 0.0
+        return len(events), events[0] + self.window_seconds - now
+
+    def add(self, key: str, now: float, limit: int) -> None:
+        events = self._events.setdefault(key, deque(maxlen=limit))
+        events.append(now)
+        self._events.move_to_end(key)
+        while len(self._events) > self.max_keys:
+            self._events.popitem(last=False)
+
+    def clear(self, key: str | None = None) -> None:
+        if key is None:
+            self._events.clear()
+        else:
+            self._events.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+class LoginThrottle:
+    """Failure windows per account (email) and per client IP."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accounts = SlidingWindowCounter(settings.LOGIN_FAILURE_WINDOW_SECONDS, settings.LOGIN_THROTTLE_MAX_KEYS)
+        self.ips = SlidingWindowCounter(settings.LOGIN_FAILURE_WINDOW_SECONDS, settings.LOGIN_THROTTLE_MAX_KEYS)
+        self.throttled = {"account": 0, "ip": 0}
+
+    def check(self, email: str, ip: str | None) -> None:
+        """Raise 429 if the account or the IP is over its failure limit."""
+        now = time.monotonic()
+        limits = [("account", self.accounts, email.lower(), settings.LOGIN_MAX_FAILURES_PER_ACCOUNT)]
+        if ip:
+            limits.append(("ip", self.ips, ip, settings.LOGIN_MAX_FAILURES_PER_IP))
+        with self._lock:
+            for scope, counter, key, limit in limits:
+                failures, retry_after = counter.count(key, now)
+                if failures >= limit:
+                    self.throttled[scope] += 1
+                    logger.warning(f"Login throttled by {scope}: {key} ({failures} failures)")
+                    raise HTTPException(
+                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                        detail="Too many failed login attempts, please retry later",
+                        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+                    )
+
+    def record_failure(self, email: str, ip: str | None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.accounts.add(email.lower(), now, settings.LOGIN_MAX_FAILURES_PER_ACCOUNT)
+            if ip:
+                self.ips.add(ip, now, settings.LOGIN_MAX_FAILURES_PER_IP)
+
+    def record_success(self, email: str) -> None:
+        with self._lock:
+            self.accounts.clear(email.lower())
+
+    def reset(self) -> None:
+        with self._lock:
+            self.accounts.clear()
+            self.ips.clear()
+
+
+login_throttle = LoginThrottle()
+metrics.register_counter("login_throttled_total", lambda: login_throttle.throttled["account"], scope="account")
+metrics.register_counter("login_throttled_total", lambda: login_throttle.throttled["ip"], scope="ip")
+metrics.register_gauge("login_throttle_keys", lambda: len(login_throttle.accounts) + len(login_throttle.ips))
@@ -0,0 +1,119 @@
+"""
+Bounded executor for bcrypt hashing and verification.
+
+bcrypt is deliberately slow. Run inline on the request threadpool, a burst
+of logins (everyone arriving at 9am, or credential stuffing) would occupy
+every threadpool slot and stall unrelated requests. Hashes run on
+PASSWORD_HASH_WORKERS dedicated threads instead. At most
+PASSWORD_HASH_QUEUE_SIZE more requests may wait for one, so logins never
+hold more than workers + queue request threads. Further requests get 503
+with Retry-After at once instead of queueing.
+
+Async routes await ahash/averify, so they hold no thread while they wait.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Password hashing on a fixed-size pool with an admission limit."""
+
+    def __init__(self, workers: int, max_queue: int, timeout_seconds: float):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def check_capacity(self) -> None:
+        """Raise 503 early, before any other work, if no hash could be admitted now."""
+        if self.pending >= self.workers + self.max_queue:
+            with self._lock:
+                self.rejected += 1
+            raise self._saturated()
+
+    def hash(self, password: str) -> str:
+        return self._run(get_password_hash, password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._run(verify_password, password, hashed_password)
+
+    async def ahash(self, password: str) -> str:
+        return await self._arun(get_password_hash, password)
+
+    async def averify(self, password: str, hashed_password: str) -> bool:
+        return await self._arun(verify_password, password, hashed_password)
+
+    def _run(self, fn: Callable[..., T], *args) -> T:
+        future = self._submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except TimeoutError:
+            future.cancel()
+            raise self._timed_out()
+
+    async def _arun(self, fn: Callable[..., T], *args) -> T:
+        future = self._submit(fn, *args)
+        try:
+            # Cancelling the wrapper on timeout cancels the queued hash too
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout_seconds)
+        except TimeoutError:
+            raise self._timed_out()
+
+    def _submit(self, fn: Callable[..., T], *args) -> Future:
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise self._saturated()
+            self.pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except RuntimeError:
+            self._done()
+            raise
+        # Counted until the hash finishes, even if the request stops waiting
+        future.add_done_callback(self._done)
+        return future
+
+    def _timed_out(self) -> HTTPException:
+        self.timeouts += 1
+        logger.warning(f"Password hash waited more than {self.timeout_seconds}s; rejecting")
+        return self._saturated()
+
+    def _done(self, future=None) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    @staticmethod
+    def _saturated() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_SIZE,
+    settings.PASSWORD_HASH_TIMEOUT_SECONDS,
+)
+metrics.register_gauge("password_hash_pending", lambda: password_hasher.pending)
+metrics.register_counter("password_hash_rejected_total", lambda: password_hasher.rejected)
+metrics.register_counter("password_hash_timeouts_total", lambda: password_hasher.timeouts)
@@ -0,0 +1,127 @@
+"""
+Authenticated principals by user id.
+
+Every authenticated request used to load its user row before the route did
+any work. get_current_user now keeps what routes read from it (id, email,
+role, created_at) in a bounded per-process TTL cache, so repeated requests
+from the same user do not touch the database.
+
+Updates and deletes of a user through the ORM drop its entry once the
+change is committed. Other workers keep their entry until it expires, so
+PRINCIPAL_CACHE_TTL_SECONDS bounds how long a role change takes to apply
+everywhere.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.user import User, UserRole
+
+
+class Principal(NamedTuple):
+    """The authenticated user as routes see it (created_at is None when built from token claims)."""
+    id: int
+    email: str
+    role: UserRole
+    created_at: datetime | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.email, user.role, user.created_at)
+
+    @classmethod
+    def from_claims(cls, claims: dict) -> "Principal":
+        return cls(int(claims["sub"]), claims.get("email", ""), UserRole(claims["role"]))
+
+
+class PrincipalCache:
+    """
+    Per-process TTL cache of principals keyed by user id.
+
+    invalidate() bumps a generation so a row loaded concurrently with a
+    change is not stored afterwards.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, tuple[Principal, float]] = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> Principal | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self._entries.pop(user_id, None)
+            self.misses += 1
+            return None
+
+    def put(self, principal: Principal, generation: int) -> None:
+        """Store a principal loaded while `generation` was current."""
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[principal.id] = (principal, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int | None = None) -> None:
+        """Drop one user's entry (or every entry when user_id is None)."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+            self.generation += 1
+            self.invalidations += 1
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_SIZE)
+metrics.register_counter("principal_cache_hits_total", lambda: principal_cache.hits)
+metrics.register_counter("principal_cache_misses_total", lambda: principal_cache.misses)
+metrics.register_counter("principal_cache_invalidations_total", lambda: principal_cache.invalidations)
+metrics.register_gauge("principal_cache_hit_ratio", lambda: principal_cache.hit_ratio)
+metrics.register_gauge("principal_cache_entries", principal_cache.__len__)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target: User) -> None:
+    # Remembered on the session and dropped once the change is committed
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
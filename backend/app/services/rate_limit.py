@@ -0,0 +1,85 @@
+"""
+Token buckets and concurrency caps behind RateLimitMiddleware.
+
+Both are per process and only touched from the event loop (the middleware
+decides before a request reaches the threadpool), so they take no locks.
+Bucket state is bounded: the least recently used keys are dropped beyond
+RATE_LIMIT_MAX_KEYS, which at worst hands a dropped key a full bucket.
+"""
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class TokenBuckets:
+    """Token buckets per key for a bounded number of keys."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: tuple, now: float, rate: float, burst: int) -> float:
+        """Take a token from key's bucket (refilled at `rate` a second up to `burst`).
+
+        Returns 0 if there was one, else the seconds until there will be.
+        """
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    """Per-key buckets (overall and per route) and in-flight counts per capped route."""
+
+    def __init__(self):
+        self.buckets = TokenBuckets(settings.RATE_LIMIT_MAX_KEYS)
+        self.in_flight: dict[str, int] = {}
+
+    def take(self, key: str, path: str, now: float) -> tuple[str, float] | None:
+        """None if key may make a request to path now, else (the limit hit, seconds to wait)."""
+        retry_after = self.buckets.take((key,), now, settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+        if retry_after:
+            return "user", retry_after
+        route_limit = settings.RATE_LIMIT_ROUTES.get(path)
+        if route_limit is not None:
+            retry_after = self.buckets.take((key, path), now, *route_limit)
+            if retry_after:
+                return "route", retry_after
+        return None
+
+    def acquire(self, path: str, limit: int) -> bool:
+        """Count a request to path in flight unless `limit` already are."""
+        in_flight = self.in_flight.get(path, 0)
+        if in_flight >= limit:
+            return False
+        self.in_flight[path] = in_flight + 1
+        metrics.set_gauge("rate_limit_in_flight", in_flight + 1, route=path)
+        return True
+
+    def release(self, path: str) -> None:
+        self.in_flight[path] -= 1
+        metrics.set_gauge("rate_limit_in_flight", self.in_flight[path], route=path)
+
+    def reset(self) -> None:
+        self.buckets.clear()
+        self.in_flight.clear()
+
+
+rate_limiter = RateLimiter()
+metrics.register_gauge("rate_limit_keys", rate_limiter.buckets.__len__)
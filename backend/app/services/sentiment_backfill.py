@@ -0,0 +1,308 @@
+"""
+Incremental re-scoring of feedback whose sentiment_version is stale.
+
+Rows are read in primary-key order with keyset pagination (id > last id)
+without locks, scored in a process pool outside any transaction, and
+written back in one short transaction per chunk by an UPDATE guarded on
+each row's updated_at as read: one UPDATE ... FROM (VALUES ...) RETURNING
+id on PostgreSQL, one UPDATE per row elsewhere. Only rows the UPDATE
+matched get rollup deltas; a row edited while its chunk was scored is left
+to the owner's edit (which re-scores it) or to the next --restart run. The
+last committed id is stored in job_checkpoints, which lets a crashed or
+stopped run resume where it left off.
+
+Runs happen in the CLI (`python -m app.cli backfill-sentiment`), never in
+the web process: POST /admin/sentiment/backfill only records a request,
+which `backfill-sentiment --if-requested` (e.g. from cron) claims and runs.
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Float, Integer, String, bindparam, cast, column, delete, or_, select, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.feedback import Feedback, SentimentLabel
+from app.models.job_checkpoint import JobCheckpoint
+from app.services.daily_stats import SNAPSHOT_COLUMNS, DailyStatsService, row_snapshot
+from app.services.sentiment_engine import LEXICON_VERSION, score_batch
+
+logger = logging.getLogger(__name__)
+
+_feedback = Feedback.__table__
+
+
+def _is_stale(version: str):
+    """Rows scored by another lexicon version, excluding pending rows."""
+    return (
+        or_(_feedback.c.sentiment_version.is_(None), _feedback.c.sentiment_version != version),
+        # Pending rows belong to the enrichment queue
+        _feedback.c.sentiment_label.is_distinct_from(SentimentLabel.PENDING.value),
+    )
+
+
+# updated_at as text, so the value read compares equal on every dialect
+# (SQLite stores it as a string that does not round-trip through datetime)
+_seen = cast(_feedback.c.updated_at, String)
+
+# Rows are not locked while scored: a row is only written if it is still
+# stale and unchanged since it was read. updated_at is written back
+# unchanged so a backfill does not look like a user edit.
+_apply_scores = (
+    update(_feedback)
+    .where(
+        _feedback.c.id == bindparam("b_id"),
+        _seen.is_not_distinct_from(bindparam("b_seen")),
+        *_is_stale(bindparam("b_version")),
+    )
+    .values(
+        sentiment_score=bindparam("b_score"),
+        sentiment_label=bindparam("b_label"),
+        sentiment_version=bindparam("b_version"),
+        updated_at=_feedback.c.updated_at,
+    )
+)
+
+
+def _apply_scores_returning(rows, results, version: str):
+    """PostgreSQL: the chunk's guarded UPDATE as one statement, returning the ids it changed."""
+    scores = values(
+        column("id", Integer), column("score", Float), column("label", String), column("seen", String),
+        name="scores",
+    ).data([(r.id, score, label, r.seen) for r, (score, label) in zip(rows, results)])
+    return (
+        update(_feedback)
+        .where(
+            _feedback.c.id == scores.c.id,
+            _seen.is_not_distinct_from(scores.c.seen),
+            *_is_stale(version),
+        )
+        .values(
+            sentiment_score=scores.c.score,
+            sentiment_label=scores.c.label,
+            sentiment_version=version,
+            updated_at=_feedback.c.updated_at,
+        )
+        .returning(_feedback.c.id)
+    )
+
+
+def _score_texts(texts: list[str]) -> list[tuple[float, str]]:
+    """Process-pool entry point; each worker process builds its own engine."""
+    result = score_batch(texts)
+    return list(zip(result.scores.tolist(), result.labels.tolist()))
+
+
+@dataclass
+class BackfillProgress:
+    version: str
+    running: bool = False
+    scanned: int = 0
+    updated: int = 0
+    chunks: int = 0
+    last_id: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
+    _stop: threading.Event = field(default_factory=threading.Event, repr=False)
+
+
+@dataclass
+class BackfillStatus:
+    """A version's backfill as recorded in job_checkpoints (readable from any process)."""
+    version: str
+    requested: bool
+    restart: bool
+    last_id: int
+    checkpoint_at: datetime | None
+
+
+class SentimentBackfill:
+    """Re-score stale feedback rows in keyset-ordered chunks."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        chunk_size: int = settings.SENTIMENT_BACKFILL_CHUNK_SIZE,
+        processes: int = 0,
+        pause_seconds: float = settings.SENTIMENT_BACKFILL_PAUSE_SECONDS,
+        version: str = LEXICON_VERSION,
+    ):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        # 0 or 1 scores in-process (the web server and SQLite tests use this)
+        self.processes = processes
+        self.pause_seconds = pause_seconds
+        self.version = version
+        self.checkpoint_name = f"sentiment_backfill:{version}"
+        # Pending run requested through the API; position 1 asks for a restart
+        self.request_name = f"sentiment_backfill_request:{version}"
+        self.progress = BackfillProgress(version=version)
+
+    def stop(self) -> None:
+        """Ask a running backfill to stop after the current chunk."""
+        self.progress._stop.set()
+
+    def request(self, db: Session, restart: bool = False) -> None:
+        """Record that a run was asked for (a pending restart stays a restart)."""
+        request = db.get(JobCheckpoint, self.request_name)
+        if request is None:
+            db.add(JobCheckpoint(name=self.request_name, position=int(restart)))
+        else:
+            request.position = max(request.position, int(restart))
+        db.commit()
+
+    def status(self, db: Session) -> BackfillStatus:
+        request = db.get(JobCheckpoint, self.request_name)
+        checkpoint = db.get(JobCheckpoint, self.checkpoint_name)
+        return BackfillStatus(
+            version=self.version,
+            requested=request is not None,
+            restart=bool(request is not None and request.position),
+            last_id=checkpoint.position if checkpoint else 0,
+            checkpoint_at=checkpoint.updated_at if checkpoint else None,
+        )
+
+    def run_requested(self, max_chunks: int | None = None) -> BackfillProgress | None:
+        """Claim and run a requested run; None when nothing was requested."""
+        db = self.session_factory()
+        try:
+            request = db.get(JobCheckpoint, self.request_name)
+            if request is None:
+                return None
+            restart = bool(request.position)
+            # Only one process claims a request
+            claimed = db.execute(
+                delete(JobCheckpoint).where(
+                    JobCheckpoint.name == self.request_name,
+                    JobCheckpoint.position == request.position,
+                )
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        if not claimed:
+            return None
+        return self.run(restart=restart, max_chunks=max_chunks)
+
+    def run(self, restart: bool = False, max_chunks: int | None = None) -> BackfillProgress:
+        """Process stale rows until none are left (or max_chunks is reached)."""
+        progress = self.progress
+        progress.running = True
+        progress.started_at = datetime.utcnow()
+        progress.finished_at = None
+        progress.error = None
+        progress._stop.clear()
+
+        executor = ProcessPoolExecutor(self.processes) if self.processes > 1 else None
+        try:
+            progress.last_id = 0 if restart else self._load_checkpoint()
+            if progress.last_id:
+                logger.info(f"Resuming sentiment backfill {self.version} after id {progress.last_id}")
+
+            while not progress._stop.is_set():
+                if max_chunks is not None and progress.chunks >= max_chunks:
+                    break
+                if not self._run_chunk(executor):
+                    break
+                if self.pause_seconds:
+                    time.sleep(self.pause_seconds)
+        except Exception as e:
+            progress.error = str(e)
+            logger.error(f"Sentiment backfill failed after id {progress.last_id}: {e}")
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            progress.running = False
+            progress.finished_at = datetime.utcnow()
+
+        logger.info(
+            f"Sentiment backfill {self.version}: scanned {progress.scanned}, "
+            f"updated {progress.updated} in {progress.chunks} chunk(s)"
+        )
+        return progress
+
+    def _run_chunk(self, executor: ProcessPoolExecutor | None) -> bool:
+        """Score and write one chunk. Returns False when nothing is left."""
+        progress = self.progress
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(Feedback.id, Feedback.title, Feedback.content, _seen.label("seen"), *SNAPSHOT_COLUMNS)
+                .where(Feedback.id > progress.last_id, *_is_stale(self.version))
+                .order_by(Feedback.id)
+                .limit(self.chunk_size)
+            ).all()
+            # End the read transaction: nothing is held while the chunk is scored
+            db.rollback()
+            if not rows:
+                return False
+
+            results = self._score([f"{r.title} {r.content}" for r in rows], executor)
+            if db.get_bind().dialect.name == "postgresql":
+                changed = set(db.execute(_apply_scores_returning(rows, results, self.version)).scalars())
+            else:
+                changed = {
+                    r.id
+                    for r, (score, label) in zip(rows, results)
+                    if db.execute(_apply_scores, {
+                        "b_id": r.id,
+                        "b_seen": r.seen,
+                        "b_score": score,
+                        "b_label": label,
+                        "b_version": self.version,
+                    }).rowcount
+                }
+            # A row deleted, re-scored or edited since the read matched
+            # nothing, so it gets no rollup delta
+            scored = [(r, result) for r, result in zip(rows, results) if r.id in changed]
+            DailyStatsService(db).apply(
+                removed=[row_snapshot(r) for r, _ in scored],
+                added=[row_snapshot(r, label, score) for r, (score, label) in scored],
+            )
+            self._save_checkpoint(db, rows[-1].id)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        progress.last_id = rows[-1].id
+        progress.scanned += len(rows)
+        progress.updated += len(scored)
+        progress.chunks += 1
+        return True
+
+    def _score(
+        self, texts: list[str], executor: ProcessPoolExecutor | None
+    ) -> list[tuple[float, str]]:
+        if executor is None:
+            return _score_texts(texts)
+        size = math.ceil(len(texts) / self.processes)
+        parts = [texts[i:i + size] for i in range(0, len(texts), size)]
+        return [result for part in executor.map(_score_texts, parts) for result in part]
+
+    def _load_checkpoint(self) -> int:
+        db = self.session_factory()
+        try:
+            checkpoint = db.get(JobCheckpoint, self.checkpoint_name)
+            return checkpoint.position if checkpoint else 0
+        finally:
+            db.close()
+
+    def _save_checkpoint(self, db: Session, last_id: int) -> None:
+        checkpoint = db.get(JobCheckpoint, self.checkpoint_name)
+        if checkpoint is None:
+            db.add(JobCheckpoint(name=self.checkpoint_name, position=last_id))
+        else:
+            checkpoint.position = last_id
+
@@ -0,0 +1,313 @@
+"""
+Process-wide sentiment engine.
+
+Loading VADER means reading and parsing its lexicon files, so the analyzer
+(with the product-feedback lexicon merged in) is built once per process and
+shared by FeedbackService, the seed script and batch jobs. The engine is
+read-only after construction, which makes it safe to use from any threadpool
+worker, and building it at import time lets pre-forking servers share it
+with their workers via copy-on-write.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from importlib.metadata import version as package_version
+from typing import NamedTuple
+
+import numpy as np
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    SentimentIntensityAnalyzer,
+    SentiText,
+    allcap_differential,
+)
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Custom lexicon for product feedback sentiment analysis
+CUSTOM_LEXICON = {
+    # Strong negative words
+    "terrible": -3.5,
+    "awful": -3.5,
+    "unusable": -3.8,
+    "broken": -3.0,
+    "buggy": -2.5,
+    "confusing": -2.7,
+    "clunky": -2.3,
+    "frustrating": -2.5,
+    "horrible": -3.5,
+    "worst": -3.5,
+    "hate": -3.0,
+    "painful": -2.5,
+    "unreliable": -2.5,
+    # Positive words
+    "intuitive": 2.4,
+    "smooth": 2.2,
+    "clean": 1.8,
+    "amazing": 3.2,
+    "great": 2.5,
+    "excellent": 3.0,
+    "fantastic": 3.2,
+    "perfect": 3.5,
+    "love": 3.0,
+    "best": 2.8,
+    "beautiful": 2.5,
+    "helpful": 2.0,
+    "responsive": 2.0,
+    "fast": 1.8,
+}
+
+# Keywords for forced sentiment override
+STRONG_NEGATIVE_KEYWORDS = {"terrible", "awful", "unusable", "hate", "broken", "worst", "horrible"}
+STRONG_POSITIVE_KEYWORDS = {"amazing", "love", "perfect", "excellent", "fantastic", "great", "best"}
+
+# Label thresholds (wider neutral band than default VADER)
+NEGATIVE_THRESHOLD = -0.20
+POSITIVE_THRESHOLD = 0.20
+
+
+
+def _lexicon_version() -> str:
+    """Fingerprint of everything that affects scores and labels."""
+    fingerprint = json.dumps(
+        {
+            "vader": package_version("vaderSentiment"),
+            "lexicon": CUSTOM_LEXICON,
+            "negative_keywords": sorted(STRONG_NEGATIVE_KEYWORDS),
+            "positive_keywords": sorted(STRONG_POSITIVE_KEYWORDS),
+            "thresholds": [NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(fingerprint.encode()).hexdigest()[:12]
+
+
+# Changes whenever the lexicon, keywords or thresholds change
+LEXICON_VERSION = _lexicon_version()
+
+_NON_WORD_CHARS = re.compile(r'[^a-zA-Z0-9\s]')
+
+
+def extract_words(text: str) -> set[str]:
+    """
+    Extract individual words from text for keyword matching.
+    - Lowercase
+    - Replace punctuation with spaces
+    - Split into words
+    - Return as set for O(1) membership testing
+    """
+    # Replace non-alphanumeric chars with spaces, then split
+    cleaned = _NON_WORD_CHARS.sub(' ', text.lower())
+    return set(cleaned.split())
+
+
+def _words_from_tokens(tokens: list[str]) -> set[str]:
+    """
+    Same result as extract_words(), built from whitespace tokens.
+    Plain alphanumeric tokens (the vast majority) skip the regex.
+    """
+    words = set()
+    for token in tokens:
+        lowered = token.lower()
+        if lowered.isascii() and lowered.isalnum():
+            words.add(lowered)
+        else:
+            words.update(_NON_WORD_CHARS.sub(' ', lowered).split())
+    return words
+
+
+class _TokenizedText(SentiText):
+    """SentiText built from an existing whitespace split instead of re-splitting."""
+
+    def __init__(self, text: str, tokens: list[str]):
+        self.text = text
+        self.words_and_emoticons = [self._strip_punc_if_word(t) for t in tokens]
+        self.is_cap_diff = allcap_differential(self.words_and_emoticons)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace. VADER and the keyword override both split on
+    whitespace, so this never changes a score or label.
+    """
+    return " ".join(text.split())
+
+
+class SentimentCache:
+    """
+    Bounded LRU of (score, label) keyed by a hash of the normalized text
+    and the lexicon version. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int, version: str = LEXICON_VERSION):
+        self.maxsize = maxsize
+        self.version = version
+        self._entries: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, normalized_text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{self.version}\0{normalized_text}".encode(), digest_size=16
+        ).digest()
+
+    def get(self, key: bytes) -> tuple[float, str] | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: bytes, result: tuple[float, str]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SentimentBatch(NamedTuple):
+    """Scores (float64) and labels (str) aligned with the input texts."""
+    scores: np.ndarray
+    labels: np.ndarray
+
+
+class SentimentEngine:
+    """VADER analyzer with the custom lexicon applied. Read-only after init."""
+
+    def __init__(self, cache_size: int = settings.SENTIMENT_CACHE_SIZE):
+        analyzer = SentimentIntensityAnalyzer()
+        # Add custom lexicon to VADER
+        analyzer.lexicon.update(CUSTOM_LEXICON)
+        # Only the parsed dicts are used after init; drop the raw file contents
+        analyzer.lexicon_full_filepath = None
+        analyzer.emoji_full_filepath = None
+        self._analyzer = analyzer
+        self.version = LEXICON_VERSION
+        self.cache = SentimentCache(cache_size, self.version)
+
+    def _compound(self, text: str, tokens: list[str]) -> float:
+        """VADER compound score for text already split into tokens."""
+        analyzer = self._analyzer
+        if not text.isascii() and any(ch in analyzer.emojis for ch in text):
+            # Emoji are expanded into descriptions before VADER tokenizes
+            return analyzer.polarity_scores(text)['compound']
+
+        # Same steps as SentimentIntensityAnalyzer.polarity_scores()
+        sentitext = _TokenizedText(text, tokens)
+        words_and_emoticons = sentitext.words_and_emoticons
+        sentiments = []
+        for i, item in enumerate(words_and_emoticons):
+            if item.lower() in BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+            if (i < len(words_and_emoticons) - 1 and item.lower() == "kind" and
+                    words_and_emoticons[i + 1].lower() == "of"):
+                sentiments.append(0)
+                continue
+            sentiments = analyzer.sentiment_valence(0, sentitext, item, i, sentiments)
+        sentiments = analyzer._but_check(words_and_emoticons, sentiments)
+        return analyzer.score_valence(sentiments, text)['compound']
+
+    @staticmethod
+    def _label_from_words(score: float, words: set[str]) -> str:
+        # Strong keyword overrides - check for exact word matches
+        if words & STRONG_NEGATIVE_KEYWORDS:
+            return "negative"
+        if words & STRONG_POSITIVE_KEYWORDS:
+            return "positive"
+
+        if score <= NEGATIVE_THRESHOLD:
+            return "negative"
+        elif score >= POSITIVE_THRESHOLD:
+            return "positive"
+        else:
+            return "neutral"
+
+    def score(self, text: str) -> float:
+        """Calculate compound sentiment score (-1 to 1)."""
+        return self._compound(text, text.split())
+
+    def label(self, score: float, text: str) -> str:
+        """
+        Get sentiment label from score with keyword override.
+        Uses improved thresholds for product feedback.
+        """
+        # Extract actual words (not substrings) for accurate matching
+        # This prevents "unbroken" from matching "broken"
+        return self._label_from_words(score, extract_words(text))
+
+    def analyze(self, text: str) -> tuple[float, str]:
+        """Analyze sentiment and return both score and label (memoized)."""
+        normalized = normalize_text(text)
+        key = self.cache.key(normalized)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Tokenize once; VADER and the keyword override share the split
+        tokens = normalized.split()
+        score = self._compound(normalized, tokens)
+        result = (score, self._label_from_words(score, _words_from_tokens(tokens)))
+        self.cache.put(key, result)
+        return result
+
+    def score_batch(self, texts: Iterable[str]) -> SentimentBatch:
+        """Analyze many texts; returns score and label arrays in input order."""
+        scores = []
+        labels = []
+        for text in texts:
+            score, label = self.analyze(text)
+            scores.append(score)
+            labels.append(label)
+        return SentimentBatch(
+            scores=np.array(scores, dtype=np.float64),
+            labels=np.array(labels, dtype=str),
+        )
+
+
+_engine: SentimentEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_sentiment_engine() -> SentimentEngine:
+    """Return the shared engine, building it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                logger.info(f"Loading sentiment lexicon (version {LEXICON_VERSION})...")
+                _engine = SentimentEngine()
+                cache = _engine.cache
+                metrics.register_counter("sentiment_cache_hits_total", lambda: cache.hits)
+                metrics.register_counter("sentiment_cache_misses_total", lambda: cache.misses)
+                metrics.register_counter("sentiment_cache_evictions_total", lambda: cache.evictions)
+                metrics.register_gauge("sentiment_cache_entries", cache.__len__)
+    return _engine
+
+
+def score_batch(texts: Iterable[str]) -> SentimentBatch:
+    """Score many texts with the shared engine."""
+    return get_sentiment_engine().score_batch(texts)
@@ -0,0 +1,240 @@
+"""
+Background sentiment enrichment.
+
+With SENTIMENT_ASYNC enabled, FeedbackService stores new or edited feedback
+with a "pending" sentiment label and submits its id here. A small pool of
+worker threads drains the queue in batches, scores the texts with the shared
+sentiment engine and writes the results back with one executemany UPDATE per
+batch. A batch that fails to write is retried with exponential backoff up
+to SENTIMENT_RETRY_ATTEMPTS times; rows still pending after that, or after a
+restart, are re-queued on startup.
+"""
+import heapq
+import logging
+import queue
+import threading
+import time
+from typing import Callable
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.feedback import Feedback, SentimentLabel
+from app.services.daily_stats import SNAPSHOT_COLUMNS, DailyStatsService, row_snapshot
+from app.services.sentiment_engine import LEXICON_VERSION, score_batch
+
+logger = logging.getLogger(__name__)
+
+_feedback = Feedback.__table__
+
+# Only rows that are still pending are written, so a batch never overwrites
+# a score computed later by a synchronous path.
+_apply_scores = (
+    update(_feedback)
+    .where(
+        _feedback.c.id == bindparam("b_id"),
+        _feedback.c.sentiment_label == SentimentLabel.PENDING.value,
+    )
+    .values(
+        sentiment_score=bindparam("b_score"),
+        sentiment_label=bindparam("b_label"),
+        sentiment_version=LEXICON_VERSION,
+    )
+)
+
+class SentimentEnrichmentQueue:
+    """Queue of feedback ids awaiting sentiment, drained by worker threads."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        workers: int = settings.SENTIMENT_WORKERS,
+        batch_size: int = settings.SENTIMENT_BATCH_SIZE,
+        batch_wait: float = settings.SENTIMENT_BATCH_WAIT_SECONDS,
+        retry_attempts: int = settings.SENTIMENT_RETRY_ATTEMPTS,
+        retry_backoff: float = settings.SENTIMENT_RETRY_BACKOFF_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retry_attempts = retry_attempts
+        self.retry_backoff = retry_backoff
+        # Items are (feedback id, submitted at, failed attempts so far)
+        self._queue: queue.Queue[tuple[int, float, int]] = queue.Queue()
+        # Failed items waiting out their backoff: (due at, *item), a heap
+        self._retries: list[tuple[float, int, float, int]] = []
+        self._retries_lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+
+        metrics.register_gauge("sentiment_queue_depth", self.depth)
+        metrics.register_gauge("sentiment_queue_oldest_age_seconds", self.oldest_age)
+
+    def submit(self, feedback_id: int) -> None:
+        """Queue a feedback row for scoring."""
+        self._queue.put((feedback_id, time.monotonic(), 0))
+        metrics.inc("sentiment_queue_submitted_total")
+
+    def depth(self) -> int:
+        """Number of ids waiting to be scored (including those waiting to be retried)."""
+        return self._queue.qsize() + len(self._retries)
+
+    def oldest_age(self) -> float:
+        """Seconds the oldest queued id has been waiting (0 if empty)."""
+        with self._queue.mutex:
+            if not self._queue.queue:
+                return 0.0
+            return time.monotonic() - self._queue.queue[0][1]
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self) -> None:
+        """Start worker threads and re-queue rows left pending by a restart."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self.recover_pending()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"sentiment-worker-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Sentiment enrichment started with {self.workers} worker(s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop workers after they finish their current batch."""
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def recover_pending(self) -> int:
+        """Queue every row whose sentiment is still pending."""
+        db = self.session_factory()
+        try:
+            ids = db.scalars(
+                select(Feedback.id).where(Feedback.sentiment_label == SentimentLabel.PENDING.value)
+            ).all()
+        finally:
+            db.close()
+        for feedback_id in ids:
+            self.submit(feedback_id)
+        if ids:
+            logger.info(f"Re-queued {len(ids)} feedback item(s) with pending sentiment")
+        return len(ids)
+
+    def drain(self) -> int:
+        """Process everything currently queued on the calling thread."""
+        processed = 0
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                return processed
+            processed += self.process_batch(batch)
+
+    def process_batch(self, batch: list[tuple[int, float, int]]) -> int:
+        """Score one batch of queued ids and write the results; a failed batch is retried later."""
+        ids = list({feedback_id for feedback_id, _, _ in batch})
+        db = self.session_factory()
+        try:
+            # Locked so the rollup deltas below match what the UPDATE changes
+            rows = db.execute(
+                select(Feedback.id, Feedback.title, Feedback.content, *SNAPSHOT_COLUMNS)
+                .where(
+                    Feedback.id.in_(ids),
+                    Feedback.sentiment_label == SentimentLabel.PENDING.value,
+                )
+                .with_for_update()
+            ).all()
+            if rows:
+                result = score_batch(f"{r.title} {r.content}" for r in rows)
+                scored = [
+                    (r, float(score), str(label))
+                    for r, score, label in zip(rows, result.scores, result.labels)
+                ]
+                db.execute(
+                    _apply_scores,
+                    [{"b_id": r.id, "b_score": score, "b_label": label} for r, score, label in scored],
+                )
+                DailyStatsService(db).apply(
+                    removed=[row_snapshot(r) for r, _, _ in scored],
+                    added=[row_snapshot(r, label, score) for r, score, label in scored],
+                )
+                db.commit()
+        except Exception:
+            db.rollback()
+            metrics.inc("sentiment_queue_failed_total", len(batch))
+            logger.exception(f"Sentiment enrichment failed for {len(ids)} feedback item(s)")
+            self._retry_later(batch)
+            return 0
+        finally:
+            db.close()
+
+        now = time.monotonic()
+        metrics.inc("sentiment_queue_processed_total", len(rows))
+        metrics.set_gauge("sentiment_queue_last_lag_seconds", now - min(t for _, t, _ in batch))
+        return len(rows)
+
+    def _retry_later(self, batch: list[tuple[int, float, int]]) -> None:
+        """
+        Schedule a failed batch's items again after retry_backoff * 2**attempts
+        seconds. Items out of attempts are dropped; their rows stay pending
+        until recover_pending() runs at the next start.
+        """
+        now = time.monotonic()
+        dropped = 0
+        with self._retries_lock:
+            for feedback_id, submitted_at, attempts in batch:
+                if attempts >= self.retry_attempts:
+                    dropped += 1
+                    continue
+                due = now + self.retry_backoff * 2 ** attempts
+                heapq.heappush(self._retries, (due, feedback_id, submitted_at, attempts + 1))
+        metrics.inc("sentiment_queue_retried_total", len(batch) - dropped)
+        if dropped:
+            metrics.inc("sentiment_queue_dropped_total", dropped)
+            logger.error(f"Gave up on sentiment for {dropped} feedback item(s) after {self.retry_attempts} retries")
+
+    def _release_retries(self) -> None:
+        """Move retries whose backoff has passed back onto the queue."""
+        now = time.monotonic()
+        with self._retries_lock:
+            while self._retries and self._retries[0][0] <= now:
+                _, *item = heapq.heappop(self._retries)
+                self._queue.put(tuple(item))
+
+    def _take_batch(self, block: bool) -> list[tuple[int, float, int]]:
+        """Collect up to batch_size items, waiting briefly for stragglers."""
+        self._release_retries()
+        try:
+            first = self._queue.get(timeout=0.5) if block else self._queue.get_nowait()
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + (self.batch_wait if block else 0)
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._take_batch(block=True)
+            if batch:
+                self.process_batch(batch)
+
+
+sentiment_queue = SentimentEnrichmentQueue()
@@ -0,0 +1,558 @@
+"""
+Persisted topic clustering.
+
+Fitting TF-IDF and KMeans over the whole corpus takes seconds, so it happens
+off the request path. TopicModelService.refresh() fits a model for one k and
+stores it as a versioned TopicSnapshot: the cluster summaries as JSON plus
+the centroids, assignments and TF-IDF vocabulary as plain numpy arrays (an
+.npz archive, never a pickle). /analytics/topics only
+reads the latest snapshot. TopicRefreshScheduler re-fits every watched k
+once its snapshot is older than TOPICS_REFRESH_INTERVAL_SECONDS or
+TOPICS_REFRESH_NEW_ROWS feedback rows have arrived since.
+
+Small corpora are clustered exactly (fit_topics: TF-IDF + KMeans over the
+whole matrix). From TOPICS_STREAMING_MIN_ROWS rows on, stream_topics()
+reads the corpus in keyset-paged chunks, hashes each chunk and updates
+MiniBatchKMeans centroids with partial_fit, so memory depends on the chunk
+size and k rather than on the number of feedback rows.
+
+No transaction stays open while a model is fitted: one worker at a time
+claims a k through a lease row in job_checkpoints (a short transaction),
+the corpus is read in short read transactions, and the snapshot is
+inserted in another.
+"""
+import io
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal
+from app.models.feedback import Feedback
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.topic_snapshot import TopicSnapshot
+from app.schemas.analytics import TopicCluster, TopicsResponse
+
+logger = logging.getLogger(__name__)
+
+# job_checkpoints row per k whose position is the epoch second its refresh
+# lease expires (0 when free)
+_LEASE_PREFIX = "topic_refresh_lease:"
+
+
+@dataclass
+class TopicFit:
+    """A fitted topic model and its cluster summaries."""
+    clusters: list[TopicCluster]
+    vectorizer: TfidfVectorizer | HashingVectorizer
+    centroids: np.ndarray
+    labels: np.ndarray
+    feedback_ids: np.ndarray
+    engine: str = "kmeans"
+
+    def dump(self) -> bytes:
+        """Serialize the model as a compressed .npz of plain arrays."""
+        arrays = {
+            "engine": np.array(self.engine),
+            "centroids": self.centroids,
+            "labels": self.labels,
+            "feedback_ids": self.feedback_ids,
+        }
+        if isinstance(self.vectorizer, TfidfVectorizer):
+            # The hashing vectorizer is fixed by _HASH_FEATURES; TF-IDF
+            # needs its vocabulary and idf weights
+            arrays["terms"] = self.vectorizer.get_feature_names_out().astype(str)
+            arrays["idf"] = self.vectorizer.idf_
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    @staticmethod
+    def load_model(blob: bytes) -> dict:
+        """
+        Load a stored model as a dict of arrays. Object arrays are refused,
+        so a tampered blob cannot execute code (raises ValueError).
+        """
+        with np.load(io.BytesIO(blob), allow_pickle=False) as archive:
+            model = {name: archive[name] for name in archive.files}
+        model["engine"] = str(model["engine"])
+        return model
+
+
+def fit_topics(
+    feedback_ids: list[int], titles: list[str], texts: list[str], k: int
+) -> TopicFit | None:
+    """Cluster texts into k topics using TF-IDF and KMeans (None if too little data)."""
+    if len(texts) < k:
+        # Not enough feedback to cluster
+        return None
+
+    # TF-IDF vectorization
+    vectorizer = TfidfVectorizer(
+        max_features=1000,
+        stop_words='english',
+        ngram_range=(1, 2),
+        min_df=2,
+        max_df=0.95
+    )
+
+    try:
+        tfidf_matrix = vectorizer.fit_transform(texts)
+    except ValueError:
+        # Not enough documents or vocabulary
+        return None
+
+    # KMeans clustering
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+    cluster_labels = kmeans.fit_predict(tfidf_matrix)
+
+    # Get feature names for keywords
+    feature_names = vectorizer.get_feature_names_out()
+
+    # Build cluster information
+    clusters = []
+    for cluster_id in range(k):
+        # Get indices of feedback in this cluster
+        cluster_indices = np.flatnonzero(cluster_labels == cluster_id)
+
+        if not len(cluster_indices):
+            continue
+
+        # Get top keywords for this cluster
+        cluster_center = kmeans.cluster_centers_[cluster_id]
+        top_keyword_indices = cluster_center.argsort()[-5:][::-1]
+        keywords = [str(feature_names[i]) for i in top_keyword_indices]
+
+        # Get example feedback
+        example_indices = cluster_indices[:3]  # Top 3 examples
+
+        clusters.append(TopicCluster(
+            cluster_id=cluster_id,
+            # Generate label from top keywords
+            label=", ".join(keywords[:3]),
+            keywords=keywords,
+            example_feedback_ids=[feedback_ids[i] for i in example_indices],
+            example_titles=[titles[i] for i in example_indices],
+            count=len(cluster_indices)
+        ))
+
+    # Sort by count descending
+    clusters.sort(key=lambda x: x.count, reverse=True)
+
+    return TopicFit(
+        clusters=clusters,
+        vectorizer=vectorizer,
+        centroids=kmeans.cluster_centers_,
+        labels=cluster_labels.astype(np.int32),
+        feedback_ids=np.asarray(feedback_ids, dtype=np.int64),
+    )
+
+
+# Hashed feature space of the streaming engine; centroids are dense, so
+# they take k * 2**16 * 8 bytes (2.5 MiB for k=5)
+_HASH_FEATURES = 2 ** 16
+# Distinct terms tracked for keyword labels (document frequency and per cluster)
+_MAX_TERMS = 20000
+_MAX_CLUSTER_TERMS = 5000
+
+
+def _prune(counter: Counter, limit: int) -> None:
+    """Keep a term counter bounded by dropping its rarest entries."""
+    if len(counter) > 2 * limit:
+        kept = counter.most_common(limit)
+        counter.clear()
+        counter.update(dict(kept))
+
+
+@dataclass
+class _ClusterSummary:
+    count: int = 0
+    example_ids: list[int] = field(default_factory=list)
+    example_titles: list[str] = field(default_factory=list)
+    terms: Counter = field(default_factory=Counter)
+
+
+def stream_topics(db: Session, k: int, chunk_size: int = 2000) -> TopicFit | None:
+    """
+    Cluster the corpus into k topics in bounded memory (None if too little data).
+
+    Pass 1 streams chunks into MiniBatchKMeans.partial_fit. Pass 2 streams
+    them again to assign clusters, pick examples and count terms; keywords
+    are the terms most frequent in a cluster relative to their document
+    frequency, taken from a bounded vocabulary of the most common terms.
+    """
+    vectorizer = HashingVectorizer(
+        n_features=_HASH_FEATURES,
+        stop_words='english',
+        ngram_range=(1, 2),
+        alternate_sign=False,
+    )
+    # Same output as vectorizer.transform(), but reuses the analyzed terms
+    analyzer = vectorizer.build_analyzer()
+    hasher = FeatureHasher(n_features=_HASH_FEATURES, input_type='string', alternate_sign=False)
+
+    def vectorize(rows):
+        terms = [analyzer(f"{r.title} {r.content}") for r in rows]
+        return normalize(hasher.transform(terms)), terms
+
+    def chunks(max_id: int | None = None):
+        last_id = 0
+        while True:
+            query = (
+                select(Feedback.id, Feedback.title, Feedback.content)
+                .where(Feedback.content.isnot(None), Feedback.id > last_id)
+                .order_by(Feedback.id)
+                .limit(chunk_size)
+            )
+            if max_id is not None:
+                query = query.where(Feedback.id <= max_id)
+            rows = db.execute(query).all()
+            # End the read transaction, so fitting the chunk holds no
+            # snapshot or connection
+            db.rollback()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    kmeans = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=3, batch_size=chunk_size)
+    max_id = None
+    for rows in chunks():
+        if max_id is None and len(rows) < k:
+            # The whole corpus fits in this chunk and is smaller than k
+            return None
+        kmeans.partial_fit(vectorize(rows)[0])
+        max_id = rows[-1].id
+    if max_id is None:
+        return None
+
+    summaries = [_ClusterSummary() for _ in range(k)]
+    document_frequency: Counter = Counter()
+    labels, feedback_ids = [], []
+    # Rows added after pass 1 are left for the next refresh
+    for rows in chunks(max_id):
+        matrix, terms = vectorize(rows)
+        chunk_labels = kmeans.predict(matrix)
+        for row, label, doc_terms in zip(rows, chunk_labels, terms):
+            summary = summaries[label]
+            summary.count += 1
+            if len(summary.example_ids) < 3:
+                summary.example_ids.append(row.id)
+                summary.example_titles.append(row.title)
+            summary.terms.update(doc_terms)
+            document_frequency.update(set(doc_terms))
+        for summary in summaries:
+            _prune(summary.terms, _MAX_CLUSTER_TERMS)
+        _prune(document_frequency, _MAX_TERMS)
+        labels.append(chunk_labels.astype(np.int32))
+        feedback_ids.append(np.fromiter((r.id for r in rows), dtype=np.int64, count=len(rows)))
+
+    corpus_size = sum(s.count for s in summaries)
+    clusters = []
+    for cluster_id, summary in enumerate(summaries):
+        if not summary.count:
+            continue
+        # Ignore terms seen in a single document, like min_df=2 in fit_topics()
+        scored = [
+            (count * math.log(corpus_size / document_frequency[term]), term)
+            for term, count in summary.terms.most_common(200)
+            if document_frequency[term] >= 2
+        ]
+        keywords = [term for _, term in sorted(scored, reverse=True)[:5]]
+        clusters.append(TopicCluster(
+            cluster_id=cluster_id,
+            label=", ".join(keywords[:3]),
+            keywords=keywords,
+            example_feedback_ids=summary.example_ids,
+            example_titles=summary.example_titles,
+            count=summary.count
+        ))
+    clusters.sort(key=lambda x: x.count, reverse=True)
+
+    return TopicFit(
+        clusters=clusters,
+        vectorizer=vectorizer,
+        centroids=kmeans.cluster_centers_,
+        labels=np.concatenate(labels),
+        feedback_ids=np.concatenate(feedback_ids),
+        engine="streaming",
+    )
+
+
+def _age_seconds(created_at: datetime) -> float:
+    if created_at.tzinfo is None:
+        # SQLite returns naive UTC timestamps
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - created_at).total_seconds(), 0.0)
+
+
+# Guards against fitting the same k twice at once within this process
+_refreshing: set[int] = set()
+_refreshing_lock = threading.Lock()
+
+
+def topics_response(k: int, snapshot: TopicSnapshot | None) -> TopicsResponse:
+    """The response for a loaded snapshot (no database access)."""
+    if snapshot is None:
+        return TopicsResponse(clusters=[], k=k, status="pending")
+
+    return TopicsResponse(
+        clusters=[TopicCluster(**cluster) for cluster in snapshot.clusters],
+        k=k,
+        version=snapshot.version,
+        generated_at=snapshot.created_at,
+        age_seconds=round(_age_seconds(snapshot.created_at), 1),
+        corpus_size=snapshot.corpus_size,
+    )
+
+
+class TopicModelService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def latest(self, k: int) -> TopicSnapshot | None:
+        """Most recent snapshot for k."""
+        return (
+            self.db.query(TopicSnapshot)
+            .filter(TopicSnapshot.k == k)
+            .order_by(TopicSnapshot.version.desc())
+            .first()
+        )
+
+    def get_topics(self, k: int) -> TopicsResponse:
+        """Serve the latest snapshot; status is "pending" until one exists."""
+        return topics_response(k, self.latest(k))
+
+    def needs_refresh(self, k: int) -> bool:
+        """True when k has no snapshot, or it is too old or behind on new feedback."""
+        snapshot = self.latest(k)
+        if snapshot is None:
+            return True
+        if _age_seconds(snapshot.created_at) >= settings.TOPICS_REFRESH_INTERVAL_SECONDS:
+            return True
+        new_rows = (
+            self.db.query(func.count(Feedback.id))
+            .filter(Feedback.id > snapshot.last_feedback_id)
+            .scalar() or 0
+        )
+        return new_rows >= settings.TOPICS_REFRESH_NEW_ROWS
+
+    def refresh(self, k: int) -> TopicSnapshot | None:
+        """
+        Fit k topics over the current corpus and store a new snapshot.
+        Returns None if this k is already being refreshed elsewhere.
+        """
+        with _refreshing_lock:
+            if k in _refreshing:
+                return None
+            _refreshing.add(k)
+        lease = None
+        try:
+            lease = self._try_lease(k)
+            if lease is None:
+                return None
+            return self._refresh(k)
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            if lease is not None:
+                self._release_lease(k, lease)
+            with _refreshing_lock:
+                _refreshing.discard(k)
+
+    def _try_lease(self, k: int) -> int | None:
+        """
+        Claim k's refresh lease so only one worker process fits k; returns
+        its expiry, or None while another worker holds it. The claim is
+        committed at once, so no transaction stays open during the fit; a
+        worker that dies leaves the lease to expire after
+        TOPICS_REFRESH_LEASE_SECONDS.
+        """
+        name = f"{_LEASE_PREFIX}{k}"
+        now = int(time.time())
+        expires = now + settings.TOPICS_REFRESH_LEASE_SECONDS
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = dialect_insert(JobCheckpoint).values(name=name, position=expires)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[JobCheckpoint.name],
+                set_={"position": expires},
+                where=JobCheckpoint.position <= now,
+            )
+            claimed = self.db.execute(stmt.returning(JobCheckpoint.position)).first() is not None
+        else:
+            claimed = self.db.execute(
+                update(JobCheckpoint)
+                .where(JobCheckpoint.name == name, JobCheckpoint.position <= now)
+                .values(position=expires)
+            ).rowcount > 0
+            if not claimed and self.db.get(JobCheckpoint, name) is None:
+                self.db.execute(insert(JobCheckpoint).values(name=name, position=expires))
+                claimed = True
+        self.db.commit()
+        return expires if claimed else None
+
+    def _release_lease(self, k: int, expires: int) -> None:
+        """Free k's lease unless it expired and another worker claimed it since."""
+        self.db.execute(
+            update(JobCheckpoint)
+            .where(JobCheckpoint.name == f"{_LEASE_PREFIX}{k}", JobCheckpoint.position == expires)
+            .values(position=0)
+        )
+        self.db.commit()
+
+    def _refresh(self, k: int) -> TopicSnapshot:
+        corpus_size, last_feedback_id = self.db.execute(
+            select(func.count(Feedback.id), func.max(Feedback.id))
+            .where(Feedback.content.isnot(None))
+        ).one()
+        self.db.rollback()
+
+        start = time.perf_counter()
+        if corpus_size >= settings.TOPICS_STREAMING_MIN_ROWS:
+            fit = stream_topics(self.db, k, settings.TOPICS_STREAM_CHUNK_SIZE)
+        else:
+            rows = self.db.execute(
+                select(Feedback.id, Feedback.title, Feedback.content)
+                .where(Feedback.content.isnot(None))
+                .order_by(Feedback.id)
+            ).all()
+            # Fit outside any transaction
+            self.db.rollback()
+            fit = fit_topics(
+                [r.id for r in rows],
+                [r.title for r in rows],
+                [f"{r.title} {r.content}" for r in rows],
+                k,
+            )
+        fit_seconds = time.perf_counter() - start
+        if fit is not None:
+            # The corpus the model was actually fitted on
+            corpus_size = len(fit.feedback_ids)
+            last_feedback_id = int(fit.feedback_ids.max())
+
+        previous = (
+            self.db.query(func.max(TopicSnapshot.version))
+            .filter(TopicSnapshot.k == k)
+            .scalar() or 0
+        )
+        snapshot = TopicSnapshot(
+            k=k,
+            version=previous + 1,
+            corpus_size=corpus_size,
+            last_feedback_id=last_feedback_id or 0,
+            fit_seconds=fit_seconds,
+            clusters=[cluster.model_dump() for cluster in fit.clusters] if fit else [],
+            model=fit.dump() if fit else None,
+            created_at=datetime.now(timezone.utc),
+        )
+        self.db.add(snapshot)
+
+        # Keep the most recent snapshots for inspection and rollback
+        self.db.query(TopicSnapshot).filter(
+            TopicSnapshot.k == k,
+            TopicSnapshot.version <= snapshot.version - settings.TOPICS_SNAPSHOT_RETENTION,
+        ).delete(synchronize_session=False)
+        self.db.commit()
+        self.db.refresh(snapshot)
+
+        metrics.inc("topics_refresh_total", k=str(k))
+        metrics.set_gauge("topics_fit_seconds", fit_seconds, k=str(k))
+        logger.info(
+            f"Topic snapshot k={k} v{snapshot.version}: {corpus_size} feedback, "
+            f"fitted in {fit_seconds:.2f}s ({fit.engine if fit else 'empty'})"
+        )
+        return snapshot
+
+
+def refresh_topics(session_factory: Callable[[], Session], k: int) -> None:
+    """Refresh one k in a fresh session (for the CLI)."""
+    db = session_factory()
+    try:
+        TopicModelService(db).refresh(k)
+    finally:
+        db.close()
+
+
+class TopicRefreshScheduler:
+    """Background thread that keeps snapshots of every watched k fresh."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        check_interval: float = settings.TOPICS_REFRESH_CHECK_SECONDS,
+        ks: list[int] = settings.TOPICS_DEFAULT_K,
+    ):
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self._ks = set(ks)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def watch(self, k: int) -> None:
+        """Keep k fresh from now on (called when an admin requests it)."""
+        if k not in self._ks:
+            self._ks.add(k)
+            self._wake.set()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="topic-refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"Topic refresher started for k={sorted(self._ks)}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def check(self) -> int:
+        """Refresh every watched k that needs it; returns how many were refitted."""
+        refreshed = 0
+        for k in sorted(self._ks):
+            db = self.session_factory()
+            try:
+                service = TopicModelService(db)
+                if service.needs_refresh(k) and service.refresh(k) is not None:
+                    refreshed += 1
+            except Exception:
+                metrics.inc("topics_refresh_failed_total", k=str(k))
+                logger.exception(f"Topic refresh failed for k={k}")
+            finally:
+                db.close()
+        return refreshed
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.check()
+            self._wake.wait(self.check_interval)
+            self._wake.clear()
+
+
+topic_refresher = TopicRefreshScheduler()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent throughput and memory per in-flight request, sync vs
+DB_ASYNC mode.
+Run with: python -m benchmarks.bench_async_mode [--clients 16,64,256] [--seconds 10] [--latency-ms 5] [--url URL]
+
+Starts the API with uvicorn in a subprocess, once per mode and client
+count. Clients alternate GET /feedback/mine (first cursor page) and
+GET /analytics/overview as fast as they can. Reports requests per second,
+p50/p99 latency, the server's idle and peak RSS, (peak - idle) / clients as
+the memory per in-flight request, and its peak thread count.
+
+Without --url a throwaway SQLite file is used (aiosqlite in async mode).
+SQLite answers in microseconds, so --latency-ms delays every statement to
+stand in for the round trip to PostgreSQL: a blocking sleep on the sync
+path, an awaited one on the async path. Pass a PostgreSQL URL (and
+--latency-ms 0) to measure the real drivers.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_overview import populate
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else float("nan")
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_status(pid: int) -> tuple[float, int]:
+    """(resident MiB, threads) of a process."""
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            values[key] = value.split()
+    return int(values["VmRSS"][0]) / 1024, int(values["Threads"][0])
+
+
+def serve(url: str, port: int, mode: str, latency_ms: float) -> None:
+    """Run the API against url in `mode` (in the subprocess)."""
+    import uvicorn
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.util.concurrency import await_only
+
+    from app.core.config import settings
+    from app.db.async_session import async_database_url
+    from app.db.pool import MonitoredQueuePool
+    from app.db.session import get_db
+    from app.main import app
+
+    settings.DB_ASYNC = mode == "async"
+    settings.ASYNC_DATABASE_URL = async_database_url(url)
+    settings.RATE_LIMIT_ENABLED = False
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(
+        url,
+        poolclass=MonitoredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        connect_args=connect_args,
+    )
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    if latency_ms:
+        @event.listens_for(Engine, "before_cursor_execute")
+        def round_trip(conn, cursor, statement, parameters, context, executemany):
+            if conn.dialect.is_async:
+                await_only(asyncio.sleep(latency_ms / 1000))
+            else:
+                time.sleep(latency_ms / 1000)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+
+
+async def load(base_url: str, pid: int, clients: int, seconds: float) -> tuple[int, list[float], float, int]:
+    """(requests, latencies in ms, peak RSS MiB, peak threads)."""
+    from app.core.security import create_access_token
+
+    # populate() creates one user (id 1); its token carries the admin role
+    # so the same clients can read the overview
+    token = create_access_token({"sub": "1", "email": "bench@example.com", "role": "admin", "ver": 0})
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = ["/feedback/mine?cursor=", "/analytics/overview"]
+    latencies, peak = [], [0.0, 0]
+    errors = 0
+    stop = time.monotonic() + seconds
+
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, timeout=120, limits=httpx.Limits(max_connections=clients)
+    ) as http:
+        async def client(n: int):
+            nonlocal errors
+            i = n
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                i += 1
+                try:
+                    response = await http.get(paths[i % len(paths)])
+                except httpx.TransportError:
+                    errors += 1
+                    continue
+                if response.status_code != 200:
+                    errors += 1
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        async def sample():
+            while time.monotonic() < stop:
+                rss, threads = proc_status(pid)
+                peak[0], peak[1] = max(peak[0], rss), max(peak[1], threads)
+                await asyncio.sleep(0.1)
+
+        await asyncio.gather(sample(), *(client(n) for n in range(clients)))
+    if errors:
+        print(f"  ({errors} failed requests)")
+    return len(latencies), latencies, peak[0], peak[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", default="16,64,256")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--serve", nargs=4, metavar=("URL", "PORT", "MODE", "LATENCY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve[0], int(args.serve[1]), args.serve[2], float(args.serve[3]))
+        return
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db.base_class import Base
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        populate(sessionmaker(bind=engine), args.rows)
+        engine.dispose()
+
+        print(f"rows: {args.rows}, seconds: {args.seconds}, latency: {args.latency_ms} ms, cpus: {os.cpu_count()}")
+        print(f"{'mode':<7}{'clients':>8}{'req/s':>8}{'p50 ms':>8}{'p99 ms':>8}"
+              f"{'idle MiB':>10}{'peak MiB':>10}{'KiB/req':>9}{'threads':>9}")
+        for clients in (int(c) for c in args.clients.split(",")):
+            for mode in ("sync", "async"):
+                port = free_port()
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "benchmarks.bench_async_mode",
+                     "--serve", url, str(port), mode, str(args.latency_ms)],
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                try:
+                    base_url = f"http://127.0.0.1:{port}"
+                    while True:
+                        try:
+                            httpx.get(f"{base_url}/")
+                            break
+                        except httpx.TransportError:
+                            time.sleep(0.1)
+                    # Warm up caches and the pools before measuring idle memory
+                    asyncio.run(load(base_url, server.pid, 4, 1))
+                    idle_rss, _ = proc_status(server.pid)
+                    requests, latencies, peak_rss, threads = asyncio.run(
+                        load(base_url, server.pid, clients, args.seconds)
+                    )
+                finally:
+                    server.terminate()
+                    server.wait()
+                per_request = max(0.0, peak_rss - idle_rss) * 1024 / clients
+                print(
+                    f"{mode:<7}{clients:>8}{requests / args.seconds:>8.0f}"
+                    f"{percentile(latencies, 50):>8.1f}{percentile(latencies, 99):>8.1f}"
+                    f"{idle_rss:>10.1f}{peak_rss:>10.1f}{per_request:>9.1f}{threads:>9}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading one heavily discussed feedback item.
+Run with: python -m benchmarks.bench_detail [--tags 10] [--responses 30] [--events 40] [--url URL]
+
+Compares the old single-statement loader (joinedload of category, tags,
+admin_responses and status_events) with the detail profile
+(FeedbackService.get_feedback_by_id) and the write profile
+(FeedbackService._get_for_write). "rows" is the number of rows the
+database returns across all statements of one load.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.db.base_class import Base
+from app.models import AdminResponse, Category, Feedback, StatusEvent, Tag, User, UserRole
+from app.services.feedback_service import FeedbackService
+
+
+def populate(session_factory, tags: int, responses: int, events: int) -> int:
+    db = session_factory()
+    try:
+        user = User(email="bench@example.com", hashed_password="x", role=UserRole.ADMIN)
+        category = Category(name="Bench")
+        db.add_all([user, category])
+        db.flush()
+        feedback = Feedback(
+            user_id=user.id,
+            title="Heavily discussed",
+            content="Benchmark row",
+            category_id=category.id,
+            tags=[Tag(name=f"tag-{i}") for i in range(tags)],
+        )
+        db.add(feedback)
+        db.flush()
+        db.add_all([
+            AdminResponse(feedback_id=feedback.id, admin_id=user.id, message=f"Reply {i}")
+            for i in range(responses)
+        ])
+        db.add_all([
+            StatusEvent(feedback_id=feedback.id, old_status="new", new_status="triaged", changed_by=user.id)
+            for _ in range(events)
+        ])
+        db.commit()
+        return feedback.id
+    finally:
+        db.close()
+
+
+def legacy_load(db, feedback_id: int):
+    return (
+        db.query(Feedback)
+        .options(
+            joinedload(Feedback.category),
+            joinedload(Feedback.tags),
+            joinedload(Feedback.admin_responses),
+            joinedload(Feedback.status_events)
+        )
+        .filter(Feedback.id == feedback_id)
+        .first()
+    )
+
+
+def measure(engine, session_factory, load, feedback_id: int, repeats: int) -> tuple[int, int, float]:
+    """(statements, rows returned, median ms) of one load in a fresh session."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    db = session_factory()
+    try:
+        load(db, feedback_id)
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", record)
+
+    with engine.connect() as conn:
+        rows = sum(len(conn.exec_driver_sql(s, p).fetchall()) for s, p in statements)
+
+    samples = []
+    for _ in range(repeats):
+        db = session_factory()
+        try:
+            start = time.perf_counter()
+            load(db, feedback_id)
+            samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+    return len(statements), rows, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument("--responses", type=int, default=30)
+    parser.add_argument("--events", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        feedback_id = populate(session_factory, args.tags, args.responses, args.events)
+
+        loaders = {
+            "joined (old)": legacy_load,
+            "detail": lambda db, id: FeedbackService(db).get_feedback_by_id(id),
+            "write": lambda db, id: FeedbackService(db)._get_for_write(id),
+        }
+        print(f"tags={args.tags} responses={args.responses} events={args.events}")
+        print(f"{'loader':<14}{'statements':>11}{'rows':>8}{'median ms':>11}")
+        for name, load in loaders.items():
+            count, rows, ms = measure(engine, session_factory, load, feedback_id, args.repeats)
+            print(f"{name:<14}{count:>11}{rows:>8}{ms:>11.2f}")
+
+        if args.url:
+            Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
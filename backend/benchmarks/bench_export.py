@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pulling every feedback row, paging /admin/feedback vs the export.
+Run with: python -m benchmarks.bench_export [--rows 10000,100000] [--url URL]
+
+The paged path is what spreadsheet pulls did before: get_all_feedback with
+page_size=100 until the last page (OFFSET pages with an exact count each).
+The export streams NDJSON from one server-side cursor. Peak Python memory
+is measured with tracemalloc and should stay flat for the export as the
+table grows. Without --url a throwaway SQLite file is used.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.services.feedback_export import FeedbackExport
+from app.services.feedback_service import FeedbackService
+from benchmarks.bench_overview import populate
+
+
+def paged(session_factory) -> int:
+    db = session_factory()
+    try:
+        service = FeedbackService(db)
+        rows, page = 0, 1
+        while True:
+            result = service.get_all_feedback(page=page, page_size=100)
+            rows += len(result.items)
+            if not result.has_more:
+                return rows
+            page += 1
+    finally:
+        db.close()
+
+
+def exported(session_factory) -> int:
+    export = FeedbackExport(session_factory)
+    for _ in export.stream():
+        pass
+    return export.rows
+
+
+def measure(run, session_factory) -> tuple[int, float, float]:
+    """(rows, seconds, peak MiB) of one full pull."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = run(session_factory)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="10000,100000")
+    parser.add_argument("--skip-paged-above", type=int, default=100000,
+                        help="skip the paged pull for larger tables (it is quadratic)")
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9}{'path':>8}{'seconds':>10}{'peak MiB':>10}")
+    for rows in [int(r) for r in args.rows.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            engine = create_engine(url)
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            session_factory = sessionmaker(bind=engine)
+            populate(session_factory, rows)
+
+            paths = {"export": exported}
+            if rows <= args.skip_paged_above:
+                paths = {"paged": paged, **paths}
+            for name, run in paths.items():
+                count, seconds, peak = measure(run, session_factory)
+                assert count == rows
+                print(f"{rows:>9}{name:>8}{seconds:>10.2f}{peak:>10.1f}")
+
+            if args.url:
+                Base.metadata.drop_all(engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
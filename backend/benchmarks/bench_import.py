@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading historical feedback, one create per row vs FeedbackImport.
+Run with: python -m benchmarks.bench_import [--rows 20000] [--processes 4] [--url URL]
+
+The per-row path is what POST /feedback/ does for each record
+(FeedbackService.create_feedback: score, insert feedback, tags and status
+event, upsert the rollup, commit). The import streams an NDJSON file in
+batches with batched scoring and multi-row inserts (COPY on PostgreSQL).
+Without --url a throwaway SQLite file is used.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.models import Category, Tag, User, UserRole
+from app.schemas.feedback import FeedbackCreate
+from app.services.feedback_import import FeedbackImport
+from app.services.feedback_service import FeedbackService
+
+WORDS = "great slow broken love hate fast confusing helpful crash nice".split()
+
+
+def make_records(rows: int) -> list[dict]:
+    rng = random.Random(3)
+    return [
+        {
+            "title": f"Feedback {i}",
+            "content": " ".join(rng.choices(WORDS, k=12)),
+            "category": f"Category {rng.randint(1, 10)}",
+            "tags": [f"tag-{t}" for t in rng.sample(range(30), k=2)],
+            "created_at": f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00",
+        }
+        for i in range(rows)
+    ]
+
+
+def reset(engine, session_factory) -> int:
+    """Fresh schema with an owner, categories and tags; returns the owner id."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = session_factory()
+    try:
+        user = User(email="bench@example.com", hashed_password="x", role=UserRole.ADMIN)
+        db.add(user)
+        db.add_all([Category(name=f"Category {i}") for i in range(1, 11)])
+        db.add_all([Tag(name=f"tag-{i}") for i in range(30)])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def per_row(session_factory, owner_id: int, records: list[dict]) -> None:
+    db = session_factory()
+    try:
+        categories = {c.name: c.id for c in db.query(Category)}
+        tags = {t.name: t.id for t in db.query(Tag)}
+        service = FeedbackService(db)
+        for record in records:
+            service.create_feedback(owner_id, FeedbackCreate(
+                title=record["title"],
+                content=record["content"],
+                category_id=categories[record["category"]],
+                tag_ids=[tags[name] for name in record["tags"]],
+            ))
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    records = make_records(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "feedback.ndjson")
+        with open(path, "w") as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        session_factory = sessionmaker(bind=engine)
+
+        print(f"rows: {args.rows}")
+        print(f"{'path':<24}{'seconds':>10}{'rows/s':>10}")
+        owner_id = reset(engine, session_factory)
+        start = time.perf_counter()
+        per_row(session_factory, owner_id, records)
+        elapsed = time.perf_counter() - start
+        print(f"{'create per row':<24}{elapsed:>10.2f}{args.rows / elapsed:>10.0f}")
+
+        for processes in sorted({0, args.processes}):
+            owner_id = reset(engine, session_factory)
+            job = FeedbackImport(
+                path, owner_id=owner_id, session_factory=session_factory,
+                batch_size=args.batch_size, processes=processes,
+            )
+            start = time.perf_counter()
+            progress = job.run()
+            elapsed = time.perf_counter() - start
+            assert progress.imported == args.rows, progress.errors[:5]
+            label = f"import ({processes or 1} proc)"
+            print(f"{label:<24}{elapsed:>10.2f}{args.rows / elapsed:>10.0f}")
+
+        if args.url:
+            Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a login flood against the request threadpool.
+Run with: python -m benchmarks.bench_login_flood [--clients 64] [--seconds 10]
+
+Starts the API with uvicorn in a subprocess on a throwaway SQLite file.
+--clients concurrent clients log in with correct passwords as fast as they
+can (the 9am rush) while a probe requests GET /categories/ every 50 ms.
+"inline" hashes on the request threads the way AuthService used to;
+"bounded" uses the password hasher (PASSWORD_HASH_WORKERS threads,
+PASSWORD_HASH_QUEUE_SIZE waiters, 503 beyond that). The rate limit
+middleware is off in both, since every client shares one IP. Reports login
+outcomes and p50/p99 latency of logins and of the probe.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+USERS = 20
+PASSWORD = "flood-password"
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else float("nan")
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(db_path: str, port: int, mode: str) -> None:
+    """Run the API against db_path (in the subprocess)."""
+    import uvicorn
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from starlette.concurrency import run_in_threadpool
+
+    import app.services.auth_service as auth_service
+    from app.core.config import settings
+    from app.core.security import get_password_hash, verify_password
+    from app.db.session import get_db
+    from app.main import app
+
+    class InlineHasher:
+        """The old path: bcrypt on the request threadpool."""
+        hash = staticmethod(get_password_hash)
+        verify = staticmethod(verify_password)
+
+        @staticmethod
+        async def ahash(password):
+            return await run_in_threadpool(get_password_hash, password)
+
+        @staticmethod
+        async def averify(password, hashed_password):
+            return await run_in_threadpool(verify_password, password, hashed_password)
+
+        @staticmethod
+        def check_capacity():
+            pass
+
+    settings.RATE_LIMIT_ENABLED = False
+    if mode == "inline":
+        auth_service.password_hasher = InlineHasher
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    session_factory = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+
+
+def populate(db_path: str) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.core.security import get_password_hash
+    from app.db.base_class import Base
+    from app.models.user import User, UserRole
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    hashed = get_password_hash(PASSWORD)
+    db.add_all([
+        User(email=f"user{i}@example.com", hashed_password=hashed, role=UserRole.USER)
+        for i in range(USERS)
+    ])
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+async def flood(base_url: str, clients: int, seconds: float) -> tuple[Counter, list[float], list[float]]:
+    outcomes, login_ms, probe_ms = Counter(), [], []
+    limits = httpx.Limits(max_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as http:
+        response = await http.post("/auth/login", data={"username": "user0@example.com", "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        stop = time.monotonic() + seconds
+
+        async def login_loop(n: int):
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                try:
+                    response = await http.post(
+                        "/auth/login", data={"username": f"user{n % USERS}@example.com", "password": PASSWORD}
+                    )
+                except httpx.TransportError:
+                    outcomes["error"] += 1
+                    continue
+                outcomes[response.status_code] += 1
+                login_ms.append((time.perf_counter() - start) * 1000)
+                if response.status_code == 503:
+                    await asyncio.sleep(float(response.headers.get("retry-after", 1)))
+
+        async def probe_loop():
+            while time.monotonic() < stop:
+                start = time.perf_counter()
+                await http.get("/categories/", headers=headers)
+                probe_ms.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(probe_loop(), *(login_loop(n) for n in range(clients)))
+    return outcomes, login_ms, probe_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--serve", nargs=3, metavar=("DB", "PORT", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve[0], int(args.serve[1]), args.serve[2])
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        populate(db_path)
+
+        print(f"clients: {args.clients}, seconds: {args.seconds}, cpus: {os.cpu_count()}")
+        print(f"{'mode':<9}{'logins':>8}{'200':>6}{'503':>6}{'429':>6}{'error':>6}"
+              f"{'login p50':>11}{'login p99':>11}{'probe p50':>11}{'probe p99':>11}")
+        for mode in ("inline", "bounded"):
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.bench_login_flood", "--serve", db_path, str(port), mode],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                while True:
+                    try:
+                        httpx.get(f"{base_url}/")
+                        break
+                    except httpx.TransportError:
+                        time.sleep(0.1)
+                outcomes, login_ms, probe_ms = asyncio.run(flood(base_url, args.clients, args.seconds))
+            finally:
+                server.terminate()
+                server.wait()
+            print(
+                f"{mode:<9}{sum(outcomes.values()):>8}{outcomes[200]:>6}{outcomes[503]:>6}{outcomes[429]:>6}{outcomes['error']:>6}"
+                f"{percentile(login_ms, 50):>11.0f}{percentile(login_ms, 99):>11.0f}"
+                f"{percentile(probe_ms, 50):>11.0f}{percentile(probe_ms, 99):>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /analytics/overview, per-count queries vs single aggregate.
+Run with: python -m benchmarks.bench_overview [--rows 10000,100000,1000000] [--url URL]
+
+The legacy path is what AnalyticsService.get_overview did before: four COUNT
+round trips plus loading every resolved Feedback row to average resolution
+time in Python. Peak Python memory is measured with tracemalloc; the
+aggregate query should stay flat as the table grows. Without --url a
+throwaway SQLite file is used; pass a PostgreSQL URL to measure production.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.models import Feedback, FeedbackStatus, User, UserRole
+from app.models.feedback import SentimentLabel
+from app.services.analytics_service import AnalyticsService
+
+STATUSES = list(FeedbackStatus)
+
+
+def populate(session_factory, rows: int, chunk: int = 10000) -> None:
+    rng = random.Random(42)
+    start = datetime(2023, 1, 1)
+    db = session_factory()
+    try:
+        user = User(email="bench@example.com", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.commit()
+        for offset in range(0, rows, chunk):
+            batch = []
+            for _ in range(min(chunk, rows - offset)):
+                created = start + timedelta(minutes=rng.randint(0, 500000))
+                status = rng.choice(STATUSES)
+                resolved = status == FeedbackStatus.RESOLVED
+                batch.append({
+                    "user_id": user.id,
+                    "title": "Benchmark feedback",
+                    "content": "Generated row",
+                    "status": status,
+                    "sentiment_label": "neutral",
+                    "created_at": created,
+                    "resolved_at": created + timedelta(hours=rng.randint(1, 500)) if resolved else None,
+                })
+            db.execute(insert(Feedback), batch)
+            db.commit()
+    finally:
+        db.close()
+
+
+def legacy_overview(db) -> tuple:
+    open_statuses = [FeedbackStatus.NEW, FeedbackStatus.TRIAGED, FeedbackStatus.IN_PROGRESS]
+    total = db.query(func.count(Feedback.id)).scalar()
+    open_count = db.query(func.count(Feedback.id)).filter(Feedback.status.in_(open_statuses)).scalar()
+    resolved_count = (
+        db.query(func.count(Feedback.id)).filter(Feedback.status == FeedbackStatus.RESOLVED).scalar()
+    )
+    resolved = (
+        db.query(Feedback)
+        .filter(Feedback.status == FeedbackStatus.RESOLVED, Feedback.resolved_at.isnot(None))
+        .all()
+    )
+    avg = None
+    if resolved:
+        avg = sum((f.resolved_at - f.created_at).total_seconds() / 3600 for f in resolved) / len(resolved)
+    pending = (
+        db.query(func.count(Feedback.id))
+        .filter(Feedback.sentiment_label == SentimentLabel.PENDING.value)
+        .scalar()
+    )
+    return total, open_count, resolved_count, avg, pending
+
+
+def measure(session_factory, fn) -> tuple[float, float]:
+    """Return (seconds, peak MiB) for one call on a fresh session."""
+    db = session_factory()
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        fn(db)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="10000,100000,1000000")
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10}  {'legacy s':>9}  {'legacy MiB':>10}  {'single s':>9}  {'single MiB':>10}")
+    for rows in [int(r) for r in args.rows.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            engine = create_engine(url)
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            session_factory = sessionmaker(bind=engine)
+            populate(session_factory, rows)
+
+            legacy_s, legacy_mib = measure(session_factory, legacy_overview)
+            single_s, single_mib = measure(session_factory, lambda db: AnalyticsService(db).get_overview())
+            print(f"{rows:>10}  {legacy_s:>9.3f}  {legacy_mib:>10.1f}  {single_s:>9.3f}  {single_mib:>10.2f}")
+
+            if args.url:
+                Base.metadata.drop_all(engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
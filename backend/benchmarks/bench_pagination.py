@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: feedback list latency, OFFSET pages vs keyset cursors.
+Run with: python -m benchmarks.bench_pagination [--rows 200000] [--page 5000] [--url URL]
+
+Times FeedbackService.get_all_feedback for page 1 and a deep page in the
+page/page_size compatibility mode (OFFSET + COUNT) and in cursor mode,
+where the deep page is reached with the cursor a client would hold after
+paging that far. Without --url a throwaway SQLite file is used.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import NEXT, encode_cursor
+from app.db.base_class import Base
+from app.models import Feedback
+from app.services.feedback_service import FeedbackService
+from benchmarks.bench_overview import populate
+
+PAGE_SIZE = 20
+
+
+def timed(session_factory, repeats: int, **kwargs) -> float:
+    """Median milliseconds of get_all_feedback(**kwargs)."""
+    samples = []
+    for _ in range(repeats):
+        db = session_factory()
+        try:
+            start = time.perf_counter()
+            FeedbackService(db).get_all_feedback(page_size=PAGE_SIZE, **kwargs)
+            samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--page", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--url", help="database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        if engine.dialect.name == "sqlite":
+            # SQLite sorts on julianday(created_at) (see app.db.functions)
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE INDEX ix_feedback_julianday_id ON feedback (julianday(created_at), id)"
+                ))
+        session_factory = sessionmaker(bind=engine)
+        populate(session_factory, args.rows)
+
+        # The cursor a client holds after reading page - 1 pages
+        db = session_factory()
+        last = (
+            db.query(Feedback.created_at, Feedback.id)
+            .order_by(Feedback.created_at.desc(), Feedback.id.desc())
+            .offset((args.page - 1) * PAGE_SIZE - 1)
+            .first()
+        )
+        db.close()
+        deep_cursor = encode_cursor(last.created_at, last.id, NEXT)
+
+        print(f"rows: {args.rows}, page size: {PAGE_SIZE}")
+        print(f"{'mode':<10}{'page 1 ms':>12}{f'page {args.page} ms':>16}")
+        offset_first = timed(session_factory, args.repeats, page=1)
+        offset_deep = timed(session_factory, args.repeats, page=args.page)
+        print(f"{'offset':<10}{offset_first:>12.1f}{offset_deep:>16.1f}")
+        cursor_first = timed(session_factory, args.repeats, cursor="")
+        cursor_deep = timed(session_factory, args.repeats, cursor=deep_cursor)
+        print(f"{'cursor':<10}{cursor_first:>12.1f}{cursor_deep:>16.1f}")
+
+        if args.url:
+            Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
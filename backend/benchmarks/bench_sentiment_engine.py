@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request sentiment setup, fresh VADER analyzer vs shared engine.
+Run with: python -m benchmarks.bench_sentiment_engine [--requests N]
+
+Reports CPU time (time.process_time) and bytes allocated (tracemalloc)
+per simulated request, where a request builds the analyzer the way
+FeedbackService used to and scores one submission.
+"""
+import argparse
+import time
+import tracemalloc
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.services.sentiment_engine import CUSTOM_LEXICON, get_sentiment_engine
+
+TEXT = "Terrible UI experience The interface is confusing and clunky. I can't find basic features."
+
+
+def per_request_analyzer() -> float:
+    """Old path: build and customise a new analyzer for every request."""
+    analyzer = SentimentIntensityAnalyzer()
+    analyzer.lexicon.update(CUSTOM_LEXICON)
+    return analyzer.polarity_scores(TEXT)["compound"]
+
+
+def shared_engine() -> float:
+    """New path: reuse the process-wide engine."""
+    return get_sentiment_engine().score(TEXT)
+
+
+def measure(fn, requests: int) -> tuple[float, float]:
+    """Return (CPU ms per request, KiB allocated per request)."""
+    fn()  # warm-up (loads the shared engine once)
+
+    start = time.process_time()
+    for _ in range(requests):
+        fn()
+    cpu_ms = (time.process_time() - start) * 1000 / requests
+
+    tracemalloc.start()
+    for _ in range(requests):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Peak traced memory across the loop; garbage from each iteration is freed
+    # before the next, so this approximates allocation per request.
+    return cpu_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'path':<24}{'cpu ms/req':>12}{'peak KiB':>12}")
+    for name, fn in [("per-request analyzer", per_request_analyzer), ("shared engine", shared_engine)]:
+        cpu_ms, kib = measure(fn, args.requests)
+        print(f"{name:<24}{cpu_ms:>12.3f}{kib:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: topic clustering, full-corpus KMeans vs streaming mini-batch.
+Run with: python -m benchmarks.bench_topics [--rows 10000,50000,200000] [--k 5]
+
+The KMeans path is what /analytics/topics used to run per request: load every
+Feedback object, build the full TF-IDF matrix and fit KMeans(n_init=10).
+The streaming path is stream_topics(). Each run happens in a fresh process
+so peak RSS (ru_maxrss) is measured per engine; "delta" excludes the memory
+of imports and the database connection.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base_class import Base
+from app.models import Feedback, User, UserRole
+from app.seed import SAMPLE_FEEDBACK
+
+
+def populate(url: str, rows: int, chunk: int = 10000) -> None:
+    rng = random.Random(42)
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        user = User(email="bench@example.com", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.commit()
+        for offset in range(0, rows, chunk):
+            batch = []
+            for _ in range(min(chunk, rows - offset)):
+                samples = rng.sample(SAMPLE_FEEDBACK, k=rng.randint(1, 3))
+                batch.append({
+                    "user_id": user.id,
+                    "title": samples[0]["title"],
+                    "content": " ".join(s["content"] for s in samples),
+                })
+            db.execute(insert(Feedback), batch)
+            db.commit()
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def _run(url: str, engine_name: str, k: int, queue) -> None:
+    from app.services.topic_model import fit_topics, stream_topics
+
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine)()
+    db.connection()  # connect before taking the baseline
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if engine_name == "kmeans":
+        feedbacks = db.query(Feedback).all()
+        fit_topics(
+            [f.id for f in feedbacks],
+            [f.title for f in feedbacks],
+            [f"{f.title} {f.content}" for f in feedbacks],
+            k,
+        )
+    else:
+        stream_topics(db, k)
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, peak / 1024, (peak - baseline) / 1024))
+
+
+def measure(url: str, engine_name: str, k: int) -> tuple[float, float, float]:
+    """(seconds, peak RSS MiB, RSS growth MiB) of one fit in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run, args=(url, engine_name, k, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="10000,50000,200000")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'engine':<10}{'seconds':>9}{'peak MiB':>10}{'delta MiB':>11}")
+    for rows in [int(r) for r in args.rows.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            populate(url, rows)
+            for engine_name in ("kmeans", "streaming"):
+                seconds, peak, delta = measure(url, engine_name, args.k)
+                print(f"{rows:>8}  {engine_name:<10}{seconds:>9.2f}{peak:>10.1f}{delta:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
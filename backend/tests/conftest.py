@@ -8,20 +8,29 @@ Database configuration:
 - Otherwise, fall back to in-memory SQLite for local development
 """
 import os
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool, NullPool
 
 from app.main import app
 from app.db.base_class import Base
+from app.db.pool import pool_waits
+from app.db.query_stats import QueryStats
 from app.db.session import get_db
 from app.core.security import get_password_hash
 from app.models.user import User, UserRole
+from app.services.catalog import catalog_cache
+from app.services.login_throttle import login_throttle
+from app.services.principal_cache import principal_cache
+from app.services.rate_limit import rate_limiter
+from app.services.feedback_counts import count_cache
 
 # Import all models to register them with Base
-from app.models import feedback, category, tag, feedback_tag, status_event, admin_response
+from app.models import feedback, category, tag, feedback_tag, status_event, admin_response, job_checkpoint, feedback_daily_stats, topic_snapshot
 
 
 # Test database configuration
@@ -77,6 +86,12 @@ def db():
     finally:
         db.close()
         Base.metadata.drop_all(bind=engine)
+        count_cache.invalidate()
+        catalog_cache.invalidate()
+        principal_cache.invalidate()
+        login_throttle.reset()
+        rate_limiter.reset()
+        pool_waits.reset()
 
 
 @pytest.fixture(scope="function")
@@ -146,3 +161,33 @@ def user_headers(user_token):
 def admin_headers(admin_token):
     """Get auth headers for test admin."""
     return {"Authorization": f"Bearer {admin_token}"}
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Fail the test if a block runs more SQL statements than budgeted.
+
+        with query_budget(3):
+            client.get("/feedback/mine", headers=user_headers)
+
+    Statements are counted on the test engine, so requests served by the
+    TestClient's thread are included.
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        stats = QueryStats(keep_statements=True)
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            stats.record(statement, 0.0)
+
+        event.listen(engine, "after_cursor_execute", record)
+        try:
+            yield stats
+        finally:
+            event.remove(engine, "after_cursor_execute", record)
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries, budget {max_queries}:\n" + "\n".join(stats.statements)
+        )
+
+    return budget
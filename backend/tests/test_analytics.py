@@ -1,7 +1,21 @@
 """Tests for analytics endpoints."""
+import io
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
+from app.models.feedback import Feedback, FeedbackStatus
+from app.models.feedback_daily_stats import FeedbackDailyStats
+from app.models.job_checkpoint import JobCheckpoint
+from app.models.topic_snapshot import TopicSnapshot
+from app.services.daily_stats import DailyStatsService
+from app.services.topic_model import TopicFit, TopicModelService, TopicRefreshScheduler
+from tests.conftest import TestingSessionLocal
+
 
 class TestAnalytics:
     """Tests for analytics endpoints (admin only)."""
@@ -28,6 +42,36 @@ class TestAnalytics:
         assert "resolved_feedback" in data
         assert data["total_feedback"] >= 2
 
+    def test_overview_aggregates(self, client: TestClient, db, admin_headers, test_user):
+        """Overview counts and average resolution time come from one query."""
+        now = datetime(2024, 1, 10, 12, 0, 0)
+        db.add_all([
+            Feedback(user_id=test_user.id, title="Open", content="x",
+                     status=FeedbackStatus.NEW, created_at=now),
+            Feedback(user_id=test_user.id, title="Pending", content="x",
+                     status=FeedbackStatus.TRIAGED, sentiment_label="pending", created_at=now),
+            Feedback(user_id=test_user.id, title="Fast", content="x", status=FeedbackStatus.RESOLVED,
+                     created_at=now, resolved_at=now + timedelta(hours=2)),
+            Feedback(user_id=test_user.id, title="Slow", content="x", status=FeedbackStatus.RESOLVED,
+                     created_at=now, resolved_at=now + timedelta(hours=4)),
+            Feedback(user_id=test_user.id, title="Rejected", content="x",
+                     status=FeedbackStatus.REJECTED, created_at=now),
+        ])
+        db.commit()
+
+        data = client.get("/analytics/overview", headers=admin_headers).json()
+        assert data["total_feedback"] == 5
+        assert data["open_feedback"] == 2
+        assert data["resolved_feedback"] == 2
+        assert data["pending_sentiment"] == 1
+        assert data["average_resolution_time_hours"] == pytest.approx(3.0)
+
+    def test_overview_without_resolved(self, client: TestClient, admin_headers):
+        """Average resolution time is null when nothing has been resolved."""
+        data = client.get("/analytics/overview", headers=admin_headers).json()
+        assert data["total_feedback"] == 0
+        assert data["average_resolution_time_hours"] is None
+
     def test_get_overview_as_user_forbidden(self, client: TestClient, user_headers):
         """Test regular user cannot access analytics."""
         response = client.get("/analytics/overview", headers=user_headers)
@@ -87,3 +131,171 @@ class TestAnalytics:
         assert response.status_code == 200
         data = response.json()
         assert "clusters" in data
+
+
+class TestDailyStats:
+    """Tests for the incrementally maintained daily rollup."""
+
+    @staticmethod
+    def _rollup(db):
+        db.expire_all()
+        return sorted(
+            (r.day, r.category_id, r.status, r.sentiment_label, r.feedback_count,
+             round(r.sentiment_sum, 6), r.sentiment_count)
+            for r in db.query(FeedbackDailyStats)
+            if r.feedback_count
+        )
+
+    def test_writes_match_rebuild(self, client: TestClient, db, admin_headers, user_headers):
+        """Create, edit, status, category and delete keep the rollup exact."""
+        category = client.post("/categories/", json={"name": "Bugs"}, headers=admin_headers).json()
+        ids = [
+            client.post(
+                "/feedback/",
+                json={"title": f"Feedback {i}", "content": "I love this"},
+                headers=user_headers
+            ).json()["id"]
+            for i in range(3)
+        ]
+        client.put(f"/feedback/{ids[0]}", json={"content": "This is broken"}, headers=user_headers)
+        client.put(f"/admin/feedback/{ids[1]}/status", json={"status": "triaged"}, headers=admin_headers)
+        client.put(
+            f"/admin/feedback/{ids[1]}/category",
+            json={"category_id": category["id"]},
+            headers=admin_headers
+        )
+        client.delete(f"/feedback/{ids[2]}", headers=user_headers)
+
+        maintained = self._rollup(db)
+        assert sum(r[4] for r in maintained) == 2
+        DailyStatsService(db).reconcile()
+        assert self._rollup(db) == maintained
+
+    def test_endpoints_read_rollup(self, client: TestClient, db, admin_headers, user_headers):
+        """Timeseries and sentiment trends are served from the rollup table."""
+        client.post("/feedback/", json={"title": "Great", "content": "Love it"}, headers=user_headers)
+        client.post("/feedback/", json={"title": "Awful", "content": "Broken"}, headers=user_headers)
+
+        timeseries = client.get("/analytics/timeseries?days=7", headers=admin_headers).json()
+        assert sum(p["count"] for p in timeseries["data"]) == 2
+
+        # Rows missing from the rollup are invisible until it is rebuilt
+        db.query(FeedbackDailyStats).delete()
+        db.commit()
+        trends = client.get("/analytics/sentiment-trends?days=7", headers=admin_headers).json()
+        assert trends["data"] == []
+
+        DailyStatsService(db).reconcile()
+        trends = client.get("/analytics/sentiment-trends?days=7", headers=admin_headers).json()
+        assert trends["data"][0]["count"] == 2
+
+
+class TestTopicSnapshots:
+    """Tests for persisted, background-refreshed topic models."""
+
+    TEXTS = [
+        ("Login broken", "Cannot login with password reset"),
+        ("Login fails", "Password reset email never arrives for login"),
+        ("Slow dashboard", "Dashboard charts load slow"),
+        ("Dashboard slow", "Charts on the dashboard are slow to load"),
+        ("Export CSV", "Please add CSV export for reports"),
+        ("CSV export", "Export reports to CSV would help"),
+    ]
+
+    def _add_feedback(self, db, user, count):
+        db.add_all([
+            Feedback(user_id=user.id, title=title, content=content)
+            for title, content in (self.TEXTS * count)[:count]
+        ])
+        db.commit()
+
+    def test_pending_then_served_from_snapshot(self, client: TestClient, db, admin_headers, test_user):
+        """The request only watches k; the refresher fits it, later requests read the snapshot."""
+        self._add_feedback(db, test_user, 12)
+
+        first = client.get("/analytics/topics?k=3", headers=admin_headers).json()
+        assert first["status"] == "pending"
+        assert first["clusters"] == []
+        assert TopicModelService(db).latest(3) is None
+
+        TopicRefreshScheduler(session_factory=TestingSessionLocal, ks=[3]).check()
+        data = client.get("/analytics/topics?k=3", headers=admin_headers).json()
+        assert data["status"] == "ready"
+        assert data["version"] == 1
+        assert data["corpus_size"] == 12
+        assert data["age_seconds"] < 60
+        assert sum(c["count"] for c in data["clusters"]) == 12
+
+        snapshot = TopicModelService(db).latest(3)
+        model = TopicFit.load_model(snapshot.model)
+        assert model["centroids"].shape[0] == 3
+        assert len(model["labels"]) == len(model["feedback_ids"]) == 12
+        assert len(model["terms"]) == model["centroids"].shape[1]
+
+    def test_model_blob_refuses_pickles(self):
+        """Stored models are plain arrays; a pickled payload is not loaded."""
+        fit = TopicFit(
+            clusters=[], vectorizer=None, engine="streaming",
+            centroids=np.zeros((2, 3)), labels=np.array([0, 1]), feedback_ids=np.array([5, 6]),
+        )
+        model = TopicFit.load_model(fit.dump())
+        assert model["engine"] == "streaming"
+        assert model["feedback_ids"].tolist() == [5, 6]
+
+        buffer = io.BytesIO()
+        np.savez(buffer, engine=np.array([object()], dtype=object))
+        with pytest.raises(ValueError):
+            TopicFit.load_model(buffer.getvalue())
+
+    def test_scheduler_refreshes_after_new_rows(self, db, test_user, monkeypatch):
+        """A k is refitted once enough new feedback arrives; old versions are pruned."""
+        monkeypatch.setattr(settings, "TOPICS_REFRESH_NEW_ROWS", 3)
+        monkeypatch.setattr(settings, "TOPICS_SNAPSHOT_RETENTION", 1)
+        scheduler = TopicRefreshScheduler(session_factory=TestingSessionLocal, ks=[3])
+        self._add_feedback(db, test_user, 6)
+
+        assert scheduler.check() == 1
+        assert scheduler.check() == 0  # fresh
+
+        self._add_feedback(db, test_user, 3)
+        assert scheduler.check() == 1
+
+        db.expire_all()
+        snapshots = db.query(TopicSnapshot).all()
+        assert [(s.version, s.corpus_size) for s in snapshots] == [(2, 9)]
+
+    def test_refresh_lease(self, db, test_user):
+        """A k leased by another worker is skipped until the lease expires; ours is released."""
+        self._add_feedback(db, test_user, 6)
+        lease = JobCheckpoint(name="topic_refresh_lease:3", position=int(time.time()) + 600)
+        db.add(lease)
+        db.commit()
+
+        assert TopicModelService(db).refresh(3) is None
+
+        lease.position = int(time.time()) - 1
+        db.commit()
+        assert TopicModelService(db).refresh(3).version == 1
+        db.refresh(lease)
+        assert lease.position == 0
+
+    def test_streaming_engine(self, db, test_user, monkeypatch):
+        """Large corpora are clustered in chunks with keyword labels from a vocabulary."""
+        monkeypatch.setattr(settings, "TOPICS_STREAMING_MIN_ROWS", 1)
+        monkeypatch.setattr(settings, "TOPICS_STREAM_CHUNK_SIZE", 6)
+        self._add_feedback(db, test_user, 18)
+
+        snapshot = TopicModelService(db).refresh(3)
+        model = TopicFit.load_model(snapshot.model)
+        assert model["engine"] == "streaming"
+        assert snapshot.corpus_size == 18
+        assert len(model["labels"]) == 18
+
+        clusters = snapshot.clusters
+        assert sum(c["count"] for c in clusters) == 18
+        assert all(c["keywords"] for c in clusters)
+        # Feedback about the same subject lands in the same cluster
+        titles = dict(db.query(Feedback.id, Feedback.title).all())
+        by_title = {titles[int(fid)]: label for fid, label in zip(model["feedback_ids"], model["labels"])}
+        assert by_title["Login broken"] == by_title["Login fails"]
+        assert by_title["Export CSV"] == by_title["CSV export"]
@@ -0,0 +1,167 @@
+"""Tests for DB_ASYNC mode (AsyncSession on aiosqlite against a file database)."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.async_session import async_database_url, get_async_db
+from app.db.base_class import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.category import Category
+from app.models.user import User, UserRole
+from app.services.analytics_service import AnalyticsService
+from app.services.principal_cache import principal_cache
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_app(db, tmp_path, monkeypatch):
+    """
+    The app in DB_ASYNC mode on a temporary SQLite file.
+
+    Depends on `db` for its cache resets; the sync session (principal cache
+    misses, routes outside the async services) uses the same file. Yields
+    the list of statements run through the async engine.
+    """
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    with SyncSession() as session:
+        session.add_all([
+            User(email="test@example.com", hashed_password=get_password_hash("testpassword"), role=UserRole.USER),
+            User(email="admin@example.com", hashed_password=get_password_hash("adminpassword"), role=UserRole.ADMIN),
+            Category(name="Bug"),
+        ])
+        session.commit()
+
+    async_engine = create_async_engine(async_database_url(url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+    statements = []
+    event.listen(async_engine.sync_engine, "after_cursor_execute", lambda *args: statements.append(args[2]))
+
+    def override_get_db():
+        with SyncSession() as session:
+            yield session
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as session:
+            yield session
+
+    monkeypatch.setattr(settings, "DB_ASYNC", True)
+    previous_get_db = app.dependency_overrides[get_db]
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    try:
+        yield statements
+    finally:
+        app.dependency_overrides[get_db] = previous_get_db
+        del app.dependency_overrides[get_async_db]
+        sync_engine.dispose()
+        asyncio.run(async_engine.dispose())
+
+
+def _headers(client: TestClient, email: str, password: str) -> dict:
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestAsyncMode:
+    """The async-service routes served through AsyncSession."""
+
+    def test_async_database_url(self):
+        assert async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+        assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+    def test_feedback_lifecycle(self, async_app):
+        with TestClient(app) as client:
+            user_headers = _headers(client, "test@example.com", "testpassword")
+            admin_headers = _headers(client, "admin@example.com", "adminpassword")
+            # Principal cache misses load the user on the async engine
+            principal_cache.invalidate()
+            async_app.clear()
+            assert client.get("/feedback/mine", headers=user_headers).status_code == 200
+            assert any("FROM users" in statement for statement in async_app)
+
+            response = client.post(
+                "/feedback/",
+                json={"title": "Crash on save", "content": "The app crashes every time I save"},
+                headers=user_headers,
+            )
+            assert response.status_code == 200
+            feedback_id = response.json()["id"]
+            assert any(statement.startswith("INSERT INTO feedback") for statement in async_app)
+
+            mine = client.get("/feedback/mine", headers=user_headers).json()
+            assert [item["id"] for item in mine["items"]] == [feedback_id]
+            detail = client.get(f"/feedback/{feedback_id}", headers=user_headers).json()
+            assert detail["status_events"][0]["new_status"] == "new"
+
+            response = client.put(
+                f"/feedback/{feedback_id}", json={"content": "Saving works great now"}, headers=user_headers
+            )
+            assert response.json()["content"] == "Saving works great now"
+            assert response.json()["sentiment_label"] == "positive"
+
+            response = client.put(
+                f"/admin/feedback/{feedback_id}/status", json={"status": "resolved"}, headers=admin_headers
+            )
+            assert response.json()["status"] == "resolved"
+            response = client.post(
+                f"/admin/feedback/{feedback_id}/respond", json={"message": "Fixed"}, headers=admin_headers
+            )
+            assert response.json()["message"] == "Fixed"
+            assert client.get("/admin/feedback", headers=admin_headers).json()["total"] == 1
+
+            overview = client.get("/analytics/overview", headers=admin_headers).json()
+            assert overview["total_feedback"] == 1
+            assert overview["resolved_feedback"] == 1
+
+            response = client.delete(f"/feedback/{feedback_id}", headers=user_headers)
+            assert response.status_code == 400
+
+    def test_analytics_responses_built_off_the_event_loop(self, async_app, monkeypatch):
+        def on_event_loop():
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return False
+            return True
+
+        built = []
+        overview_response = AnalyticsService._overview_response
+        monkeypatch.setattr(AnalyticsService, "_overview_response", staticmethod(
+            lambda row: built.append(on_event_loop()) or overview_response(row)
+        ))
+        with TestClient(app) as client:
+            admin_headers = _headers(client, "admin@example.com", "adminpassword")
+            async_app.clear()
+            assert client.get("/analytics/overview", headers=admin_headers).json()["total_feedback"] == 0
+            assert client.get("/analytics/topics?k=3", headers=admin_headers).json()["status"] == "pending"
+        assert built == [False]
+        assert any("FROM topic_snapshots" in statement for statement in async_app)
+
+    def test_auth(self, async_app):
+        with TestClient(app) as client:
+            response = client.post("/auth/register", json={"email": "new@example.com", "password": "newpassword123"})
+            assert response.status_code == 200
+            response = client.post("/auth/register", json={"email": "new@example.com", "password": "newpassword123"})
+            assert response.status_code == 400
+
+            response = client.post("/auth/login", data={"username": "new@example.com", "password": "wrong"})
+            assert response.status_code == 401
+            tokens = client.post("/auth/login", data={"username": "new@example.com", "password": "newpassword123"}).json()
+
+            headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+            assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+            assert client.post("/auth/logout", headers=headers).status_code == 200
+            response = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+            assert response.status_code == 401
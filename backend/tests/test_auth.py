@@ -1,7 +1,25 @@
 """Tests for authentication endpoints."""
+import threading
+import time
+from datetime import timedelta
+
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
+from app.core import security
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import create_access_token, decode_access_token, verified_tokens
+from app.models.user import UserRole
+from app.services.password_hashing import PasswordHasher, password_hasher
+
+
+def _login(client: TestClient, email: str, password: str) -> dict:
+    response = client.post("/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
 
 class TestRegister:
     """Tests for user registration."""
@@ -82,3 +100,151 @@ class TestCurrentUser:
         """Test getting current user info without auth fails."""
         response = client.get("/auth/me")
         assert response.status_code == 401
+
+    def test_cached_principal(self, client: TestClient, user_headers, query_budget):
+        """Repeated requests reuse the principal without a query."""
+        client.get("/auth/me", headers=user_headers)
+        with query_budget(0):
+            assert client.get("/users/me", headers=user_headers).json()["email"] == "test@example.com"
+        assert metrics.get("principal_cache_hit_ratio") > 0
+
+    def test_role_change(self, client: TestClient, db, test_user):
+        """
+        A committed change drops the cached principal at once; admin routes
+        trust the token's role until it is refreshed.
+        """
+        tokens = _login(client, "test@example.com", "testpassword")
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.get("/users/", headers=headers).status_code == 403
+        test_user.role = UserRole.ADMIN
+        db.commit()
+        assert client.get("/auth/me", headers=headers).json()["role"] == "admin"
+        assert client.get("/users/", headers=headers).status_code == 403
+
+        refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+        headers = {"Authorization": f"Bearer {refreshed['access_token']}"}
+        assert client.get("/users/", headers=headers).status_code == 200
+
+    def test_deleted_user_rejected(self, client: TestClient, db, test_user, user_headers):
+        client.get("/auth/me", headers=user_headers)
+        db.delete(test_user)
+        db.commit()
+        assert client.get("/auth/me", headers=user_headers).status_code == 401
+
+
+class TestTokens:
+    """Tests for role-bearing access tokens and the refresh flow."""
+
+    def test_login_returns_role_bearing_tokens(self, client: TestClient, test_admin):
+        tokens = _login(client, "admin@example.com", "adminpassword")
+        claims = decode_access_token(tokens["access_token"])
+        assert (claims["sub"], claims["role"], claims["ver"]) == (str(test_admin.id), "admin", 0)
+        assert decode_access_token(tokens["refresh_token"]) is None
+
+    def test_admin_route_without_lookup(self, client: TestClient, admin_headers, query_budget):
+        with query_budget(0):
+            assert client.get("/admin/metrics", headers=admin_headers).status_code == 200
+
+    def test_refresh_token_is_not_an_access_token(self, client: TestClient, test_user):
+        tokens = _login(client, "test@example.com", "testpassword")
+        headers = {"Authorization": f"Bearer {tokens['refresh_token']}"}
+        assert client.get("/auth/me", headers=headers).status_code == 401
+        response = client.post("/auth/refresh", json={"refresh_token": tokens["access_token"]})
+        assert response.status_code == 401
+
+    def test_logout_revokes_refresh_tokens(self, client: TestClient, test_user):
+        tokens = _login(client, "test@example.com", "testpassword")
+        refreshed = client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert refreshed.status_code == 200
+
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        assert client.post("/auth/logout", headers=headers).status_code == 200
+        for token in (tokens["refresh_token"], refreshed.json()["refresh_token"]):
+            assert client.post("/auth/refresh", json={"refresh_token": token}).status_code == 401
+        # A fresh login works again
+        assert _login(client, "test@example.com", "testpassword")["refresh_token"]
+
+
+class TestVerifiedTokenCache:
+    """Tests for reusing verified token claims."""
+
+    def test_reused_until_exp(self, monkeypatch):
+        token = create_access_token({"sub": "7"}, expires_delta=timedelta(minutes=5))
+        assert decode_access_token(token)["sub"] == "7"
+        hits = verified_tokens.hits
+        assert decode_access_token(token)["sub"] == "7"
+        assert verified_tokens.hits == hits + 1
+
+        # Past exp the entry is dropped
+        later = time.time() + 600
+        monkeypatch.setattr(security.time, "time", lambda: later)
+        assert verified_tokens.get(token) is None
+
+    def test_dropped_on_key_rotation(self, monkeypatch):
+        token = create_access_token({"sub": "7"})
+        assert decode_access_token(token) is not None
+        monkeypatch.setattr(settings, "SECRET_KEY", "rotated-secret")
+        assert decode_access_token(token) is None
+        assert len(verified_tokens) == 0
+
+    def test_invalid_tokens_not_cached(self):
+        before = len(verified_tokens)
+        assert decode_access_token("not-a-token") is None
+        assert len(verified_tokens) == before
+
+
+class TestLoginProtection:
+    """Tests for login throttling and the bounded password hasher."""
+
+    def test_account_throttled_after_failures(self, client: TestClient, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_ACCOUNT", 3)
+        for _ in range(3):
+            response = client.post("/auth/login", data={"username": "test@example.com", "password": "wrong"})
+            assert response.status_code == 401
+        # Even the right password is refused until the window moves on
+        response = client.post("/auth/login", data={"username": "test@example.com", "password": "testpassword"})
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) > 0
+
+    def test_success_clears_account_failures(self, client: TestClient, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_ACCOUNT", 3)
+        for _ in range(2):
+            client.post("/auth/login", data={"username": "test@example.com", "password": "wrong"})
+        _login(client, "test@example.com", "testpassword")
+        for _ in range(2):
+            client.post("/auth/login", data={"username": "test@example.com", "password": "wrong"})
+        _login(client, "test@example.com", "testpassword")
+
+    def test_ip_throttled_across_accounts(self, client: TestClient, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_IP", 3)
+        monkeypatch.setattr(settings, "TRUST_PROXY_HEADERS", True)
+        proxied = {"X-Real-IP": "203.0.113.7"}
+        for i in range(3):
+            client.post("/auth/login", data={"username": f"guess{i}@example.com", "password": "x"}, headers=proxied)
+        data = {"username": "test@example.com", "password": "testpassword"}
+        assert client.post("/auth/login", data=data, headers=proxied).status_code == 429
+        assert client.post("/auth/login", data=data, headers={"X-Real-IP": "198.51.100.1"}).status_code == 200
+        assert metrics.get("login_throttled_total", scope="ip") >= 1
+
+    def test_saturated_hasher_rejects(self, client: TestClient, test_user, monkeypatch):
+        monkeypatch.setattr(password_hasher, "max_queue", -password_hasher.workers)
+        response = client.post("/auth/login", data={"username": "test@example.com", "password": "testpassword"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+    def test_hasher_admission_limit(self):
+        hasher = PasswordHasher(workers=1, max_queue=1, timeout_seconds=5)
+        release = threading.Event()
+        waiting = [threading.Thread(target=hasher._run, args=(release.wait,)) for _ in range(2)]
+        for thread in waiting:
+            thread.start()
+        while hasher.pending < 2:
+            time.sleep(0.01)
+        with pytest.raises(HTTPException) as exc_info:
+            hasher._run(lambda: None)
+        assert exc_info.value.status_code == 503 and hasher.rejected == 1
+        release.set()
+        for thread in waiting:
+            thread.join()
+        assert hasher.pending == 0
+        assert hasher.verify("secret", security.get_password_hash("secret"))
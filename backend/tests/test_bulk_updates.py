@@ -0,0 +1,179 @@
+"""Tests for bulk admin status, category and tag updates."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.feedback import Feedback, FeedbackStatus
+from app.models.feedback_daily_stats import FeedbackDailyStats
+from app.models.status_event import StatusEvent
+from app.models.tag import Tag
+from app.services.daily_stats import DailyStatsService
+
+
+def _seed(db, user, count, **fields):
+    items = [Feedback(user_id=user.id, title=f"Item {i}", content="x", **fields) for i in range(count)]
+    db.add_all(items)
+    db.commit()
+    ids = [item.id for item in items]
+    DailyStatsService(db).reconcile()
+    return ids
+
+
+def _rollup(db):
+    db.expire_all()
+    return sorted(
+        (r.day, r.category_id, r.status, r.sentiment_label, r.feedback_count)
+        for r in db.query(FeedbackDailyStats)
+        if r.feedback_count
+    )
+
+
+class TestBulkUpdates:
+    """Tests for /admin/feedback/bulk/*."""
+
+    def test_status_by_ids(self, client: TestClient, db, test_user, admin_headers):
+        """Per-id results, one event per changed item and an exact rollup."""
+        ids = _seed(db, test_user, 3)
+        db.query(Feedback).filter(Feedback.id == ids[2]).update({"status": FeedbackStatus.TRIAGED})
+        db.commit()
+        DailyStatsService(db).reconcile()
+
+        response = client.post(
+            "/admin/feedback/bulk/status",
+            json={"ids": [ids[1], ids[0], ids[2], 9999, ids[0]], "status": "triaged"},
+            headers=admin_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert [(r["id"], r["result"]) for r in data["results"]] == [
+            (ids[0], "updated"), (ids[1], "updated"), (ids[2], "unchanged"), (9999, "not_found")
+        ]
+        assert (data["updated"], data["unchanged"], data["not_found"]) == (2, 1, 1)
+        assert db.query(StatusEvent).filter(StatusEvent.new_status == "triaged").count() == 2
+
+        maintained = _rollup(db)
+        DailyStatsService(db).reconcile()
+        assert _rollup(db) == maintained
+
+    def test_status_by_filter_in_chunks(self, client: TestClient, db, test_user, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 2)
+        _seed(db, test_user, 5)
+        _seed(db, test_user, 2, status=FeedbackStatus.REJECTED)
+
+        data = client.post(
+            "/admin/feedback/bulk/status",
+            json={"filter": {"status": "new"}, "status": "resolved"},
+            headers=admin_headers
+        ).json()
+        assert (data["updated"], data["chunks"]) == (5, 3)
+        db.expire_all()
+        resolved = db.query(Feedback).filter(Feedback.status == FeedbackStatus.RESOLVED).all()
+        assert len(resolved) == 5 and all(item.resolved_at for item in resolved)
+        assert db.query(Feedback).filter(Feedback.status == FeedbackStatus.REJECTED).count() == 2
+
+    def test_category(self, client: TestClient, db, test_user, admin_headers):
+        category = Category(name="Bugs")
+        db.add(category)
+        db.commit()
+        category_id = category.id
+        ids = _seed(db, test_user, 3)
+
+        data = client.post(
+            "/admin/feedback/bulk/category",
+            json={"ids": ids, "category_id": category_id},
+            headers=admin_headers
+        ).json()
+        assert data["updated"] == 3
+        assert db.query(Feedback).filter(Feedback.category_id == category_id).count() == 3
+        maintained = _rollup(db)
+        DailyStatsService(db).reconcile()
+        assert _rollup(db) == maintained
+
+        missing = client.post(
+            "/admin/feedback/bulk/category", json={"ids": ids, "category_id": 9999}, headers=admin_headers
+        )
+        assert missing.status_code == 404
+
+    def test_category_deleted_meanwhile(self, client: TestClient, db, test_user, admin_headers, monkeypatch):
+        """A foreign key failure rolls back its chunk and fails the remaining items instead of a 500."""
+        monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 2)
+        category = Category(name="Bugs")
+        db.add(category)
+        db.commit()
+        category_id = category.id
+        ids = _seed(db, test_user, 5)
+        apply = DailyStatsService.apply
+        calls = []
+
+        def fail_second_chunk(self, *args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise IntegrityError("UPDATE", {}, Exception("FOREIGN KEY constraint failed"))
+            return apply(self, *args, **kwargs)
+
+        monkeypatch.setattr(DailyStatsService, "apply", fail_second_chunk)
+        response = client.post(
+            "/admin/feedback/bulk/category",
+            json={"ids": ids, "category_id": category_id},
+            headers=admin_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["updated"], data["failed"], data["chunks"]) == (2, 3, 1)
+        assert [r["result"] for r in data["results"]] == ["updated"] * 2 + ["failed"] * 3
+        db.expire_all()
+        assert db.query(Feedback).filter(Feedback.category_id == category_id).count() == 2
+
+    def test_tags_modes(self, client: TestClient, db, test_user, admin_headers, user_headers):
+        tags = [Tag(name="ui"), Tag(name="api"), Tag(name="docs")]
+        db.add_all(tags)
+        db.commit()
+        ui, api, docs = (tag.id for tag in tags)
+        ids = _seed(db, test_user, 2)
+
+        def tag_names(feedback_id):
+            detail = client.get(f"/feedback/{feedback_id}", headers=user_headers).json()
+            return sorted(tag["name"] for tag in detail["tags"])
+
+        def bulk(tag_ids, mode, selected=ids):
+            return client.post(
+                "/admin/feedback/bulk/tags",
+                json={"ids": selected, "tag_ids": tag_ids, "mode": mode},
+                headers=admin_headers
+            ).json()
+
+        assert bulk([ui, api], "add")["updated"] == 2
+        assert bulk([ui], "add", [ids[0]])["results"][0]["result"] == "unchanged"
+        bulk([ui], "remove", [ids[0]])
+        assert (tag_names(ids[0]), tag_names(ids[1])) == (["api"], ["api", "ui"])
+        bulk([docs, 9999], "replace")
+        assert tag_names(ids[0]) == tag_names(ids[1]) == ["docs"]
+
+    def test_selection_validation(self, client: TestClient, admin_headers, monkeypatch):
+        both = client.post(
+            "/admin/feedback/bulk/status",
+            json={"ids": [1], "filter": {}, "status": "triaged"},
+            headers=admin_headers
+        )
+        assert both.status_code == 422
+
+        monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 2)
+        too_many = client.post(
+            "/admin/feedback/bulk/status", json={"ids": [1, 2, 3], "status": "triaged"}, headers=admin_headers
+        )
+        assert too_many.status_code == 400
+
+    def test_requires_admin(self, client: TestClient, user_headers):
+        response = client.post(
+            "/admin/feedback/bulk/status", json={"ids": [1], "status": "triaged"}, headers=user_headers
+        )
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize("count", [3, 40])
+    def test_statements_per_chunk(self, client: TestClient, db, test_user, admin_headers, query_budget, count):
+        """locking SELECT + UPDATE + event INSERT + rollup upsert, however many items (admin from the principal cache)."""
+        ids = _seed(db, test_user, count)
+        with query_budget(4):
+            client.post("/admin/feedback/bulk/status", json={"ids": ids, "status": "triaged"}, headers=admin_headers)
@@ -2,6 +2,10 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
+from app.models.category import Category
+from app.services.catalog import CatalogCache, catalog_cache
+
 
 class TestCategories:
     """Tests for category operations."""
@@ -80,3 +84,56 @@ class TestTags:
         response = client.get("/tags/", headers=user_headers)
         assert response.status_code == 200
         assert len(response.json()) >= 1
+
+
+class TestCatalogCache:
+    """Tests for the cached catalog lists, ETags and cross-worker invalidation."""
+
+    def test_etag_and_not_modified(self, client: TestClient, admin_headers, user_headers, query_budget):
+        client.post("/tags/", json={"name": "zeta"}, headers=admin_headers)
+        client.post("/tags/", json={"name": "alpha"}, headers=admin_headers)
+        response = client.get("/tags/", headers=user_headers)
+        etag = response.headers["etag"]
+        assert [t["name"] for t in response.json()] == ["alpha", "zeta"]
+
+        # Only the current user is loaded; the catalog comes from the cache
+        with query_budget(1):
+            cached = client.get("/tags/", headers={**user_headers, "If-None-Match": etag})
+        assert cached.status_code == 304 and cached.headers["etag"] == etag
+
+        client.put(f"/tags/{response.json()[0]['id']}", json={"name": "beta"}, headers=admin_headers)
+        changed = client.get("/tags/", headers={**user_headers, "If-None-Match": etag})
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+        assert [t["name"] for t in changed.json()] == ["beta", "zeta"]
+
+    def test_unknown_ids_reload_only_after_version_change(self, client: TestClient, db, user_headers, monkeypatch):
+        """Bogus ids do not reload the catalogs; an id added by another worker is found at once."""
+        monkeypatch.setattr(settings, "CATALOG_VERSION_CHECK_SECONDS", 3600)
+        bogus = {"title": "Bogus", "content": "x", "category_id": 999, "tag_ids": [998, 999]}
+        assert client.post("/feedback/", json=bogus, headers=user_headers).status_code == 200
+        reloads = catalog_cache.reloads
+        for _ in range(3):
+            assert client.post("/feedback/", json=bogus, headers=user_headers).status_code == 200
+        assert catalog_cache.reloads == reloads
+
+        category = Category(name="Elsewhere")
+        db.add(category)
+        CatalogCache().bump(db)
+        db.commit()
+        assert catalog_cache.category(db, category.id).name == "Elsewhere"
+        assert catalog_cache.reloads == reloads + 1
+
+    def test_change_in_other_worker(self, client: TestClient, db, user_headers, monkeypatch):
+        """Another process's change is picked up once the shared version is re-read."""
+        monkeypatch.setattr(settings, "CATALOG_VERSION_CHECK_SECONDS", 0)
+        assert client.get("/categories/", headers=user_headers).json() == []
+        monkeypatch.setattr(settings, "CATALOG_VERSION_CHECK_SECONDS", 3600)
+
+        # The other worker has its own cache but shares the version row
+        db.add(Category(name="Elsewhere"))
+        CatalogCache().bump(db)
+        db.commit()
+        assert client.get("/categories/", headers=user_headers).json() == []
+
+        monkeypatch.setattr(settings, "CATALOG_VERSION_CHECK_SECONDS", 0)
+        assert [c["name"] for c in client.get("/categories/", headers=user_headers).json()] == ["Elsewhere"]
@@ -1,6 +1,12 @@
 """Tests for feedback endpoints."""
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+
+from app.models.feedback import Feedback
+from app.services.feedback_service import FeedbackService
 
 
 class TestUserFeedback:
@@ -30,6 +36,36 @@ class TestUserFeedback:
         )
         assert response.status_code == 401
 
+    def test_create_retries_constraint_failure_once(self, client: TestClient, user_headers, monkeypatch):
+        """A stale catalog is retried once with the same sentiment; a second failure is a 400."""
+        insert_feedback = FeedbackService._insert_feedback
+        analyzed, attempts = [], []
+        analyze = FeedbackService._analyze_sentiment
+        monkeypatch.setattr(
+            FeedbackService, "_analyze_sentiment", staticmethod(lambda text: analyzed.append(text) or analyze(text))
+        )
+
+        def fail_first(self, *args):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+            return insert_feedback(self, *args)
+
+        monkeypatch.setattr(FeedbackService, "_insert_feedback", fail_first)
+        response = client.post("/feedback/", json={"title": "Retry", "content": "Content"}, headers=user_headers)
+        assert response.status_code == 200
+        assert (len(attempts), len(analyzed)) == (2, 1)
+
+        def always_fail(self, *args):
+            attempts.append(args)
+            raise IntegrityError("INSERT", {}, Exception("FOREIGN KEY constraint failed"))
+
+        attempts.clear()
+        monkeypatch.setattr(FeedbackService, "_insert_feedback", always_fail)
+        response = client.post("/feedback/", json={"title": "Retry", "content": "Content"}, headers=user_headers)
+        assert response.status_code == 400
+        assert len(attempts) == 2
+
     def test_get_my_feedback(self, client: TestClient, user_headers):
         """Test getting user's own feedback list."""
         # Create feedback first
@@ -141,6 +177,67 @@ class TestAdminFeedback:
         assert response.status_code == 200
         assert response.json()["status"] == "in_progress"
 
+    def test_status_update_records_event(self, client: TestClient, db, admin_headers, user_headers):
+        """The status event is written with the change; resolving sets resolved_at."""
+        feedback_id = client.post(
+            "/feedback/", json={"title": "Resolve me", "content": "Content"}, headers=user_headers
+        ).json()["id"]
+        response = client.put(
+            f"/admin/feedback/{feedback_id}/status", json={"status": "resolved"}, headers=admin_headers
+        )
+        assert response.json()["resolved_at"] is not None
+        
+        events = client.get(f"/feedback/{feedback_id}", headers=user_headers).json()["status_events"]
+        assert [(e["old_status"], e["new_status"]) for e in events][-1] == ("new", "resolved")
+        missing = client.put("/admin/feedback/9999/status", json={"status": "triaged"}, headers=admin_headers)
+        assert missing.status_code == 404
+
+    def test_update_tags_replaces_links(self, client: TestClient, admin_headers, user_headers):
+        """Tags are replaced set-based; unknown tag ids are ignored."""
+        tag_ids = [
+            client.post("/tags/", json={"name": name}, headers=admin_headers).json()["id"]
+            for name in ("ui", "api", "docs")
+        ]
+        feedback_id = client.post(
+            "/feedback/",
+            json={"title": "Tagged", "content": "Content", "tag_ids": tag_ids[:2]},
+            headers=user_headers
+        ).json()["id"]
+        
+        response = client.put(
+            f"/admin/feedback/{feedback_id}/tags",
+            json={"tag_ids": [tag_ids[1], tag_ids[2], 9999]},
+            headers=admin_headers
+        )
+        assert [t["name"] for t in response.json()["tags"]] == ["api", "docs"]
+        detail = client.get(f"/feedback/{feedback_id}", headers=user_headers).json()
+        assert sorted(t["name"] for t in detail["tags"]) == ["api", "docs"]
+        
+        cleared = client.put(f"/admin/feedback/{feedback_id}/tags", json={"tag_ids": []}, headers=admin_headers)
+        assert cleared.json()["tags"] == []
+
+    def test_update_category_uses_current_catalog(self, client: TestClient, admin_headers, user_headers):
+        """Category responses follow renames; unknown categories are rejected."""
+        category_id = client.post("/categories/", json={"name": "Bugs"}, headers=admin_headers).json()["id"]
+        feedback_id = client.post(
+            "/feedback/", json={"title": "Categorized", "content": "Content"}, headers=user_headers
+        ).json()["id"]
+        
+        response = client.put(
+            f"/admin/feedback/{feedback_id}/category", json={"category_id": category_id}, headers=admin_headers
+        )
+        assert response.json()["category"]["name"] == "Bugs"
+        client.put(f"/categories/{category_id}", json={"name": "Defects"}, headers=admin_headers)
+        response = client.put(
+            f"/admin/feedback/{feedback_id}/category", json={"category_id": category_id}, headers=admin_headers
+        )
+        assert response.json()["category"]["name"] == "Defects"
+        
+        missing = client.put(
+            f"/admin/feedback/{feedback_id}/category", json={"category_id": 9999}, headers=admin_headers
+        )
+        assert missing.status_code == 404
+
     def test_respond_to_feedback(self, client: TestClient, admin_headers, user_headers):
         """Test admin can respond to feedback."""
         # Create feedback as user
@@ -159,3 +256,114 @@ class TestAdminFeedback:
         )
         assert response.status_code == 200
         assert response.json()["message"] == "Thank you for your feedback!"
+
+
+class TestCursorPagination:
+    """Tests for keyset (cursor) pagination of feedback lists."""
+
+    def _seed(self, db, user, count):
+        # Several rows share a created_at so ordering must fall back to id
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        db.add_all([
+            Feedback(user_id=user.id, title=f"Item {i}", content="x",
+                     created_at=base + timedelta(minutes=i // 3))
+            for i in range(count)
+        ])
+        db.commit()
+
+    def test_walk_forward_and_back(self, client: TestClient, db, admin_headers, test_user):
+        """Following cursors visits every row once, in the same order as offset pages."""
+        self._seed(db, test_user, 23)
+        expected = [
+            item["id"]
+            for page in (1, 2, 3)
+            for item in client.get(
+                f"/admin/feedback?page={page}&page_size=10", headers=admin_headers
+            ).json()["items"]
+        ]
+
+        pages = []
+        data = client.get("/admin/feedback?cursor=&page_size=10", headers=admin_headers).json()
+        assert data["total"] is None and data["prev_cursor"] is None
+        pages.append(data)
+        while data["next_cursor"]:
+            data = client.get(
+                f"/admin/feedback?cursor={data['next_cursor']}&page_size=10", headers=admin_headers
+            ).json()
+            pages.append(data)
+        assert [len(p["items"]) for p in pages] == [10, 10, 3]
+        assert [item["id"] for p in pages for item in p["items"]] == expected
+
+        back = client.get(
+            f"/admin/feedback?cursor={pages[2]['prev_cursor']}&page_size=10", headers=admin_headers
+        ).json()
+        assert [item["id"] for item in back["items"]] == [item["id"] for item in pages[1]["items"]]
+        first = client.get(
+            f"/admin/feedback?cursor={back['prev_cursor']}&page_size=10", headers=admin_headers
+        ).json()
+        assert first["items"] == pages[0]["items"]
+        assert first["prev_cursor"] is None
+
+    def test_offset_mode_returns_cursors(self, client: TestClient, db, user_headers, test_user):
+        """Page-mode responses keep their count and can be continued by cursor."""
+        self._seed(db, test_user, 5)
+        data = client.get("/feedback/mine?page=1&page_size=2", headers=user_headers).json()
+        assert (data["total"], data["page"]) == (5, 1)
+        assert data["prev_cursor"] is None
+
+        following = client.get(
+            f"/feedback/mine?cursor={data['next_cursor']}&page_size=2", headers=user_headers
+        ).json()
+        page_two = client.get("/feedback/mine?page=2&page_size=2", headers=user_headers).json()
+        assert following["items"] == page_two["items"]
+
+    def test_invalid_cursor(self, client: TestClient, admin_headers):
+        """Tampered cursors are rejected."""
+        response = client.get("/admin/feedback?cursor=not-a-cursor", headers=admin_headers)
+        assert response.status_code == 400
+
+
+class TestCountStrategies:
+    """Tests for the count strategies of feedback lists."""
+
+    def _seed(self, db, user, count):
+        db.add_all([Feedback(user_id=user.id, title=f"Item {i}", content="x") for i in range(count)])
+        db.commit()
+
+    def test_default_strategies(self, client: TestClient, db, admin_headers, test_user):
+        """Page mode counts exactly; cursor mode skips the count but reports has_more."""
+        self._seed(db, test_user, 3)
+        data = client.get("/admin/feedback?page_size=2", headers=admin_headers).json()
+        assert (data["total"], data["count_strategy"], data["has_more"]) == (3, "exact", True)
+
+        data = client.get("/admin/feedback?cursor=&page_size=2", headers=admin_headers).json()
+        assert (data["total"], data["count_strategy"], data["has_more"]) == (None, "none", True)
+
+        data = client.get("/admin/feedback?page=2&page_size=2&count=none", headers=admin_headers).json()
+        assert (data["total"], data["has_more"], len(data["items"])) == (None, False, 1)
+
+    def test_estimated_falls_back_to_exact_without_planner(self, client: TestClient, db, admin_headers, test_user):
+        """Dialects without planner estimates answer with an exact count and say so."""
+        self._seed(db, test_user, 3)
+        data = client.get("/admin/feedback?count=estimated", headers=admin_headers).json()
+        if db.get_bind().dialect.name == "postgresql":
+            assert data["count_strategy"] == "estimated"
+        else:
+            assert (data["total"], data["count_strategy"]) == (3, "exact")
+
+    def test_cached_count_invalidated_by_writes(self, client: TestClient, db, admin_headers, user_headers, test_user):
+        """Cached totals are reused until feedback is created or moved between filters."""
+        self._seed(db, test_user, 2)
+        url = "/admin/feedback?count=cached&status=new"
+        assert client.get(url, headers=admin_headers).json()["total"] == 2
+
+        # Rows written behind the service's back are not seen while cached
+        self._seed(db, test_user, 1)
+        data = client.get(url, headers=admin_headers).json()
+        assert (data["total"], data["count_strategy"]) == (2, "cached")
+
+        created = client.post("/feedback/", json={"title": "New", "content": "x"}, headers=user_headers).json()
+        assert client.get(url, headers=admin_headers).json()["total"] == 4
+
+        client.put(f"/admin/feedback/{created['id']}/status", json={"status": "triaged"}, headers=admin_headers)
+        assert client.get(url, headers=admin_headers).json()["total"] == 3
@@ -0,0 +1,179 @@
+"""Tests for bulk feedback import from CSV and NDJSON."""
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.models.category import Category
+from app.models.feedback import Feedback, FeedbackStatus
+from app.models.feedback_daily_stats import FeedbackDailyStats
+from app.models.feedback_tag import FeedbackTag
+from app.models.status_event import StatusEvent
+from app.models.tag import Tag
+from app.services.daily_stats import DailyStatsService
+from app.services.feedback_import import FeedbackImport, _copy_value
+from app.services.sentiment_engine import LEXICON_VERSION
+from tests.conftest import TestingSessionLocal, engine
+
+
+def _write_ndjson(path, records):
+    path.write_text("\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n")
+    return str(path)
+
+
+def _rollup(db):
+    db.expire_all()
+    return sorted(
+        (r.day, r.category_id, r.status, r.sentiment_label, r.feedback_count)
+        for r in db.query(FeedbackDailyStats)
+        if r.feedback_count
+    )
+
+
+class TestFeedbackImport:
+    """Tests for FeedbackImport, the admin endpoint and resume."""
+
+    def test_ndjson_with_row_errors(self, db, test_user, test_admin, tmp_path):
+        path = _write_ndjson(tmp_path / "old.ndjson", [
+            {"title": "Broken login", "content": "This is terrible", "category": "Bugs",
+             "tags": ["ui", "auth"], "user_email": "test@example.com", "created_at": "2023-05-01T10:00:00"},
+            {"title": "Thanks", "content": "I love it", "status": "resolved", "created_at": "2023-05-02T09:00:00"},
+            {"title": "", "content": "No title"},
+            {"title": "Odd", "content": "x", "status": "archived"},
+            "{not json",
+            {"title": "Ghost", "content": "x", "user_email": "nobody@example.com"},
+        ])
+        progress = FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal).run()
+
+        assert (progress.imported, progress.failed, progress.offset) == (2, 4, 6)
+        assert [e["row"] for e in progress.errors] == [3, 4, 5, 6]
+        assert "unknown user" in progress.errors[-1]["error"]
+
+        items = db.query(Feedback).order_by(Feedback.id).all()
+        assert [(f.user_id, f.status, f.sentiment_version) for f in items] == [
+            (test_user.id, FeedbackStatus.NEW, LEXICON_VERSION),
+            (test_admin.id, FeedbackStatus.RESOLVED, LEXICON_VERSION),
+        ]
+        assert items[0].category.name == "Bugs"
+        assert sorted(tag.name for tag in items[0].tags) == ["auth", "ui"]
+        assert items[0].created_at.year == 2023 and items[1].resolved_at is not None
+        assert db.query(StatusEvent).count() == 2
+
+        maintained = _rollup(db)
+        DailyStatsService(db).reconcile()
+        assert _rollup(db) == maintained
+
+    def test_existing_names_and_no_create(self, db, test_admin, tmp_path):
+        db.add_all([Category(name="Bugs"), Tag(name="ui")])
+        db.commit()
+        path = _write_ndjson(tmp_path / "names.ndjson", [
+            {"title": "Known", "content": "x", "category": "Bugs", "tags": ["ui"]},
+            {"title": "New category", "content": "x", "category": "Ideas"},
+            {"title": "New tag", "content": "x", "tags": ["ui", "api"]},
+        ])
+        job = FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal, create_missing=False)
+        progress = job.run()
+
+        assert (progress.imported, progress.failed) == (1, 2)
+        assert (db.query(Category).count(), db.query(Tag).count()) == (1, 1)
+
+    def test_names_created_meanwhile_and_utc_days(self, db, test_admin, tmp_path):
+        """Names another writer created after the maps loaded are reused; offsets count in UTC."""
+        path = _write_ndjson(tmp_path / "race.ndjson", [
+            {"title": "Late", "content": "x", "category": "Bugs", "tags": ["ui"],
+             "created_at": "2023-05-01T22:30:00-05:00"},
+        ])
+        job = FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal)
+        load_catalogs = job._load_catalogs
+
+        def load_then_race():
+            load_catalogs()
+            db.add_all([Category(name="Bugs"), Tag(name="ui")])
+            db.commit()
+
+        job._load_catalogs = load_then_race
+        assert job.run().imported == 1
+        assert (db.query(Category).count(), db.query(Tag).count()) == (1, 1)
+        assert db.query(Feedback).one().category.name == "Bugs"
+
+        maintained = _rollup(db)
+        assert maintained[0][0].isoformat() == "2023-05-02"
+        DailyStatsService(db).reconcile()
+        assert _rollup(db) == maintained
+
+    def test_copy_ignores_session_time_zone(self, db, test_admin, tmp_path):
+        """COPYed timestamps carry +00:00, so a non-UTC session TimeZone does not shift them."""
+        assert _copy_value(datetime(2023, 5, 2, 3, 30)) == "2023-05-02T03:30:00+00:00"
+        if db.get_bind().dialect.name != "postgresql":
+            pytest.skip("COPY is only used on PostgreSQL")
+
+        def set_time_zone(dbapi_connection, connection_record):
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute("SET TIME ZONE 'America/New_York'")
+
+        path = _write_ndjson(tmp_path / "tz.ndjson", [
+            {"title": "Late", "content": "x", "created_at": "2023-05-01T22:30:00-05:00"},
+        ])
+        event.listen(engine, "connect", set_time_zone)
+        try:
+            FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal).run()
+        finally:
+            event.remove(engine, "connect", set_time_zone)
+
+        db.expire_all()
+        assert db.query(Feedback.created_at).scalar() == datetime(2023, 5, 2, 3, 30, tzinfo=timezone.utc)
+        maintained = _rollup(db)
+        assert maintained[0][0].isoformat() == "2023-05-02"
+        DailyStatsService(db).reconcile()
+        assert _rollup(db) == maintained
+
+    def test_resume_after_interruption(self, db, test_admin, tmp_path):
+        path = _write_ndjson(tmp_path / "big.ndjson", [{"title": f"Item {i}", "content": "x"} for i in range(5)])
+        first = FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal, batch_size=2)
+        assert first.run(max_batches=1).offset == 2
+
+        second = FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal, batch_size=2)
+        progress = second.run(resume=True)
+        assert (progress.imported, progress.offset) == (3, 5)
+        assert [f.title for f in db.query(Feedback).order_by(Feedback.id)] == [f"Item {i}" for i in range(5)]
+
+    def test_admin_csv_upload(self, client: TestClient, db, admin_headers):
+        csv_data = (
+            "title,content,category,tags,status\n"
+            "Slow page,The dashboard is slow,Performance,ui|speed,triaged\n"
+            "Great,Love the new look,,,\n"
+            ",missing title,,,\n"
+        )
+        response = client.post(
+            "/admin/feedback/import",
+            files={"file": ("legacy.csv", csv_data, "text/csv")},
+            headers=admin_headers
+        )
+        assert response.status_code == 202
+
+        status = client.get("/admin/feedback/import", headers=admin_headers).json()
+        assert (status["running"], status["imported"], status["failed"]) == (False, 2, 1)
+        assert status["errors"] == [{"row": 3, "error": "title and content are required"}]
+        assert db.query(FeedbackTag).count() == 2
+        categories = client.get("/categories/", headers=admin_headers).json()
+        assert [c["name"] for c in categories] == ["Performance"]
+
+    def test_upload_needs_known_format(self, client: TestClient, admin_headers):
+        response = client.post(
+            "/admin/feedback/import",
+            files={"file": ("legacy.txt", "title,content\n", "text/plain")},
+            headers=admin_headers
+        )
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("rows", [5, 60])
+    def test_statements_per_batch(self, db, test_admin, tmp_path, query_budget, rows):
+        """A batch costs the same number of statements however many records it holds."""
+        path = _write_ndjson(tmp_path / "budget.ndjson", [
+            {"title": f"Item {i}", "content": "x", "category": "Bugs", "tags": ["ui", "api"]} for i in range(rows)
+        ])
+        job = FeedbackImport(path, owner_id=test_admin.id, session_factory=TestingSessionLocal, batch_size=100)
+        with query_budget(14):
+            assert job.run().imported == rows
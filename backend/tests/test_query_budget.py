@@ -0,0 +1,134 @@
+"""
+SQL statement budgets per endpoint.
+
+Budgets are the current statement counts for realistic data (categories
+and tags attached), so an N+1 regression or an extra round trip fails here.
+Lower a budget when an endpoint gets cheaper.
+"""
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.query_stats import track_queries
+from app.models.admin_response import AdminResponse
+from app.models.category import Category
+from app.models.feedback import Feedback
+from app.models.status_event import StatusEvent
+from app.models.tag import Tag
+
+
+def _seed(db, user, count=5):
+    category = Category(name="Bugs")
+    tags = [Tag(name="ui"), Tag(name="api")]
+    db.add_all([category, *tags])
+    db.flush()
+    items = [
+        Feedback(user_id=user.id, title=f"Item {i}", content="x", category_id=category.id, tags=tags)
+        for i in range(count)
+    ]
+    db.add_all(items)
+    db.commit()
+    return [item.id for item in items]
+
+
+class TestQueryBudgets:
+    """Statement budgets for hot endpoints."""
+
+    def test_current_user(self, client: TestClient, user_headers, query_budget):
+        """The user row is loaded once, then served from the principal cache."""
+        with query_budget(1):
+            assert client.get("/auth/me", headers=user_headers).status_code == 200
+        with query_budget(0):
+            assert client.get("/auth/me", headers=user_headers).status_code == 200
+
+    def test_lists_do_not_grow_with_rows(self, client: TestClient, db, test_user, user_headers, admin_headers, query_budget):
+        """
+        count + page + one batched load per relationship, however many rows;
+        plus the user on a principal cache miss.
+        """
+        _seed(db, test_user, count=8)
+        with query_budget(5):
+            assert len(client.get("/feedback/mine", headers=user_headers).json()["items"]) == 8
+        with query_budget(4):
+            assert len(client.get("/admin/feedback", headers=admin_headers).json()["items"]) == 8
+        with query_budget(3):
+            client.get("/admin/feedback?cursor=", headers=admin_headers)
+
+    def test_feedback_detail(self, client: TestClient, db, test_user, test_admin, user_headers, query_budget):
+        """user + feedback/category + one IN query per collection, however long they are."""
+        item_id = _seed(db, test_user, count=1)[0]
+        db.add_all([AdminResponse(feedback_id=item_id, admin_id=test_admin.id, message=f"Reply {i}") for i in range(3)])
+        db.add_all([
+            StatusEvent(feedback_id=item_id, old_status="new", new_status="triaged", changed_by=test_admin.id)
+            for _ in range(4)
+        ])
+        db.commit()
+        with query_budget(5):
+            data = client.get(f"/feedback/{item_id}", headers=user_headers).json()
+        assert (len(data["tags"]), len(data["admin_responses"]), len(data["status_events"])) == (2, 3, 4)
+        assert data["category"]["name"] == "Bugs"
+
+    def test_admin_mutations(self, client: TestClient, db, test_user, admin_headers, query_budget):
+        """
+        UPDATE ... RETURNING + rollup upsert with the status event on
+        PostgreSQL; SQLite reads the old value and inserts the event separately.
+        The admin comes from the principal cache, category and tags from the
+        catalog cache; an unchanged category moves no rollup row.
+        """
+        item_id = _seed(db, test_user, count=1)[0]
+        tag_id = db.query(Tag.id).filter(Tag.name == "ui").scalar()
+        category_id = db.query(Category.id).scalar()
+        postgres = db.get_bind().dialect.name == "postgresql"
+        # Warm the catalog cache
+        client.put(f"/admin/feedback/{item_id}/status", json={"status": "new"}, headers=admin_headers)
+        
+        with query_budget(2 if postgres else 4):
+            data = client.put(f"/admin/feedback/{item_id}/status", json={"status": "triaged"}, headers=admin_headers).json()
+        assert data["status"] == "triaged" and len(data["tags"]) == 2 and data["category"]["name"] == "Bugs"
+        with query_budget(1 if postgres else 2):
+            client.put(f"/admin/feedback/{item_id}/category", json={"category_id": category_id}, headers=admin_headers)
+        with query_budget(1 if postgres else 3):
+            data = client.put(f"/admin/feedback/{item_id}/tags", json={"tag_ids": [tag_id]}, headers=admin_headers).json()
+        assert [t["name"] for t in data["tags"]] == ["ui"]
+
+    def test_delete_does_not_load_children(self, client: TestClient, db, test_user, user_headers, query_budget):
+        item_id = _seed(db, test_user, count=1)[0]
+        with query_budget(7):
+            assert client.delete(f"/feedback/{item_id}", headers=user_headers).status_code == 200
+        assert db.query(Feedback).count() == 0
+
+    def test_analytics_overview(self, client: TestClient, admin_headers, query_budget):
+        with query_budget(1):
+            client.get("/analytics/overview", headers=admin_headers)
+
+
+class TestQueryStatsReporting:
+    """Per-request statement stats in headers and metrics."""
+
+    def test_debug_headers(self, client: TestClient, user_headers, monkeypatch, query_budget):
+        monkeypatch.setattr(settings, "QUERY_STATS_HEADERS", True)
+        with query_budget(10) as stats:
+            response = client.get("/feedback/mine", headers=user_headers)
+        assert response.headers["X-DB-Query-Count"] == str(stats.count)
+        assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+        assert response.headers["X-DB-Slowest-Query"].startswith("SELECT")
+
+    def test_request_stats_keep_no_statement_text(self, db):
+        with track_queries() as stats:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+        assert stats.count == 2
+        assert stats.statements == []
+        assert stats.slowest_statement is not None
+
+    def test_headers_off_by_default(self, client: TestClient, user_headers):
+        response = client.get("/feedback/mine", headers=user_headers)
+        assert "X-DB-Query-Count" not in response.headers
+
+    def test_metrics_by_route(self, client: TestClient, test_user, user_headers):
+        before = metrics.get("db_queries_total", route="/feedback/{feedback_id}")
+        requests = metrics.get("db_requests_total", route="/feedback/{feedback_id}")
+        client.get("/feedback/12345", headers=user_headers)
+        assert metrics.get("db_requests_total", route="/feedback/{feedback_id}") == requests + 1
+        assert metrics.get("db_queries_total", route="/feedback/{feedback_id}") >= before + 2
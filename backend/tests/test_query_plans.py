@@ -0,0 +1,210 @@
+"""
+EXPLAIN-based regression tests for the hot feedback and analytics queries.
+
+Each test runs a service method against a seeded table, captures the
+SELECTs it issues and fails if a plan reads a large table without an index
+or sorts rows explicitly. Plans come from EXPLAIN QUERY PLAN on SQLite and
+EXPLAIN (FORMAT JSON) on PostgreSQL (when DATABASE_URL points at one).
+"""
+import random
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+
+from tests.conftest import TestingSessionLocal, engine
+from app.core.pagination import CountStrategy
+from app.db.base_class import Base
+from app.models.admin_response import AdminResponse
+from app.models.category import Category
+from app.models.feedback import Feedback, FeedbackStatus
+from app.models.feedback_tag import FeedbackTag
+from app.models.status_event import StatusEvent
+from app.models.tag import Tag
+from app.models.user import User, UserRole
+from app.services.analytics_service import AnalyticsService
+from app.services.daily_stats import DailyStatsService
+from app.services.feedback_service import FeedbackService
+
+# Tables big enough in production that reading them in full is a regression
+LARGE_TABLES = {"feedback", "feedback_tags", "status_events", "admin_responses", "feedback_daily_stats"}
+FEEDBACK_ROWS = 20000
+
+
+@pytest.fixture(scope="module")
+def plan_db():
+    """A session over a seeded, ANALYZEd database shared by this module."""
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    try:
+        _seed(db)
+        DailyStatsService(db).reconcile()
+        if engine.dialect.name == "postgresql":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.exec_driver_sql("VACUUM ANALYZE")
+        else:
+            db.connection().exec_driver_sql("ANALYZE")
+            db.commit()
+        yield db
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+def _seed(db):
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1)
+    statuses = list(FeedbackStatus)
+    labels = ["negative", "neutral", "positive", "positive", "pending"]
+    db.execute(insert(User), [
+        {"email": f"user{i}@example.com", "hashed_password": "x", "role": UserRole.USER}
+        for i in range(200)
+    ])
+    db.execute(insert(Category), [{"name": f"Category {i}"} for i in range(12)])
+    db.execute(insert(Tag), [{"name": f"tag-{i}"} for i in range(30)])
+    db.execute(insert(Feedback), [
+        {
+            "user_id": rng.randint(1, 200),
+            "title": f"Feedback {i}",
+            "content": "Seeded row",
+            "category_id": rng.choice([None] + list(range(1, 13))),
+            "status": rng.choice(statuses),
+            "sentiment_label": rng.choice(labels),
+            "sentiment_score": rng.uniform(-1, 1),
+            "created_at": start + timedelta(minutes=rng.randint(0, 60 * 24 * 720)),
+        }
+        for i in range(FEEDBACK_ROWS)
+    ])
+    ids = range(1, FEEDBACK_ROWS + 1)
+    db.execute(insert(FeedbackTag), [
+        {"feedback_id": i, "tag_id": tag}
+        for i in ids
+        for tag in rng.sample(range(1, 31), k=rng.randint(0, 3))
+    ])
+    db.execute(insert(StatusEvent), [
+        {"feedback_id": i, "old_status": None, "new_status": "new", "changed_by": 1} for i in ids
+    ])
+    db.execute(insert(AdminResponse), [
+        {"feedback_id": i, "admin_id": 1, "message": "Thanks"} for i in ids if i % 10 == 0
+    ])
+    db.commit()
+
+
+@contextmanager
+def captured_selects(db):
+    """Collect (statement, parameters) for every SELECT run on the session's engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+def _sqlite_problems(db, statement, parameters, sorted_groups: bool, whole_table: bool) -> list[str]:
+    problems = []
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    for row in rows:
+        detail = row[-1]
+        scan = re.match(r"SCAN (\w+)", detail)
+        if scan and "USING" not in detail and not whole_table:
+            if re.sub(r"_\d+$", "", scan.group(1)) in LARGE_TABLES:
+                problems.append(f"full scan: {detail}")
+        if "USE TEMP B-TREE" in detail:
+            # Ordering aggregated groups (top N) is fine; sorting rows is not
+            if not (sorted_groups and detail.endswith("FOR ORDER BY")):
+                problems.append(f"explicit sort: {detail}")
+    return problems
+
+
+def _postgres_problems(db, statement, parameters, sorted_groups: bool, whole_table: bool) -> list[str]:
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    problems = []
+
+    def contains_aggregate(node) -> bool:
+        return node["Node Type"] == "Aggregate" or any(contains_aggregate(c) for c in node.get("Plans", []))
+
+    def walk(node):
+        kind = node["Node Type"]
+        if kind == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES and not whole_table:
+            problems.append(f"full scan: Seq Scan on {node['Relation Name']}")
+        if kind in ("Sort", "Incremental Sort"):
+            if not (sorted_groups and any(contains_aggregate(c) for c in node.get("Plans", []))):
+                problems.append(f"explicit sort: {kind} on {node.get('Sort Key')}")
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return problems
+
+
+def assert_indexed(db, call, sorted_groups: bool = False, whole_table: bool = False):
+    """
+    Run call() and check the plan of every SELECT it issued.
+
+    sorted_groups allows a final sort over aggregated groups (ORDER BY
+    count ... LIMIT). whole_table allows full scans for aggregates that
+    read every row by definition; explicit row sorts are still rejected.
+    """
+    with captured_selects(db) as statements:
+        call()
+    assert statements, "no SELECT captured"
+    explain = _postgres_problems if engine.dialect.name == "postgresql" else _sqlite_problems
+    problems = [
+        f"{problem}\n    in: {' '.join(statement.split())}"
+        for statement, parameters in statements
+        for problem in explain(db, statement, parameters, sorted_groups, whole_table)
+    ]
+    assert not problems, "\n".join(problems)
+
+
+class TestFeedbackListPlans:
+    """Newest-first lists seek an index for every filter and never sort."""
+
+    def test_all_feedback(self, plan_db):
+        service = FeedbackService(plan_db)
+        second = service.get_all_feedback(cursor=service.get_all_feedback(cursor="").next_cursor)
+        assert_indexed(plan_db, lambda: service.get_all_feedback(page=1, count=CountStrategy.NONE))
+        assert_indexed(plan_db, lambda: service.get_all_feedback(cursor=second.next_cursor))
+        assert_indexed(plan_db, lambda: service.get_all_feedback(cursor=second.prev_cursor))
+
+    def test_by_status(self, plan_db):
+        service = FeedbackService(plan_db)
+        first = service.get_all_feedback(status=FeedbackStatus.NEW, cursor="")
+        assert_indexed(plan_db, lambda: service.get_all_feedback(status=FeedbackStatus.NEW, cursor=""))
+        assert_indexed(plan_db, lambda: service.get_all_feedback(status=FeedbackStatus.NEW, cursor=first.next_cursor))
+
+    def test_by_category_with_count(self, plan_db):
+        service = FeedbackService(plan_db)
+        assert_indexed(plan_db, lambda: service.get_all_feedback(category_id=3, page=2))
+
+    def test_user_feedback_with_count(self, plan_db):
+        service = FeedbackService(plan_db)
+        assert_indexed(plan_db, lambda: service.get_user_feedback(user_id=5, page=1))
+        assert_indexed(plan_db, lambda: service.get_user_feedback(user_id=5, status=FeedbackStatus.TRIAGED))
+
+
+class TestDetailAndAnalyticsPlans:
+    """Detail reads use key lookups; analytics read the rollup or covering indexes."""
+
+    def test_feedback_detail(self, plan_db):
+        service = FeedbackService(plan_db)
+        assert_indexed(plan_db, lambda: service.get_feedback_by_id(FEEDBACK_ROWS // 2))
+
+    def test_rollup_trends(self, plan_db):
+        service = AnalyticsService(plan_db)
+        assert_indexed(plan_db, lambda: service.get_timeseries(days=30))
+        assert_indexed(plan_db, lambda: service.get_sentiment_trends(days=30))
+
+    def test_top_tags_and_categories(self, plan_db):
+        service = AnalyticsService(plan_db)
+        assert_indexed(plan_db, lambda: service.get_top_tags(limit=10), sorted_groups=True, whole_table=True)
+        assert_indexed(plan_db, lambda: service.get_top_categories(limit=10), sorted_groups=True, whole_table=True)
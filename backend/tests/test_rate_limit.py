@@ -0,0 +1,99 @@
+"""Tests for the rate limiting and load shedding middleware."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.pool import MonitoredQueuePool, pool_waits
+from app.services.rate_limit import TokenBuckets, rate_limiter
+
+
+class TestTokenBuckets:
+    """Tests for the bucket arithmetic."""
+
+    def test_burst_then_refill(self):
+        buckets = TokenBuckets(max_keys=10)
+        assert [buckets.take(("a",), 0.0, 2, 3) for _ in range(3)] == [0, 0, 0]
+        assert buckets.take(("a",), 0.0, 2, 3) == pytest.approx(0.5)
+        # Half a second refills one token at 2/s
+        assert buckets.take(("a",), 0.5, 2, 3) == 0
+        assert buckets.take(("b",), 0.5, 2, 3) == 0
+
+    def test_keys_are_bounded(self):
+        buckets = TokenBuckets(max_keys=2)
+        for key in ("a", "b", "c"):
+            buckets.take((key,), 0.0, 1, 1)
+        assert len(buckets) == 2
+
+
+class TestRateLimitMiddleware:
+    """Tests for per-user, per-route and concurrency limits."""
+
+    def test_user_bucket(self, client: TestClient, user_headers, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 3)
+        monkeypatch.setattr(settings, "RATE_LIMIT_PER_SECOND", 0.01)
+        before = metrics.get("rate_limit_decisions_total", decision="limited_user", route="other")
+        for _ in range(3):
+            assert client.get("/feedback/mine", headers=user_headers).status_code == 200
+        response = client.get("/feedback/mine", headers=user_headers)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+        assert metrics.get("rate_limit_decisions_total", decision="limited_user", route="other") == before + 1
+        # Another user has their own bucket; health checks are exempt
+        assert client.get("/feedback/mine", headers=admin_headers).status_code == 200
+        assert client.get("/health").status_code == 200
+
+    def test_route_bucket(self, client: TestClient, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_ROUTES", {"/admin/feedback": (0.01, 2)})
+        assert client.get("/admin/feedback", headers=admin_headers).status_code == 200
+        assert client.get("/admin/feedback", headers=admin_headers).status_code == 200
+        response = client.get("/admin/feedback", headers=admin_headers)
+        assert response.status_code == 429
+        assert metrics.get("rate_limit_decisions_total", decision="limited_route", route="/admin/feedback") >= 1
+        assert client.get("/categories/", headers=admin_headers).status_code == 200
+
+    def test_concurrency_cap(self, client: TestClient, admin_headers, monkeypatch):
+        monkeypatch.setattr(settings, "CONCURRENCY_LIMITS", {"/admin/feedback": 1})
+        assert client.get("/admin/feedback", headers=admin_headers).status_code == 200
+        assert rate_limiter.in_flight["/admin/feedback"] == 0
+
+        rate_limiter.in_flight["/admin/feedback"] = 1
+        response = client.get("/admin/feedback", headers=admin_headers)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert metrics.get("rate_limit_decisions_total", decision="limited_concurrency", route="/admin/feedback") >= 1
+
+    def test_disabled(self, client: TestClient, user_headers, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_BURST", 1)
+        monkeypatch.setattr(settings, "RATE_LIMIT_PER_SECOND", 0.01)
+        monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+        for _ in range(3):
+            assert client.get("/feedback/mine", headers=user_headers).status_code == 200
+
+
+class TestPoolWaitShedding:
+    """Tests for shedding on connection pool checkout waits."""
+
+    def test_sheds_while_checkouts_wait(self, client: TestClient, user_headers):
+        waiter = pool_waits.start(time.monotonic() - 5)
+        response = client.get("/feedback/mine", headers=user_headers)
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert client.get("/health").status_code == 200
+
+        pool_waits.finish(waiter, time.monotonic())
+        pool_waits.reset()
+        assert client.get("/feedback/mine", headers=user_headers).status_code == 200
+
+    def test_pool_reports_checkout_waits(self):
+        engine = create_engine("sqlite://", poolclass=MonitoredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.2)
+        pool_waits.reset()
+        with engine.connect():
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            assert pool_waits.current_wait() >= 0.2
+        engine.dispose()
@@ -0,0 +1,347 @@
+"""Tests for the shared sentiment engine."""
+import threading
+from datetime import timedelta
+
+from sqlalchemy.exc import OperationalError
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.core.config import settings
+from app.models.feedback_daily_stats import FeedbackDailyStats
+from app.models.feedback import Feedback, FeedbackStatus, SentimentLabel
+from app.models.user import User, UserRole
+from app.services.daily_stats import DailyStatsService
+from app.services.feedback_service import FeedbackService
+from app.services.sentiment_backfill import SentimentBackfill
+from app.services.sentiment_engine import (
+    CUSTOM_LEXICON,
+    LEXICON_VERSION,
+    SentimentCache,
+    SentimentEngine,
+    get_sentiment_engine,
+    score_batch,
+)
+from app.services.sentiment_worker import sentiment_queue
+from tests.conftest import TestingSessionLocal
+
+
+class TestSentimentEngine:
+    """Tests for the process-wide sentiment engine."""
+
+    def test_engine_is_shared(self, db):
+        """FeedbackService instances reuse one engine instead of reloading VADER."""
+        assert FeedbackService(db).sentiment is FeedbackService(db).sentiment
+        assert FeedbackService(db).sentiment is get_sentiment_engine()
+
+    def test_engine_is_shared_across_threads(self):
+        """Concurrent first use from worker threads yields a single engine."""
+        engines = []
+        threads = [
+            threading.Thread(target=lambda: engines.append(get_sentiment_engine()))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(e) for e in engines}) == 1
+
+    def test_scores_match_fresh_analyzer(self):
+        """Shared engine scores exactly like a freshly built analyzer."""
+        analyzer = SentimentIntensityAnalyzer()
+        analyzer.lexicon.update(CUSTOM_LEXICON)
+        engine = SentimentEngine()
+        for text in ["The UI is clunky!!", "Love it :)", "Meeting at 3pm", "NOT great at all"]:
+            assert engine.score(text) == analyzer.polarity_scores(text)["compound"]
+
+    def test_keyword_override(self):
+        """Strong keywords override the score-based label, whole words only."""
+        engine = get_sentiment_engine()
+        assert engine.label(0.9, "It is broken") == "negative"
+        assert engine.label(-0.9, "Best release yet") == "positive"
+        assert engine.label(0.0, "The unbroken record") == "neutral"
+
+
+class TestSentimentBatch:
+    """Tests for batch sentiment scoring."""
+
+    TEXTS = [
+        "Terrible UI experience. The interface is confusing and clunky.",
+        "Love the new dashboard!! It's intuitive :)",
+        "Is there a way to export data to CSV?",
+        "The unbroken streak of releases, kind of nice but slow",
+        "GREAT support 😀 thanks",
+        "",
+    ]
+
+    def test_batch_matches_per_item(self):
+        """Batch results are identical to scoring each text on its own."""
+        engine = get_sentiment_engine()
+        batch = score_batch(self.TEXTS)
+        assert len(batch.scores) == len(batch.labels) == len(self.TEXTS)
+        for i, text in enumerate(self.TEXTS):
+            score = engine.score(text)
+            assert batch.scores[i] == score
+            assert batch.labels[i] == engine.label(score, text)
+
+    def test_batch_accepts_generators(self):
+        """Any iterable of texts can be scored, including an empty one."""
+        batch = score_batch(t for t in self.TEXTS[:2])
+        assert list(batch.labels) == ["negative", "positive"]
+        assert len(score_batch([]).scores) == 0
+
+
+class TestAsyncEnrichment:
+    """Tests for the opt-in background sentiment pipeline."""
+
+    def test_pending_then_enriched(self, client, db, monkeypatch, user_headers, admin_headers):
+        """Feedback is stored pending, counted as such, then scored by the queue."""
+        monkeypatch.setattr(settings, "SENTIMENT_ASYNC", True)
+        monkeypatch.setattr(sentiment_queue, "session_factory", TestingSessionLocal)
+
+        response = client.post(
+            "/feedback/",
+            json={"title": "UI is terrible", "content": "Confusing and frustrating"},
+            headers=user_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sentiment_label"] == "pending"
+        assert data["sentiment_score"] is None
+        assert sentiment_queue.depth() >= 1
+
+        overview = client.get("/analytics/overview", headers=admin_headers).json()
+        assert overview["pending_sentiment"] == 1
+        trends = client.get("/analytics/sentiment-trends?days=7", headers=admin_headers).json()
+        assert trends["pending_count"] == 1
+        assert trends["data"] == []
+
+        assert sentiment_queue.drain() == 1
+        assert sentiment_queue.depth() == 0
+
+        enriched = client.get(f"/feedback/{data['id']}", headers=user_headers).json()
+        assert enriched["sentiment_label"] == "negative"
+        assert enriched["sentiment_score"] < 0
+
+        # The daily rollup moved the row out of "pending"
+        trends = client.get("/analytics/sentiment-trends?days=7", headers=admin_headers).json()
+        assert trends["pending_count"] == 0
+        assert trends["data"][0]["count"] == 1
+
+        metrics = client.get("/admin/metrics", headers=admin_headers).json()
+        assert metrics["gauges"]["sentiment_queue_depth"] == 0
+        assert "sentiment_queue_last_lag_seconds" in metrics["gauges"]
+
+    def test_recover_pending(self, db, monkeypatch):
+        """Rows left pending (e.g. after a crash) are re-queued on startup."""
+        monkeypatch.setattr(sentiment_queue, "session_factory", TestingSessionLocal)
+        user = User(email="pending@example.com", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.commit()
+        db.add(Feedback(
+            user_id=user.id, title="Great", content="Love it",
+            sentiment_label=SentimentLabel.PENDING.value
+        ))
+        db.commit()
+
+        assert sentiment_queue.recover_pending() == 1
+        assert sentiment_queue.drain() == 1
+        db.expire_all()
+        assert db.query(Feedback).one().sentiment_label == "positive"
+
+    def test_failed_batch_is_retried(self, db, monkeypatch):
+        """A batch whose write fails is queued again and the row still gets labeled."""
+        user = User(email="retry@example.com", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.commit()
+        feedback = Feedback(user_id=user.id, title="Great", content="Love it", sentiment_label=SentimentLabel.PENDING.value)
+        db.add(feedback)
+        db.commit()
+
+        failures = []
+
+        def flaky_session():
+            session = TestingSessionLocal()
+            if not failures:
+                def fail():
+                    failures.append(session)
+                    raise OperationalError("COMMIT", {}, Exception("connection lost"))
+                session.commit = fail
+            return session
+
+        monkeypatch.setattr(sentiment_queue, "session_factory", flaky_session)
+        monkeypatch.setattr(sentiment_queue, "retry_backoff", 0)
+        sentiment_queue.submit(feedback.id)
+        assert sentiment_queue.drain() == 1
+        assert len(failures) == 1
+        assert sentiment_queue.depth() == 0
+        db.expire_all()
+        assert db.get(Feedback, feedback.id).sentiment_label == "positive"
+
+
+class TestSentimentCache:
+    """Tests for the content-hash sentiment cache."""
+
+    def test_hit_miss_and_normalization(self):
+        """Repeat texts (modulo whitespace) are served from the cache."""
+        engine = SentimentEngine(cache_size=10)
+        first = engine.analyze("The checkout is  broken\nagain")
+        assert (engine.cache.hits, engine.cache.misses) == (0, 1)
+        assert engine.analyze("The checkout is broken again") == first
+        assert (engine.cache.hits, engine.cache.misses) == (1, 1)
+
+    def test_eviction(self):
+        """The least recently used entry is evicted once the cache is full."""
+        engine = SentimentEngine(cache_size=2)
+        engine.analyze("one")
+        engine.analyze("two")
+        engine.analyze("one")  # refresh "one"
+        engine.analyze("three")  # evicts "two"
+        assert engine.cache.evictions == 1
+        assert len(engine.cache) == 2
+        engine.analyze("one")
+        assert engine.cache.hits == 2
+
+    def test_key_includes_lexicon_version(self):
+        """Entries from another lexicon version are never returned."""
+        old = SentimentCache(10, version="old")
+        new = SentimentCache(10)
+        assert old.key("same text") != new.key("same text")
+        assert LEXICON_VERSION == get_sentiment_engine().version
+
+    def test_unchanged_text_not_rescored(self, client, user_headers, monkeypatch):
+        """Updating feedback without changing its text skips sentiment analysis."""
+        created = client.post(
+            "/feedback/",
+            json={"title": "Great app", "content": "Works well"},
+            headers=user_headers
+        ).json()
+
+        def fail(*args):
+            raise AssertionError("sentiment should not be recalculated")
+
+        monkeypatch.setattr(FeedbackService, "_analyze_sentiment", fail)
+        response = client.put(
+            f"/feedback/{created['id']}",
+            json={"title": "Great app", "content": "Works well"},
+            headers=user_headers
+        )
+        assert response.status_code == 200
+        assert response.json()["sentiment_label"] == created["sentiment_label"]
+
+
+class TestSentimentBackfill:
+    """Tests for versioned sentiment and the resumable backfill."""
+
+    def _make_rows(self, db, versions):
+        user = User(email="backfill@example.com", hashed_password="x", role=UserRole.USER)
+        db.add(user)
+        db.commit()
+        rows = [
+            Feedback(
+                user_id=user.id, title=f"Item {i}", content="I love it",
+                sentiment_score=0.0, sentiment_label="neutral", sentiment_version=version
+            )
+            for i, version in enumerate(versions)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return rows
+
+    def test_new_feedback_records_version(self, client, user_headers):
+        """Synchronously scored feedback stores the current lexicon version."""
+        client.post("/feedback/", json={"title": "Nice", "content": "Good"}, headers=user_headers)
+        db = TestingSessionLocal()
+        try:
+            assert db.query(Feedback.sentiment_version).scalar() == LEXICON_VERSION
+        finally:
+            db.close()
+
+    def test_only_stale_rows_rescored(self, db):
+        """Rows with a missing or old version are re-scored; others are untouched."""
+        rows = self._make_rows(db, [None, "old", LEXICON_VERSION, None])
+        rows[3].sentiment_label = SentimentLabel.PENDING.value
+        db.commit()
+
+        progress = SentimentBackfill(session_factory=TestingSessionLocal, pause_seconds=0).run()
+        assert (progress.scanned, progress.updated) == (2, 2)
+
+        db.expire_all()
+        labels = [(f.sentiment_label, f.sentiment_version) for f in db.query(Feedback).order_by(Feedback.id)]
+        assert labels == [
+            ("positive", LEXICON_VERSION),
+            ("positive", LEXICON_VERSION),
+            ("neutral", LEXICON_VERSION),
+            ("pending", None),
+        ]
+
+    def test_rows_changed_meanwhile_keep_rollup(self, db):
+        """Rows deleted, re-scored or edited between the read and the UPDATE are left alone."""
+        rows = self._make_rows(db, [None] * 4)
+        DailyStatsService(db).reconcile()
+        backfill = SentimentBackfill(session_factory=TestingSessionLocal, pause_seconds=0)
+        score = backfill._score
+
+        def score_while_others_write(texts, executor):
+            other = TestingSessionLocal()
+            try:
+                FeedbackService(other).delete_feedback(rows[0].id, rows[0].user_id)
+                other.get(Feedback, rows[1].id).sentiment_version = LEXICON_VERSION
+                other.commit()
+                FeedbackService(other).update_status(rows[2].id, rows[2].user_id, FeedbackStatus.TRIAGED)
+                # CURRENT_TIMESTAMP has whole seconds on SQLite
+                edited = other.get(Feedback, rows[2].id)
+                edited.updated_at = edited.updated_at + timedelta(seconds=1)
+                other.commit()
+            finally:
+                other.close()
+            return score(texts, executor)
+
+        backfill._score = score_while_others_write
+        assert backfill.run().updated == 1
+        db.expire_all()
+        assert db.get(Feedback, rows[2].id).sentiment_version is None
+
+        def rollup():
+            db.expire_all()
+            return sorted(
+                (r.day, r.category_id, r.status, r.sentiment_label, r.feedback_count)
+                for r in db.query(FeedbackDailyStats)
+                if r.feedback_count
+            )
+
+        maintained = rollup()
+        DailyStatsService(db).reconcile()
+        assert rollup() == maintained
+
+    def test_resumes_from_checkpoint(self, db):
+        """A new run continues after the last committed chunk."""
+        rows = self._make_rows(db, [None] * 5)
+        first = SentimentBackfill(session_factory=TestingSessionLocal, chunk_size=2, pause_seconds=0)
+        first.run(max_chunks=1)
+        assert first.progress.last_id == rows[1].id
+
+        second = SentimentBackfill(session_factory=TestingSessionLocal, chunk_size=2, pause_seconds=0)
+        progress = second.run()
+        assert progress.scanned == 3
+        assert progress.last_id == rows[-1].id
+
+    def test_admin_trigger(self, client, db, admin_headers):
+        """Admins only request a backfill; the CLI claims the request and runs it once."""
+        rows = self._make_rows(db, ["old", "old"])
+        backfill = SentimentBackfill(session_factory=TestingSessionLocal, pause_seconds=0)
+        assert backfill.run_requested() is None
+
+        response = client.post("/admin/sentiment/backfill?restart=true", headers=admin_headers)
+        assert response.status_code == 202
+        assert response.json()["requested"] is True
+        db.expire_all()
+        assert db.query(Feedback).filter(Feedback.sentiment_version == "old").count() == 2
+
+        progress = backfill.run_requested()
+        assert progress.updated == 2
+        assert backfill.run_requested() is None
+
+        status = client.get("/admin/sentiment/backfill", headers=admin_headers).json()
+        assert status["version"] == LEXICON_VERSION
+        assert status["requested"] is False
+        assert status["last_id"] == rows[-1].id
@@ -29,13 +29,43 @@ client.interceptors.request.use(
   }
 )
 
+// Access tokens are short-lived: on a 401, exchange the refresh token once
+// (shared by concurrent requests) and retry the original request
+let refreshing = null
+
+function refreshTokens() {
+  const refreshToken = localStorage.getItem('refresh_token')
+  if (!refreshToken) return Promise.reject(new Error('No refresh token'))
+  refreshing = refreshing || axios
+    .post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken })
+    .then((response) => {
+      localStorage.setItem('token', response.data.access_token)
+      localStorage.setItem('refresh_token', response.data.refresh_token)
+      return response.data.access_token
+    })
+    .finally(() => { refreshing = null })
+  return refreshing
+}
+
 // Response interceptor to handle errors with detailed logging
 client.interceptors.response.use(
   (response) => {
     console.log(`[API] Response ${response.status}:`, response.data)
     return response
   },
-  (error) => {
+  async (error) => {
+    const original = error.config
+    if (error.response?.status === 401 && original && !original._retried && !original.url?.startsWith('/auth/')) {
+      original._retried = true
+      try {
+        const token = await refreshTokens()
+        original.headers.Authorization = `Bearer ${token}`
+        return client(original)
+      } catch (refreshError) {
+        // Fall through to the session-expired handling below
+      }
+    }
+
     // Log detailed error information
     console.error('[API] Error details:', {
       message: error.message,
@@ -53,6 +83,7 @@ client.interceptors.response.use(
       error.userMessage = 'Cannot connect to server. Please ensure the backend is running.'
     } else if (error.response?.status === 401) {
       localStorage.removeItem('token')
+      localStorage.removeItem('refresh_token')
       localStorage.removeItem('user')
       window.location.href = '/login'
       error.userMessage = 'Session expired. Please login again.'
@@ -89,6 +120,11 @@ export const authApi = {
   },
   
   getMe: () => client.get('/auth/me'),
+
+  // Token passed explicitly: local storage is cleared while the request is queued
+  logout: (token) => client.post('/auth/logout', null, {
+    headers: { Authorization: `Bearer ${token}` }
+  }),
 }
 
 // Feedback API
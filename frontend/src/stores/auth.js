@@ -13,6 +13,7 @@ export const useAuthStore = defineStore('auth', () => {
     const response = await authApi.login(email, password)
     token.value = response.data.access_token
     localStorage.setItem('token', token.value)
+    localStorage.setItem('refresh_token', response.data.refresh_token)
     
     // Fetch user info
     const userResponse = await authApi.getMe()
@@ -28,9 +29,12 @@ export const useAuthStore = defineStore('auth', () => {
   }
 
   function logout() {
+    // Revoke refresh tokens server-side; local state is cleared either way
+    if (token.value) authApi.logout(token.value).catch(() => {})
     token.value = null
     user.value = null
     localStorage.removeItem('token')
+    localStorage.removeItem('refresh_token')
     localStorage.removeItem('user')
   }
 